@@ -0,0 +1,50 @@
+"""Composite indexes for history, session list and transcript queries
+
+Tables are created by database/init.sql or Base.metadata.create_all, so this
+revision only adds the indexes those paths were missing on existing databases.
+The single-column indexes from init.sql that the new ones cover are dropped.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+COMPOSITE_INDEXES = (
+    ("ix_symptom_submissions_user_id_created_at", "symptom_submissions", ["user_id", "created_at", "id"]),
+    ("ix_chat_sessions_user_id_created_at", "chat_sessions", ["user_id", "created_at", "id"]),
+    ("ix_chat_messages_session_id_created_at", "chat_messages", ["session_id", "created_at", "id"]),
+)
+
+# init.sql indexes that are a prefix of a composite index above
+REDUNDANT_INDEXES = (
+    ("idx_symptom_submissions_user_id", "symptom_submissions", ["user_id"]),
+    ("idx_chat_sessions_user_id", "chat_sessions", ["user_id"]),
+    ("idx_chat_messages_session_id", "chat_messages", ["session_id"]),
+)
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps Postgres tables writable during the build; it cannot
+    # run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in COMPOSITE_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+        for name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+        for name, table, _ in COMPOSITE_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
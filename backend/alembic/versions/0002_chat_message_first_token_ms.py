@@ -0,0 +1,24 @@
+"""Record time to first streamed token on chat messages
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column("chat_messages", sa.Column("first_token_ms", sa.Integer(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table("chat_messages") as batch_op:
+        batch_op.drop_column("first_token_ms")
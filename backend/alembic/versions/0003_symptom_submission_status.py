@@ -0,0 +1,28 @@
+"""Track background analysis state on symptom submissions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Existing rows were analysed inline, so they are all completed
+    op.add_column(
+        "symptom_submissions",
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="completed"),
+    )
+
+def downgrade() -> None:
+    with op.batch_alter_table("symptom_submissions") as batch_op:
+        batch_op.drop_column("status")
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Optional
 
-from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, verify_token
+from app.core.database import get_async_db
+from app.core.password_pool import password_pool
+from app.core.rate_limit import client_ip, rate_limit, rate_limiter
+from app.core.user_cache import resolve_user, user_cache
+from app.core.security import create_access_token, verify_token
 from app.core.config import settings
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, Token, User as UserSchema
@@ -15,44 +19,40 @@ router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    """Get current authenticated user."""
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> UserSchema:
+    """Get current authenticated user as a detached snapshot (cached per token)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    email = verify_token(token)
-    if email is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
+    user = await resolve_user(token, db)
     if user is None:
         raise credentials_exception
     
     return user
 
-@router.post("/signup", response_model=UserSchema)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
+@router.post("/signup", response_model=UserSchema, dependencies=[Depends(rate_limit("auth_signup"))])
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await db.scalar(select(User).where(User.username == user.username))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user.password)
+    # Create new user; bcrypt runs in the password worker pool
+    hashed_password = await password_pool.hash(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -61,17 +61,29 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Authenticate user and return access token."""
-    user = db.query(User).filter(User.email == form_data.username).first()
+    # Charged per IP and per account: the account bucket throttles guesses at
+    # one password even when they come from many IPs. It is lenient (see
+    # RATE_LIMIT_ACCOUNT_*), so someone failing logins with another user's
+    # name only slows the owner down rather than locking them out
+    if rate_limiter is not None:
+        await rate_limiter.check("auth_login", client_ip(request), account=form_data.username)
+    
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if user:
+        password_ok, upgraded_hash = await password_pool.verify(form_data.password, user.hashed_password)
+    else:
+        password_ok, upgraded_hash = False, None
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -84,6 +96,11 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             detail="Inactive user"
         )
     
+    # Stored hash uses an outdated bcrypt cost; upgrade it transparently
+    if upgraded_hash:
+        user.hashed_password = upgraded_hash
+        await db.commit()
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
@@ -92,14 +109,14 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserSchema)
-def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: UserSchema = Depends(get_current_user)):
     """Get current user information."""
     return current_user
 
-@router.post("/forgot-password")
-def forgot_password(password_reset: PasswordReset, db: Session = Depends(get_db)):
+@router.post("/forgot-password", dependencies=[Depends(rate_limit("auth_password"))])
+async def forgot_password(password_reset: PasswordReset, db: AsyncSession = Depends(get_async_db)):
     """Send password reset email."""
-    user = db.query(User).filter(User.email == password_reset.email).first()
+    user = await db.scalar(select(User).where(User.email == password_reset.email))
     if not user:
         # Don't reveal if email exists or not
         return {"message": "If the email exists, a password reset link has been sent."}
@@ -108,8 +125,8 @@ def forgot_password(password_reset: PasswordReset, db: Session = Depends(get_db)
     # For now, we'll just return a success message
     return {"message": "If the email exists, a password reset link has been sent."}
 
-@router.post("/reset-password")
-def reset_password(password_reset: PasswordResetConfirm, db: Session = Depends(get_db)):
+@router.post("/reset-password", dependencies=[Depends(rate_limit("auth_password"))])
+async def reset_password(password_reset: PasswordResetConfirm, db: AsyncSession = Depends(get_async_db)):
     """Reset user password with token."""
     email = verify_token(password_reset.token)
     if not email:
@@ -118,7 +135,7 @@ def reset_password(password_reset: PasswordResetConfirm, db: Session = Depends(g
             detail="Invalid or expired token"
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -126,7 +143,8 @@ def reset_password(password_reset: PasswordResetConfirm, db: Session = Depends(g
         )
     
     # Update password
-    user.hashed_password = get_password_hash(password_reset.new_password)
-    db.commit()
+    user.hashed_password = await password_pool.hash(password_reset.new_password)
+    await db.commit()
+    await user_cache.invalidate_user(user.id)
     
     return {"message": "Password updated successfully"}
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
 
-from app.core.database import get_db
-from app.models.user import User
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.pagination import count_cache, newest_first, split_page
+from app.core.rate_limit import rate_limit
+from app.core.serialization import RowEncoder, json_bytes_response
+from app.schemas.user import User as UserSchema
 from app.models.chat import ChatSession, ChatMessage
 from app.schemas.chat import (
     ChatSessionCreate,
     ChatSession as ChatSessionSchema,
+    ChatSessionInDB,
+    ChatSessionSummary,
     ChatMessageCreate,
     ChatMessageResponse,
     ChatHistory
@@ -16,62 +25,136 @@ from app.api.v1.endpoints.auth import get_current_user
 
 router = APIRouter()
 
+# Message lists are encoded straight from the rows, skipping per-row validation
+message_encoder = RowEncoder(ChatMessageResponse)
+
 @router.post("/sessions", response_model=ChatSessionSchema)
-def create_chat_session(
+async def create_chat_session(
     session_data: ChatSessionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new chat session."""
     db_session = ChatSession(
         user_id=current_user.id,
-        session_name=session_data.session_name
+        session_name=session_data.session_name,
+        messages=[]
     )
     
     db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
+    await db.commit()
+    count_cache.invalidate(ChatSession, current_user.id)
+    # Only the server-side default needs reloading; a full refresh would
+    # expire the empty messages collection and force a lazy load
+    await db.refresh(db_session, ["created_at"])
     
     return db_session
 
+async def _load_latest_messages(db: AsyncSession, sessions: List[ChatSession], limit: int):
+    """Attach each session's `limit` most recent messages, oldest first, in one query."""
+    if not sessions:
+        return
+    position = func.row_number().over(
+        partition_by=ChatMessage.session_id,
+        order_by=(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+    ).label("position")
+    ranked = select(ChatMessage, position).where(
+        ChatMessage.session_id.in_([session.id for session in sessions])
+    ).subquery()
+    latest = aliased(ChatMessage, ranked)
+    messages = (await db.scalars(
+        select(latest).where(ranked.c.position <= limit).order_by(latest.created_at, latest.id)
+    )).all()
+    
+    by_session = {session.id: [] for session in sessions}
+    for message in messages:
+        by_session[message.session_id].append(message)
+    for session in sessions:
+        set_committed_value(session, "messages", by_session[session.id])
+
+async def _summarize(db: AsyncSession, query) -> List[ChatSessionSummary]:
+    """Run a session page query with each session's message count and last message joined in."""
+    message_count = select(func.count(ChatMessage.id)).where(
+        ChatMessage.session_id == ChatSession.id
+    ).correlate(ChatSession).scalar_subquery()
+    last_message_id = select(ChatMessage.id).where(
+        ChatMessage.session_id == ChatSession.id
+    ).correlate(ChatSession).order_by(
+        ChatMessage.created_at.desc(), ChatMessage.id.desc()
+    ).limit(1).scalar_subquery()
+    LastMessage = aliased(ChatMessage)
+    
+    rows = (await db.execute(
+        query.add_columns(message_count, LastMessage).outerjoin(LastMessage, LastMessage.id == last_message_id)
+    )).all()
+    return [
+        ChatSessionSummary(
+            **ChatSessionInDB.model_validate(session).model_dump(),
+            message_count=count,
+            last_message=last_message
+        )
+        for session, count, last_message in rows
+    ]
+
 @router.get("/sessions", response_model=ChatHistory)
-def get_chat_sessions(
+async def get_chat_sessions(
     page: int = 1,
     per_page: int = 10,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    summary: bool = False,
+    messages_limit: Optional[int] = Query(None, ge=1),
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get user's chat sessions."""
-    offset = (page - 1) * per_page
+    """Get user's chat sessions.
     
-    # Get total count
-    total_count = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id
-    ).count()
+    Pass the previous response's `next_cursor` as `cursor` for keyset paging,
+    which costs the same on every page; `page` alone keeps offset paging.
+    With `summary=true` each session carries its message count and last
+    message instead of the full message list; otherwise `messages_limit`
+    caps the embedded messages to the most recent ones per session.
+    """
+    query = select(ChatSession).where(ChatSession.user_id == current_user.id)
+    query = newest_first(query, ChatSession, cursor)
+    if not cursor:
+        query = query.offset((page - 1) * per_page)
+    query = query.limit(per_page + 1)
     
-    # Get sessions with pagination
-    sessions = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id
-    ).order_by(ChatSession.created_at.desc()).offset(offset).limit(per_page).all()
+    # Get sessions with pagination; async sessions cannot lazy load, so
+    # messages are loaded up front in a fixed number of queries
+    if summary:
+        rows = await _summarize(db, query)
+    elif messages_limit:
+        rows = (await db.scalars(query)).all()
+        await _load_latest_messages(db, rows[:per_page], messages_limit)
+    else:
+        rows = (await db.scalars(query.options(selectinload(ChatSession.messages)))).all()
+    sessions, cursor_after = split_page(rows, per_page)
+    
+    total_count = None
+    if include_total:
+        total_count = await count_cache.get_or_count(db, ChatSession, current_user.id)
     
     return ChatHistory(
         sessions=sessions,
         total_count=total_count,
-        page=page,
-        per_page=per_page
+        page=None if cursor else page,
+        per_page=per_page,
+        next_cursor=cursor_after
     )
 
 @router.get("/sessions/{session_id}", response_model=ChatSessionSchema)
-def get_chat_session(
+async def get_chat_session(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific chat session with messages."""
-    session = db.query(ChatSession).filter(
+    session = await db.scalar(select(ChatSession).where(
         ChatSession.id == session_id,
         ChatSession.user_id == current_user.id
-    ).first()
+    ).options(selectinload(ChatSession.messages)))
     
     if not session:
         raise HTTPException(
@@ -81,19 +164,20 @@ def get_chat_session(
     
     return session
 
-@router.post("/sessions/{session_id}/messages", response_model=ChatMessageResponse)
-def send_message(
+@router.post("/sessions/{session_id}/messages", response_model=ChatMessageResponse,
+             dependencies=[Depends(rate_limit("chat_message"))])
+async def send_message(
     session_id: int,
     message_data: ChatMessageCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message in a chat session."""
     # Verify session exists and belongs to user
-    session = db.query(ChatSession).filter(
+    session = await db.scalar(select(ChatSession).where(
         ChatSession.id == session_id,
         ChatSession.user_id == current_user.id
-    ).first()
+    ))
     
     if not session:
         raise HTTPException(
@@ -109,10 +193,6 @@ def send_message(
         is_user_message=True
     )
     
-    db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
-    
     # TODO: Process message with AI and create response
     # For now, we'll create a placeholder response
     ai_response = "Thank you for your message. I'm here to help with your mental health concerns. How are you feeling today?"
@@ -127,24 +207,26 @@ def send_message(
         ai_model_used="placeholder"
     )
     
-    db.add(ai_message)
-    db.commit()
-    db.refresh(ai_message)
+    # Both messages go in one transaction; only the server-set timestamp
+    # of the returned message needs reading back
+    db.add_all([db_message, ai_message])
+    await db.commit()
+    await db.refresh(db_message, ["created_at"])
     
     return db_message
 
 @router.get("/sessions/{session_id}/messages", response_model=List[ChatMessageResponse])
-def get_session_messages(
+async def get_session_messages(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all messages in a chat session."""
     # Verify session exists and belongs to user
-    session = db.query(ChatSession).filter(
+    session = await db.scalar(select(ChatSession).where(
         ChatSession.id == session_id,
         ChatSession.user_id == current_user.id
-    ).first()
+    ))
     
     if not session:
         raise HTTPException(
@@ -152,23 +234,83 @@ def get_session_messages(
             detail="Chat session not found"
         )
     
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session_id
-    ).order_by(ChatMessage.created_at.asc()).all()
+    messages = (await db.scalars(
+        select(ChatMessage).where(
+            ChatMessage.session_id == session_id
+        ).order_by(ChatMessage.created_at.asc())
+    )).all()
     
-    return messages
+    return json_bytes_response(message_encoder.encode(messages))
+
+# Rows fetched per round trip while streaming an export
+EXPORT_CHUNK_SIZE = 1000
+
+async def _export_messages(session_id: int, since_id: Optional[int]):
+    """Yield a session's messages as NDJSON lines, reading them through a server-side cursor."""
+    query = select(
+        ChatMessage.id,
+        ChatMessage.message,
+        ChatMessage.response,
+        ChatMessage.is_user_message,
+        ChatMessage.created_at
+    ).where(ChatMessage.session_id == session_id)
+    if since_id is not None:
+        resume_after = select(ChatMessage.created_at, ChatMessage.id).where(
+            ChatMessage.id == since_id
+        ).scalar_subquery()
+        query = query.where(tuple_(ChatMessage.created_at, ChatMessage.id) > resume_after)
+    # Same order as the (session_id, created_at, id) index, so rows stream without a sort
+    query = query.order_by(ChatMessage.created_at, ChatMessage.id).execution_options(
+        yield_per=EXPORT_CHUNK_SIZE
+    )
+    
+    # The request's session may be closed before the body is sent, so the
+    # export reads through its own
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield message_encoder.encode_lines(rows)
+
+@router.get("/sessions/{session_id}/messages/export")
+async def export_session_messages(
+    session_id: int,
+    since_id: Optional[int] = None,
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream all messages in a chat session as newline-delimited JSON.
+    
+    Messages are sent oldest first; pass the last id received as `since_id`
+    to resume an interrupted export.
+    """
+    # Verify session exists and belongs to user
+    session = await db.scalar(select(ChatSession.id).where(
+        ChatSession.id == session_id,
+        ChatSession.user_id == current_user.id
+    ))
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found"
+        )
+    
+    return StreamingResponse(
+        _export_messages(session_id, since_id),
+        media_type="application/x-ndjson"
+    )
 
 @router.delete("/sessions/{session_id}")
-def delete_chat_session(
+async def delete_chat_session(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a chat session."""
-    session = db.query(ChatSession).filter(
+    session = await db.scalar(select(ChatSession).where(
         ChatSession.id == session_id,
         ChatSession.user_id == current_user.id
-    ).first()
+    ))
     
     if not session:
         raise HTTPException(
@@ -176,7 +318,8 @@ def delete_chat_session(
             detail="Chat session not found"
         )
     
-    db.delete(session)
-    db.commit()
+    await db.delete(session)
+    await db.commit()
+    count_cache.invalidate(ChatSession, current_user.id)
     
     return {"message": "Chat session deleted successfully"}
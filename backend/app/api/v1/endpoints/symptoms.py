@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import datetime
+import logging
 
-from app.core.database import get_db
-from app.models.user import User
+from app.core.database import get_async_db
+from app.core.config import settings
+from app.core.pagination import count_cache, newest_first, split_page
+from app.core.rate_limit import ROUTE_COSTS, client_ip, raise_busy, rate_limit, rate_limiter
+from app.core.serialization import RowEncoder, json_bytes_response
+from app.schemas.user import User as UserSchema
 from app.models.symptom import SymptomSubmission
 from app.schemas.symptom import (
     SymptomSubmissionCreate, 
@@ -13,98 +20,168 @@ from app.schemas.symptom import (
     SymptomPrediction
 )
 from app.api.v1.endpoints.auth import get_current_user
-from app.services.ai_service import AIService
+from app.services.ai_service import AIService, get_ai_service
+from app.services.analysis_jobs import FAILED, PENDING, analysis_queue, completed_values
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/submit", response_model=SymptomSubmissionSchema)
-def submit_symptoms(
+# Upper bound on items accepted by /submit-batch in one request
+MAX_BATCH_SIZE = 500
+
+# History pages are encoded straight from the rows, skipping per-row validation
+submission_encoder = RowEncoder(SymptomSubmissionSchema)
+
+def admit_ai_work(ai_service: AIService):
+    """Shed new analysis work with 503 + Retry-After once too much is already queued."""
+    depth = ai_service.pending()
+    if analysis_queue is not None:
+        depth += analysis_queue.pending() or 0
+    if depth >= settings.AI_SHED_QUEUE_DEPTH:
+        raise_busy("Analysis is backed up, please retry shortly", settings.AI_SHED_RETRY_AFTER_SECONDS)
+
+@router.post("/submit", response_model=SymptomSubmissionSchema, dependencies=[Depends(rate_limit("symptoms_submit"))])
+async def submit_symptoms(
     symptom_data: SymptomSubmissionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    ai_service: AIService = Depends(get_ai_service)
 ):
-    """Submit symptoms for AI analysis."""
-    # Create symptom submission record
+    """Submit symptoms for AI analysis.
+    
+    The submission is stored with `status=pending` and analysed by the
+    background workers, which push a `symptom_analysis` frame over the
+    user's WebSocket when done (or poll `GET /{submission_id}`). With
+    SYMPTOM_ANALYSIS_BACKEND=inline it is analysed before it is stored.
+    """
+    admit_ai_work(ai_service)
+    values = {"status": PENDING}
+    if analysis_queue is None:
+        try:
+            prediction = await run_in_threadpool(ai_service.predict_mental_health, **symptom_data.model_dump())
+            values = completed_values(prediction)
+        except Exception as e:
+            logger.error(f"AI prediction error: {e}")
+            values = {"status": FAILED}
+    
+    # One write transaction, with the results already in the row when analysed inline
     db_submission = SymptomSubmission(
         user_id=current_user.id,
         input_text=symptom_data.input_text,
         selected_symptoms=symptom_data.selected_symptoms,
         mood_rating=symptom_data.mood_rating,
         sleep_hours=symptom_data.sleep_hours,
-        stress_level=symptom_data.stress_level
+        stress_level=symptom_data.stress_level,
+        **values
     )
     
     db.add(db_submission)
-    db.commit()
-    db.refresh(db_submission)
-    
-    # Get AI prediction
-    try:
-        ai_service = AIService()
-        prediction = ai_service.predict_mental_health(
-            input_text=symptom_data.input_text,
-            selected_symptoms=symptom_data.selected_symptoms,
-            mood_rating=symptom_data.mood_rating,
-            sleep_hours=symptom_data.sleep_hours,
-            stress_level=symptom_data.stress_level
-        )
-        
-        # Update submission with AI results
-        db_submission.predicted_disorder = prediction.predicted_disorder
-        db_submission.confidence_score = prediction.confidence_score
-        db_submission.severity_level = prediction.severity_level
-        db_submission.recommendations = prediction.recommendations
-        db_submission.next_steps = prediction.next_steps
-        db_submission.emergency_contact_suggested = prediction.emergency_contact_suggested
-        
-        db.commit()
-        db.refresh(db_submission)
-        
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"AI prediction error: {str(e)}")
-        # You might want to use proper logging here
+    await db.commit()
+    await db.refresh(db_submission, ["created_at"])
+    count_cache.invalidate(SymptomSubmission, current_user.id)
+    
+    if analysis_queue is not None:
+        await analysis_queue.enqueue(db_submission.id, current_user.id, symptom_data)
     
     return db_submission
 
+@router.post("/submit-batch", response_model=List[SymptomSubmissionSchema])
+async def submit_symptoms_batch(
+    request: Request,
+    batch: List[SymptomSubmissionCreate],
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """Submit many symptom questionnaires for AI analysis in one request."""
+    if not batch:
+        return []
+    if len(batch) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch cannot contain more than {MAX_BATCH_SIZE} submissions"
+        )
+    # Charged per item, so one large batch costs about as much as its items sent one by one
+    if rate_limiter is not None:
+        await rate_limiter.check("symptoms_batch", client_ip(request), current_user.email,
+                                 cost=ROUTE_COSTS["symptoms_batch"] * len(batch))
+    admit_ai_work(ai_service)
+    
+    # Scoring hundreds of texts is CPU work; keep it off the event loop
+    predictions = await run_in_threadpool(ai_service.predict_batch, batch)
+    rows = [
+        {
+            "user_id": current_user.id,
+            "input_text": item.input_text,
+            "selected_symptoms": item.selected_symptoms,
+            "mood_rating": item.mood_rating,
+            "sleep_hours": item.sleep_hours,
+            "stress_level": item.stress_level,
+            **prediction.model_dump()
+        }
+        for item, prediction in zip(batch, predictions)
+    ]
+    
+    # One multi-row INSERT ... RETURNING. render_nulls keeps every row on the same
+    # column set so SQLAlchemy does not split the batch; sort_by_parameter_order
+    # returns the rows in input order, which the database does not guarantee.
+    submissions = (await db.scalars(
+        insert(SymptomSubmission).returning(SymptomSubmission, sort_by_parameter_order=True),
+        rows,
+        execution_options={"render_nulls": True}
+    )).all()
+    await db.commit()
+    count_cache.invalidate(SymptomSubmission, current_user.id)
+    
+    return submissions
+
 @router.get("/history", response_model=SymptomHistory)
-def get_symptom_history(
+async def get_symptom_history(
     page: int = 1,
     per_page: int = 10,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get user's symptom submission history."""
-    offset = (page - 1) * per_page
+    """Get user's symptom submission history.
     
-    # Get total count
-    total_count = db.query(SymptomSubmission).filter(
-        SymptomSubmission.user_id == current_user.id
-    ).count()
+    Pass the previous response's `next_cursor` as `cursor` for keyset paging,
+    which costs the same on every page; `page` alone keeps offset paging.
+    """
+    query = select(SymptomSubmission).where(SymptomSubmission.user_id == current_user.id)
+    query = newest_first(query, SymptomSubmission, cursor)
+    if not cursor:
+        query = query.offset((page - 1) * per_page)
     
     # Get submissions with pagination
-    submissions = db.query(SymptomSubmission).filter(
-        SymptomSubmission.user_id == current_user.id
-    ).order_by(SymptomSubmission.created_at.desc()).offset(offset).limit(per_page).all()
+    rows = (await db.scalars(query.limit(per_page + 1))).all()
+    submissions, cursor_after = split_page(rows, per_page)
     
-    return SymptomHistory(
-        submissions=submissions,
+    total_count = None
+    if include_total:
+        total_count = await count_cache.get_or_count(db, SymptomSubmission, current_user.id)
+    
+    return json_bytes_response(submission_encoder.encode_page(
+        "submissions", submissions,
         total_count=total_count,
-        page=page,
-        per_page=per_page
-    )
+        page=None if cursor else page,
+        per_page=per_page,
+        next_cursor=cursor_after
+    ))
 
 @router.get("/{submission_id}", response_model=SymptomSubmissionSchema)
-def get_symptom_submission(
+async def get_symptom_submission(
     submission_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific symptom submission."""
-    submission = db.query(SymptomSubmission).filter(
+    submission = await db.scalar(select(SymptomSubmission).where(
         SymptomSubmission.id == submission_id,
         SymptomSubmission.user_id == current_user.id
-    ).first()
+    ))
     
     if not submission:
         raise HTTPException(
@@ -115,16 +192,16 @@ def get_symptom_submission(
     return submission
 
 @router.delete("/{submission_id}")
-def delete_symptom_submission(
+async def delete_symptom_submission(
     submission_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a symptom submission."""
-    submission = db.query(SymptomSubmission).filter(
+    submission = await db.scalar(select(SymptomSubmission).where(
         SymptomSubmission.id == submission_id,
         SymptomSubmission.user_id == current_user.id
-    ).first()
+    ))
     
     if not submission:
         raise HTTPException(
@@ -132,7 +209,10 @@ def delete_symptom_submission(
             detail="Symptom submission not found"
         )
     
-    db.delete(submission)
-    db.commit()
+    await db.delete(submission)
+    await db.commit()
+    count_cache.invalidate(SymptomSubmission, current_user.id)
+    if analysis_queue is not None:
+        analysis_queue.cancel(submission_id)
     
     return {"message": "Symptom submission deleted successfully"}
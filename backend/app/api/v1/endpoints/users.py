@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.user_cache import user_cache
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
 from app.api.v1.endpoints.auth import get_current_user
@@ -10,25 +12,25 @@ from app.api.v1.endpoints.auth import get_current_user
 router = APIRouter()
 
 @router.get("/me", response_model=UserSchema)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserSchema = Depends(get_current_user)):
     """Get current user information."""
     return current_user
 
 @router.put("/me", response_model=UserSchema)
-def update_current_user(
+async def update_current_user(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update current user information."""
     update_data = user_update.dict(exclude_unset=True)
     
     # Check if email is being changed and if it's already taken
     if "email" in update_data:
-        existing_user = db.query(User).filter(
+        existing_user = await db.scalar(select(User).where(
             User.email == update_data["email"],
             User.id != current_user.id
-        ).first()
+        ))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,33 +39,37 @@ def update_current_user(
     
     # Check if username is being changed and if it's already taken
     if "username" in update_data:
-        existing_user = db.query(User).filter(
+        existing_user = await db.scalar(select(User).where(
             User.username == update_data["username"],
             User.id != current_user.id
-        ).first()
+        ))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
     
-    # Update user
+    # Update user; current_user is a cached snapshot, so load the row itself
+    user = await db.get(User, current_user.id)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(user)
+    await user_cache.invalidate_user(user.id)
     
-    return current_user
+    return user
 
 @router.delete("/me")
-def delete_current_user(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def delete_current_user(
+    current_user: UserSchema = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete current user account."""
     # Soft delete - mark as inactive
-    current_user.is_active = False
-    db.commit()
+    user = await db.get(User, current_user.id)
+    user.is_active = False
+    await db.commit()
+    await user_cache.invalidate_user(user.id)
     
     return {"message": "Account deleted successfully"}
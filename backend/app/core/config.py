@@ -1,23 +1,112 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./neuroq.db"
     TEST_DATABASE_URL: str = "sqlite:///./neuroq_test.db"
+    # Engine profile: "dev", "sqlite-prod", "postgres-prod", or "auto" (dev when DEBUG, else by URL);
+    # see app.core.database.ENGINE_PROFILES. The values below override the profile when set.
+    DATABASE_PROFILE: str = "auto"
+    DATABASE_POOL_SIZE: Optional[int] = None
+    DATABASE_MAX_OVERFLOW: Optional[int] = None
+    DATABASE_POOL_TIMEOUT: Optional[float] = None
+    # Fraction of SQL statements logged (0 to 1)
+    SQL_LOG_SAMPLE_RATE: Optional[float] = None
+    # "create" makes missing tables on every startup; "migrate" leaves the schema to
+    # `python -m app.migrate`, run once per deploy before the workers start
+    DATABASE_SCHEMA_MODE: str = "create"
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing (bcrypt cost; stored hashes at another cost are upgraded on login)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    # Chat reply generation ("keyword" canned replies, or "openai" for any OpenAI-compatible server)
+    LLM_BACKEND: str = "keyword"
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    
     # OpenAI
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    
+    # Chat reply cache ("memory" per worker, "redis" adds a tier shared by all workers, or "off")
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    RESPONSE_CACHE_MAX_SIZE: int = 5000
+    RESPONSE_CACHE_MAX_MESSAGE_CHARS: int = 200
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Authenticated-user cache ("memory" per worker, or "redis" shared by all workers)
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # WebSocket outbound queue per connection; a client that falls this far behind is disconnected
+    WS_SEND_QUEUE_SIZE: int = 256
+    # "local" delivers to this process only; "redis" relays pushes between workers via pub/sub
+    WS_DELIVERY_BACKEND: str = "local"
+    
+    # Chat messages from WebSockets are written in bulk, by batch size or after the flush interval
+    CHAT_WRITE_BATCH_SIZE: int = 500
+    CHAT_WRITE_FLUSH_INTERVAL_MS: int = 200
+    CHAT_WRITE_MAX_PENDING: int = 10000
+    
+    # Symptom classifier ("keyword" heuristic, "transformer" for a local Hugging Face classifier on CPU,
+    # or "embedding" for similarity to per-label centroids from a local encoder)
+    SYMPTOM_MODEL_BACKEND: str = "keyword"
+    TRANSFORMER_MODEL_DIR: str = "./ai_models/classifier"
+    # "torch" (dynamic int8 when quantized) or "onnx" (ONNX Runtime on the exported model)
+    TRANSFORMER_ENGINE: str = "torch"
+    TRANSFORMER_QUANTIZE: bool = True
+    TRANSFORMER_MAX_LENGTH: int = 128
+    TRANSFORMER_NUM_THREADS: int = 0
+    # Concurrent predictions are batched up to this size, waiting at most this long for company
+    TRANSFORMER_MAX_BATCH_SIZE: int = 32
+    TRANSFORMER_MAX_WAIT_MS: float = 5
+    EMBEDDING_MODEL_DIR: str = "./ai_models/embedder"
+    # Where the label centroid matrix is saved (memory-mapped on load); empty means the model directory
+    EMBEDDING_CENTROIDS_DIR: str = ""
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_TEMPERATURE: float = 0.05
+    # Model loading: "startup" before serving, "background" right after serving starts
+    # (early requests load it themselves), or "off" to load on first use
+    AI_WARMUP: str = "startup"
+    
+    # Symptom analysis: "asyncio" worker pool in this process, "celery" workers, or "inline" in the request
+    SYMPTOM_ANALYSIS_BACKEND: str = "asyncio"
+    SYMPTOM_ANALYSIS_WORKERS: int = 2
+    SYMPTOM_ANALYSIS_BATCH_SIZE: int = 64
+    SYMPTOM_ANALYSIS_MAX_PENDING: int = 10000
+    
+    # Token-bucket rate limits ("memory" per worker, "redis" shared by all workers, or "off");
+    # each route's cost is in app.core.rate_limit.ROUTE_COSTS
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_USER_RATE: float = 2.0
+    RATE_LIMIT_USER_BURST: float = 60
+    RATE_LIMIT_IP_RATE: float = 10.0
+    RATE_LIMIT_IP_BURST: float = 200
+    # Per-account bucket for logins, shared by every IP trying that account
+    RATE_LIMIT_ACCOUNT_RATE: float = 1.0
+    RATE_LIMIT_ACCOUNT_BURST: float = 100
+    # New AI work is refused with 503 once this much is queued
+    AI_SHED_QUEUE_DEPTH: int = 1000
+    AI_SHED_RETRY_AFTER_SECONDS: int = 5
+    # WebSocket chat messages are refused while this many replies are being generated
+    CHAT_SHED_ACTIVE_REPLIES: int = 200
+    
+    # Prometheus metrics at /metrics (request latency, pools, sockets, inference)
+    METRICS_ENABLED: bool = True
+    
     # App Settings
     DEBUG: bool = True
     HOST: str = "0.0.0.0"
@@ -1,19 +1,154 @@
-from sqlalchemy import create_engine
+from typing import Dict, NamedTuple, Optional, Tuple
+import logging
+import random
+from sqlalchemy import DateTime, create_engine, event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=settings.DEBUG
-)
+sql_logger = logging.getLogger("app.sql")
+
+class EngineProfile(NamedTuple):
+    """Pool, logging and SQLite connection settings for one kind of deployment."""
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pool_pre_ping: bool
+    # Fraction of statements logged to "app.sql"; 0 registers no listener at all
+    log_sample_rate: float
+    # PRAGMAs run on every new SQLite connection
+    sqlite_pragmas: Tuple[Tuple[str, str], ...] = ()
+
+ENGINE_PROFILES: Dict[str, EngineProfile] = {
+    # Local development: small pool, a sample of statements in the log
+    "dev": EngineProfile(
+        pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=300, pool_pre_ping=True,
+        log_sample_rate=0.1,
+        sqlite_pragmas=(("busy_timeout", "5000"),),
+    ),
+    # One SQLite file per host. WAL lets readers run alongside the single
+    # writer, synchronous=NORMAL syncs at checkpoints rather than every commit
+    # (still safe against corruption in WAL mode), and reads are memory-mapped.
+    # Local files need no pre-ping or recycling.
+    "sqlite-prod": EngineProfile(
+        pool_size=8, max_overflow=8, pool_timeout=30, pool_recycle=-1, pool_pre_ping=False,
+        log_sample_rate=0.0,
+        sqlite_pragmas=(
+            ("journal_mode", "WAL"),
+            ("synchronous", "NORMAL"),
+            ("busy_timeout", "5000"),
+            ("mmap_size", str(256 * 1024 * 1024)),
+        ),
+    ),
+    # PostgreSQL behind a network: a larger pool per worker, fail fast when it
+    # is exhausted, and recycle before server or proxy idle timeouts
+    "postgres-prod": EngineProfile(
+        pool_size=20, max_overflow=10, pool_timeout=10, pool_recycle=1800, pool_pre_ping=True,
+        log_sample_rate=0.0,
+    ),
+}
+
+def resolve_engine_profile(database_url: str, name: str = "auto") -> EngineProfile:
+    """The named profile with any DATABASE_POOL_* / SQL_LOG_SAMPLE_RATE overrides applied.
+
+    "auto" is "dev" with DEBUG on, else the production profile for the URL's backend.
+    """
+    if name == "auto":
+        if settings.DEBUG:
+            name = "dev"
+        else:
+            name = "postgres-prod" if make_url(database_url).get_backend_name() == "postgresql" else "sqlite-prod"
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database profile '{name}'; expected one of {', '.join(ENGINE_PROFILES)}")
+    overrides = {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "log_sample_rate": settings.SQL_LOG_SAMPLE_RATE,
+    }
+    return ENGINE_PROFILES[name]._replace(**{key: value for key, value in overrides.items() if value is not None})
+
+def _engine_options(database_url: str, profile: EngineProfile, is_async: bool) -> dict:
+    url = make_url(database_url)
+    # Statements are logged by the sampling listener, never by echo
+    options = {"echo": False}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory databases live in their one connection; keep SQLAlchemy's default pool
+        return options
+    options.update(
+        poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=profile.pool_timeout,
+        pool_recycle=profile.pool_recycle,
+        pool_pre_ping=profile.pool_pre_ping,
+    )
+    return options
+
+def _instrument(sync_engine: Engine, profile: EngineProfile):
+    if sync_engine.dialect.name == "sqlite" and profile.sqlite_pragmas:
+        @event.listens_for(sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma, value in profile.sqlite_pragmas:
+                cursor.execute(f"PRAGMA {pragma}={value}")
+            cursor.close()
+
+    if profile.log_sample_rate > 0:
+        rate = profile.log_sample_rate
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def log_sampled_statement(conn, cursor, statement, parameters, context, executemany):
+            if rate >= 1 or random.random() < rate:
+                sql_logger.info("%s %r", statement, parameters)
+
+def create_engines(database_url: str, profile: EngineProfile) -> Tuple[Engine, AsyncEngine]:
+    """Build the sync and async engines for a database URL under a profile."""
+    sync_engine = create_engine(database_url, **_engine_options(database_url, profile, is_async=False))
+    async_engine = create_async_engine(
+        get_async_database_url(database_url), **_engine_options(database_url, profile, is_async=True)
+    )
+    _instrument(sync_engine, profile)
+    _instrument(async_engine.sync_engine, profile)
+    return sync_engine, async_engine
+
+# Async drivers used for each sync backend in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto the matching async driver."""
+    url = make_url(database_url)
+    async_driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if async_driver is None:
+        raise ValueError(f"No async driver configured for database URL '{url.drivername}'")
+    return url.set(drivername=async_driver).render_as_string(hide_password=False)
+
+# Create database engines (aiosqlite locally, asyncpg in production for the async one)
+engine_profile = resolve_engine_profile(settings.DATABASE_URL, settings.DATABASE_PROFILE)
+engine, async_engine = create_engines(settings.DATABASE_URL, engine_profile)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async session factory; objects stay usable after commit so responses
+# can be serialized without a lazy reload, which async sessions cannot do
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Timestamp column type. SQLite's CURRENT_TIMESTAMP has no fractional seconds,
+# so bind datetimes without them too; otherwise stored values never compare
+# equal to bound ones and (created_at, id) keyset cursors skip or repeat rows.
+Timestamp = DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
 # Create base class for models
 Base = declarative_base()
 
@@ -24,3 +159,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
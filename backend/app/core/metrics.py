@@ -0,0 +1,174 @@
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Tuple, Union
+import threading
+import time
+
+# Latency buckets in seconds, Prometheus' defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Starlette appends "; charset=utf-8" to text/ media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    """Latency histogram with one series per label tuple.
+
+    `observe` is one bucket lookup and two additions under a lock (inference
+    timings arrive from worker threads); counts are made cumulative only
+    when rendered. Keep label values to a bounded set such as route
+    templates, never raw paths or ids.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._series: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, seconds: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, seconds)] += 1
+            series[-1] += seconds
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+class Gauge:
+    """Value read from the running app when /metrics is scraped, so updating it costs nothing.
+
+    `collect` returns a number, or a dict of label tuples to numbers.
+    """
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Union[float, Dict[Tuple, float]]],
+                 label_names: Tuple[str, ...] = (), kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.collect = collect
+        self.label_names = label_names
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Union[Histogram, Gauge]] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Global metrics registry
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = metrics.register(Histogram(
+    "neuroq_http_request_duration_seconds", "HTTP request latency by route template, method and status",
+    ("route", "method", "status"),
+))
+AI_INFERENCE_SECONDS = metrics.register(Histogram(
+    "neuroq_ai_inference_duration_seconds", "Symptom analysis latency by model backend and operation",
+    ("backend", "operation"),
+))
+CHAT_REPLY_SECONDS = metrics.register(Histogram(
+    "neuroq_chat_reply_duration_seconds", "Time to generate a full chat reply, by source (llm or cache)",
+    ("source",),
+))
+
+def observe_time(histogram: Histogram, labels: Tuple):
+    """Decorator timing every call of a sync function into `histogram`."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(labels, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing HTTP requests into HTTP_REQUEST_SECONDS.
+
+    Requests are labelled by the matched route's path template (looked up
+    from the endpoint the router stored in the scope), so /chat/sessions/1
+    and /chat/sessions/2 share a series; unmatched paths share "unmatched".
+    WebSockets pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: Dict[Callable, str] = {}
+
+    def _route_template(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            # Routes are fixed once the app is serving; map them all on first use
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is not None:
+                    self._templates.setdefault(route.endpoint, route.path)
+            template = self._templates.setdefault(endpoint, "unmatched")
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                (self._route_template(scope), scope["method"], status_code), time.perf_counter() - started
+            )
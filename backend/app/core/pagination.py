@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import base64
+import json
+import time
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor string."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def newest_first(query, model, cursor: Optional[str]):
+    """Order a query by (created_at, id) descending, starting after `cursor` if given."""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Bind the cursor with the column's own type so SQLite compares equal strings
+        position = tuple_(literal(created_at, model.created_at.type), literal(row_id, model.id.type))
+        query = query.where(tuple_(model.created_at, model.id) < position)
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+def split_page(rows, per_page: int):
+    """Split rows fetched with limit(per_page + 1) into the page and the next cursor."""
+    if len(rows) <= per_page:
+        return rows, None
+    page = rows[:per_page]
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
+
+class CountCache:
+    """Short-lived per-user row counts, so list endpoints skip COUNT(*) on most calls.
+
+    Counts are dropped by the endpoints that add or remove rows in this
+    worker; the TTL bounds staleness from writes handled by other workers.
+    """
+
+    def __init__(self, ttl_seconds: int = 30, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._counts: Dict[Tuple[str, int], Tuple[int, float]] = {}
+
+    async def get_or_count(self, db: AsyncSession, model, user_id: int) -> int:
+        key = (model.__tablename__, user_id)
+        entry = self._counts.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        count = await db.scalar(
+            select(func.count()).select_from(model).where(model.user_id == user_id)
+        )
+        if len(self._counts) >= self.max_size:
+            now = time.monotonic()
+            self._counts = {k: v for k, v in self._counts.items() if v[1] > now}
+            while len(self._counts) >= self.max_size:
+                self._counts.pop(next(iter(self._counts)))
+        self._counts[key] = (count, time.monotonic() + self.ttl_seconds)
+        return count
+
+    def invalidate(self, model, user_id: int):
+        self._counts.pop((model.__tablename__, user_id), None)
+
+# Global per-user count cache
+count_cache = CountCache()
@@ -0,0 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+import asyncio
+import logging
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def _context_for(rounds: int) -> CryptContext:
+    """bcrypt context pinned to one cost, so hashes at any other cost need an update."""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+# Worker-side functions; module level so they can be pickled into the pool
+def _hash(password: str, rounds: int) -> str:
+    return _context_for(rounds).hash(password)
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _context_for(rounds).verify_and_update(password, hashed_password)
+
+def _warm_up(rounds: int) -> None:
+    _context_for(rounds)
+
+class PasswordHasherPool:
+    """Runs bcrypt in a size-limited process pool so it never holds the server's GIL.
+
+    At most `max_pending` operations may be queued or running; beyond that
+    callers get a 503 instead of piling up behind a login burst. With zero
+    workers the operations fall back to Starlette's thread pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured cost."""
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also return a new hash if the stored one uses another cost."""
+        return await self._run(_verify_and_update, password, hashed_password, self.rounds)
+
+    def start(self):
+        """Spawn the worker processes ahead of the first login."""
+        if self.workers > 0:
+            self._get_executor().submit(_warm_up, self.rounds)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+# Global password hasher pool
+password_pool = PasswordHasherPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.BCRYPT_ROUNDS,
+)
@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+import time
+
+from fastapi import HTTPException, Request, status
+from starlette.requests import HTTPConnection
+
+from app.core.config import settings
+from app.core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+# Tokens each route takes from a bucket; a bucket refills at RATE_LIMIT_*_RATE tokens per second
+ROUTE_COSTS: Dict[str, float] = {
+    "auth_login": 10,       # bcrypt verify
+    "auth_signup": 10,      # bcrypt hash
+    "auth_password": 10,    # password reset / change
+    "symptoms_submit": 5,   # model inference
+    "symptoms_batch": 0.1,  # per item in the batch
+    "chat_message": 1,      # message write (replies are not generated over REST yet)
+    "ws_message": 2,        # reply generation over the WebSocket
+}
+
+def raise_busy(detail: str, retry_after: float, status_code: int = status.HTTP_503_SERVICE_UNAVAILABLE):
+    """Reject a request with a Retry-After header (whole seconds, at least 1)."""
+    raise HTTPException(
+        status_code=status_code,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+class TokenBucketLimiter:
+    """Per-key token buckets held in this process.
+
+    A bucket starts full at `burst` tokens and refills at `rate` tokens per
+    second; a request that costs more tokens than are left is refused with
+    the time until enough have refilled. Idle buckets are full again after
+    burst / rate seconds, so only the `max_keys` most recent are kept.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.limited = 0
+        # key -> (tokens, updated_at)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        """Take `cost` tokens; return 0 if allowed, else seconds until it would be."""
+        return self._take_local(key, cost, rate, burst)
+
+    def _take_local(self, key: str, cost: float, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        if tokens >= cost:
+            tokens -= cost
+            wait = 0.0
+        else:
+            wait = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def refund(self, key: str, cost: float, burst: float):
+        """Give back tokens taken for a request that another bucket refused."""
+        self._refund_local(key, cost, burst)
+
+    def _refund_local(self, key: str, cost: float, burst: float):
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets[key] = (min(burst, bucket[0] + cost), bucket[1])
+
+    async def check(self, route: str, ip: Optional[str], user: Optional[str] = None, cost: Optional[float] = None,
+                    account: Optional[str] = None):
+        """Charge a request to its IP's, user's and account's buckets; raise 429 with Retry-After when any is empty.
+
+        `user` is the authenticated caller; `account` is the account an
+        unauthenticated request names, such as the username of a login.
+        """
+        cost = ROUTE_COSTS[route] if cost is None else cost
+        buckets: List[Tuple[str, float, float]] = []
+        if ip:
+            buckets.append((f"ip:{ip}", settings.RATE_LIMIT_IP_RATE, settings.RATE_LIMIT_IP_BURST))
+        if user:
+            buckets.append((f"user:{user.lower()}", settings.RATE_LIMIT_USER_RATE, settings.RATE_LIMIT_USER_BURST))
+        if account and account.strip():
+            buckets.append((f"account:{account.strip().lower()}", settings.RATE_LIMIT_ACCOUNT_RATE,
+                            settings.RATE_LIMIT_ACCOUNT_BURST))
+        wait = 0.0
+        charged: List[Tuple[str, float]] = []
+        for key, rate, burst in buckets:
+            bucket_wait = await self.take(key, cost, rate, burst)
+            if bucket_wait > 0:
+                wait = max(wait, bucket_wait)
+            else:
+                charged.append((key, burst))
+        if wait > 0:
+            # A refused request costs nothing, so one full bucket cannot drain the other
+            for key, burst in charged:
+                await self.refund(key, cost, burst)
+            self.limited += 1
+            raise_busy("Too many requests, please slow down", wait, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "allowed": self.allowed, "limited": self.limited, "keys": len(self._buckets)}
+
+class RedisTokenBucketLimiter(TokenBucketLimiter):
+    """Token buckets in Redis, shared by every worker.
+
+    Each take is one Lua script, so refill and charge are atomic across
+    workers, and it uses Redis' clock so workers' clocks need not agree.
+    If Redis is unreachable the worker falls back to its own in-memory
+    buckets rather than failing open or closed.
+    """
+
+    KEY_PREFIX = "ratelimit:"
+
+    # KEYS[1] bucket; ARGV rate, burst, cost. Returns the wait in microseconds (0 = allowed).
+    TAKE_SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(bucket[1]) or burst
+    local updated_at = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+    local wait = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+    else
+        wait = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return math.ceil(wait * 1000000)
+    """
+
+    # KEYS[1] bucket; ARGV cost, burst. Adds the tokens back, up to burst, if the bucket still exists.
+    REFUND_SCRIPT = """
+    local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+    if tokens then
+        redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(tonumber(ARGV[2]), tokens + tonumber(ARGV[1]))))
+    end
+    return 0
+    """
+
+    def __init__(self, redis_url: str, max_keys: int = 100000):
+        super().__init__(max_keys=max_keys)
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(redis_url)
+        self._script = self._redis.register_script(self.TAKE_SCRIPT)
+        self._refund_script = self._redis.register_script(self.REFUND_SCRIPT)
+        self.fallbacks = 0
+
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        try:
+            wait_us = await self._script(keys=[self.KEY_PREFIX + key], args=[rate, burst, cost])
+            return int(wait_us) / 1000000
+        except Exception as e:
+            self.fallbacks += 1
+            logger.warning(f"Rate limit lookup failed, using local buckets: {e}")
+            return self._take_local(key, cost, rate, burst)
+
+    async def refund(self, key: str, cost: float, burst: float):
+        try:
+            await self._refund_script(keys=[self.KEY_PREFIX + key], args=[cost, burst])
+        except Exception as e:
+            logger.warning(f"Rate limit refund failed: {e}")
+            self._refund_local(key, cost, burst)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "backend": "redis", "fallbacks": self.fallbacks}
+
+def create_rate_limiter() -> Optional[TokenBucketLimiter]:
+    """Build the limiter selected by RATE_LIMIT_BACKEND, or None when it is "off"."""
+    if settings.RATE_LIMIT_BACKEND == "off":
+        return None
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBucketLimiter(settings.REDIS_URL)
+    return TokenBucketLimiter()
+
+# Global rate limiter
+rate_limiter = create_rate_limiter()
+
+def client_ip(connection: HTTPConnection) -> Optional[str]:
+    """The client address of a request or WebSocket.
+
+    Behind nginx this is the X-Forwarded-For address only if uvicorn runs
+    with --proxy-headers and FORWARDED_ALLOW_IPS includes the proxy (see the
+    Dockerfile and docker-compose.prod.yml); otherwise every client shares
+    the proxy's bucket.
+    """
+    return connection.client.host if connection.client else None
+
+def token_subject(request: Request) -> Optional[str]:
+    """The user a bearer token was issued to, without a database or cache lookup."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    return payload.get("sub") if payload else None
+
+def rate_limit(route: str):
+    """Dependency charging ROUTE_COSTS[route] to the caller's IP and, if authenticated, user buckets."""
+    async def dependency(request: Request):
+        if rate_limiter is not None:
+            await rate_limiter.check(route, client_ip(request), token_subject(request))
+    return dependency
@@ -0,0 +1,75 @@
+"""orjson-backed JSON helpers for REST payloads and WebSocket frames."""
+from typing import Any, Iterable, Tuple, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+# Aware UTC datetimes end in "Z", as in Pydantic's JSON output
+DUMPS_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+def dumps(obj: Any) -> str:
+    """Serialize to a JSON string, for WebSocket text frames and Redis envelopes."""
+    return orjson.dumps(obj, option=DUMPS_OPTIONS).decode()
+
+def loads(data) -> Any:
+    return orjson.loads(data)
+
+class FrameTemplate:
+    """WebSocket frame whose fixed fields are encoded once.
+
+    `render(value)` only encodes the varying field and appends it to the
+    pre-encoded prefix, e.g. one template per reply for its `delta` frames:
+
+        FrameTemplate("content", type="delta", session_id=3).render("Hi")
+        -> '{"type":"delta","session_id":3,"content":"Hi"}'
+    """
+
+    def __init__(self, field: str, **fixed):
+        head = orjson.dumps(fixed, option=DUMPS_OPTIONS)[:-1]
+        separator = b"," if fixed else b""
+        self.prefix = (head + separator + orjson.dumps(field) + b":").decode()
+
+    def render(self, value: Any) -> str:
+        return self.prefix + orjson.dumps(value, option=DUMPS_OPTIONS).decode() + "}"
+
+class RowEncoder:
+    """Serializes ORM rows with the fields of a response schema, without Pydantic.
+
+    For read paths returning many stored rows (history pages), where
+    validating each row into a model and running it through
+    jsonable_encoder costs far more than encoding it. Values are taken as
+    stored, so only use it for schemas whose fields map one to one onto
+    columns of matching JSON types.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.fields: Tuple[str, ...] = tuple(schema.model_fields)
+
+    def _values(self, row) -> dict:
+        try:
+            # Loaded column values sit in the instance dict; reading them there
+            # skips SQLAlchemy's attribute instrumentation, most of the per-row cost
+            loaded = row.__dict__
+            return {name: loaded[name] for name in self.fields}
+        except (AttributeError, KeyError):
+            # Core rows, and instances with expired or deferred attributes
+            return {name: getattr(row, name) for name in self.fields}
+
+    def encode(self, rows: Iterable) -> bytes:
+        """The rows as a JSON array of objects."""
+        return orjson.dumps([self._values(row) for row in rows], option=DUMPS_OPTIONS)
+
+    def encode_lines(self, rows: Iterable) -> bytes:
+        """The rows as newline-delimited JSON objects."""
+        option = DUMPS_OPTIONS | orjson.OPT_APPEND_NEWLINE
+        return b"".join(orjson.dumps(self._values(row), option=option) for row in rows)
+
+    def encode_page(self, key: str, rows: Iterable, **extra) -> bytes:
+        """A JSON object holding the rows under `key` next to the `extra` fields."""
+        tail = orjson.dumps(extra, option=DUMPS_OPTIONS)[1:] if extra else b"}"
+        return b'{"' + key.encode() + b'":' + self.encode(rows) + (b"," if extra else b"") + tail
+
+def json_bytes_response(content: bytes, status_code: int = 200) -> Response:
+    """Response for an already encoded JSON body; returning it skips FastAPI's response_model pass."""
+    return Response(content=content, status_code=status_code, media_type="application/json")
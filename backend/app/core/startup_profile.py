@@ -0,0 +1,63 @@
+"""Where the API's cold start goes: imports, then lifespan steps.
+
+    python -m app.main --profile-startup
+
+Imports `app.main` in a fresh interpreter under `-X importtime` and sums
+self time per top-level package and per app module, then runs the lifespan
+startup in this process and prints the step timings it records.
+"""
+import asyncio
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Heavy ML dependencies that must only load when a backend that needs them is used
+HEAVY_MODULES = ("torch", "transformers", "numpy", "pandas", "sklearn", "onnxruntime")
+
+def import_times(module: str = "app.main") -> List[Tuple[str, int]]:
+    """(module, self microseconds) for every module imported by `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(self_us)))
+    return times
+
+def _top(totals: Dict[str, int], limit: int) -> List[Tuple[str, int]]:
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+async def _lifespan_timings() -> Dict[str, float]:
+    from app.main import app, lifespan
+    async with lifespan(app):
+        return dict(app.state.startup_timings)
+
+def print_startup_profile(limit: int = 15) -> int:
+    times = import_times()
+    packages: Dict[str, int] = defaultdict(int)
+    app_modules: Dict[str, int] = {}
+    for name, self_us in times:
+        packages[name.split(".")[0]] += self_us
+        if name.startswith("app."):
+            app_modules[name] = self_us
+    total_ms = sum(packages.values()) / 1000
+
+    print(f"import app.main: {total_ms:.0f} ms, {len(times)} modules")
+    print("  by package (self time):")
+    for name, self_us in _top(packages, limit):
+        print(f"    {name:<32} {self_us / 1000:8.1f} ms")
+    print("  app modules (self time):")
+    for name, self_us in _top(app_modules, limit):
+        print(f"    {name:<32} {self_us / 1000:8.1f} ms")
+    heavy = sorted(name for name in packages if name in HEAVY_MODULES)
+    print(f"  heavy ML modules imported: {', '.join(heavy) if heavy else 'none'}")
+
+    print("lifespan startup:")
+    for name, seconds in asyncio.run(_lifespan_timings()).items():
+        print(f"    {name:<32} {seconds * 1000:8.1f} ms")
+    return 0
@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+import hashlib
+import logging
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import decode_token
+from app.models.user import User
+from app.schemas.user import User as UserSnapshot
+
+logger = logging.getLogger(__name__)
+
+class UserCache:
+    """Bounded LRU + TTL cache mapping verified access tokens to user snapshots.
+
+    Snapshots are plain Pydantic models, detached from any DB session, so a
+    cache hit resolves the current user without a database round trip.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: int = 60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[UserSnapshot, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+
+    def _expiry(self, token_expires_at: Optional[float]) -> float:
+        expires_at = time.monotonic() + self.ttl_seconds
+        if token_expires_at is not None:
+            # Never serve a snapshot past the token's own expiry
+            expires_at = min(expires_at, time.monotonic() + token_expires_at - time.time())
+        return expires_at
+
+    async def get(self, token: str) -> Optional[UserSnapshot]:
+        """Return the cached snapshot for a token, or None on a miss."""
+        entry = self._entries.get(token)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                self._remove(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return entry[0]
+
+    async def set(self, token: str, user: UserSnapshot, token_expires_at: Optional[float] = None):
+        """Cache a snapshot for a verified token."""
+        self._remove(token)
+        self._entries[token] = (user, self._expiry(token_expires_at))
+        self._tokens_by_user.setdefault(user.id, set()).add(token)
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    async def invalidate_user(self, user_id: int):
+        """Drop every cached token of a user."""
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._tokens_by_user.get(entry[0].id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_user[entry[0].id]
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for this worker."""
+        total = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+class RedisUserCache(UserCache):
+    """User cache stored in Redis, so invalidation reaches every worker.
+
+    Tokens are stored by SHA-256 digest; each user keeps a set of their token
+    keys so invalidate_user can delete them all. Redis errors count as misses.
+    """
+
+    KEY_PREFIX = "auth:token:"
+    USER_PREFIX = "auth:user:"
+
+    def __init__(self, redis_url: str, ttl_seconds: int = 60):
+        super().__init__(max_size=0, ttl_seconds=ttl_seconds)
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(redis_url)
+
+    def _key(self, token: str) -> str:
+        return self.KEY_PREFIX + hashlib.sha256(token.encode()).hexdigest()
+
+    def _ttl(self, token_expires_at: Optional[float]) -> int:
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, int(token_expires_at - time.time()))
+        return ttl
+
+    async def get(self, token: str) -> Optional[UserSnapshot]:
+        try:
+            data = await self._redis.get(self._key(token))
+        except Exception as e:
+            logger.warning(f"User cache lookup failed: {e}")
+            data = None
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return UserSnapshot.model_validate_json(data)
+
+    async def set(self, token: str, user: UserSnapshot, token_expires_at: Optional[float] = None):
+        ttl = self._ttl(token_expires_at)
+        if ttl <= 0:
+            return
+        key = self._key(token)
+        user_key = f"{self.USER_PREFIX}{user.id}"
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, user.model_dump_json(), ex=ttl)
+                pipe.sadd(user_key, key)
+                pipe.expire(user_key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"User cache store failed: {e}")
+
+    async def invalidate_user(self, user_id: int):
+        user_key = f"{self.USER_PREFIX}{user_id}"
+        try:
+            keys = await self._redis.smembers(user_key)
+            await self._redis.delete(user_key, *keys)
+        except Exception as e:
+            logger.warning(f"User cache invalidation failed: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+def create_user_cache() -> UserCache:
+    """Build the user cache selected by USER_CACHE_BACKEND."""
+    if settings.USER_CACHE_BACKEND == "redis":
+        return RedisUserCache(settings.REDIS_URL, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+    return UserCache(max_size=settings.USER_CACHE_MAX_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+
+# Global user cache
+user_cache = create_user_cache()
+
+async def resolve_user(token: str, db: AsyncSession) -> Optional[UserSnapshot]:
+    """Resolve an access token to a user snapshot, hitting the database only on a cache miss."""
+    user = await user_cache.get(token)
+    if user is not None:
+        return user
+    
+    payload = decode_token(token)
+    email = payload.get("sub") if payload else None
+    if email is None:
+        return None
+    
+    db_user = await db.scalar(select(User).where(User.email == email))
+    if db_user is None:
+        return None
+    
+    user = UserSnapshot.model_validate(db_user)
+    await user_cache.set(token, user, payload.get("exp"))
+    return user
@@ -0,0 +1,105 @@
+from typing import List, Optional
+import asyncio
+import logging
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.chat import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindBuffer:
+    """Collects rows in memory and writes them with one bulk INSERT per batch.
+
+    Rows are flushed as soon as `batch_size` are queued, and otherwise every
+    `flush_interval` seconds. Once `max_pending` rows are
+    waiting, `add` blocks on a flush instead of growing without bound. If a
+    bulk insert fails, the batch is retried row by row so one bad row (e.g.
+    a message for a session deleted meanwhile) does not lose the others.
+    """
+
+    def __init__(self, model, batch_size: int = 500, flush_interval: float = 0.2,
+                 max_pending: int = 10000, session_factory=AsyncSessionLocal):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self.written = 0
+        self.failed = 0
+        self._rows: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def add(self, **row):
+        """Queue one row for insertion."""
+        self._rows.append(row)
+        if len(self._rows) >= self.max_pending:
+            await self.flush()
+        elif len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write everything queued so far."""
+        async with self._lock:
+            while self._rows:
+                batch, self._rows = self._rows[:self.batch_size], self._rows[self.batch_size:]
+                await self._write(batch)
+
+    async def _write(self, batch: List[dict]):
+        # render_nulls keeps rows with None values in the same multi-row INSERT
+        statement = insert(self.model).execution_options(render_nulls=True)
+        try:
+            async with self.session_factory() as db:
+                await db.execute(statement, batch)
+                await db.commit()
+            self.written += len(batch)
+            return
+        except Exception as e:
+            logger.warning(f"Bulk insert of {len(batch)} {self.model.__tablename__} rows failed, retrying one by one: {e}")
+        for row in batch:
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(statement, [row])
+                    await db.commit()
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Dropping {self.model.__tablename__} row: {e}")
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        """Start the background flusher."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background flusher and write whatever is still queued."""
+        if self._task is not None:
+            # Let an in-flight batch finish rather than cancelling it halfway
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        await self.flush()
+
+# Global write-behind buffer for chat messages received over WebSockets
+chat_message_buffer = WriteBehindBuffer(
+    ChatMessage,
+    batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+    flush_interval=settings.CHAT_WRITE_FLUSH_INTERVAL_MS / 1000,
+    max_pending=settings.CHAT_WRITE_MAX_PENDING,
+)
@@ -1,39 +1,105 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager, contextmanager
+from starlette.concurrency import run_in_threadpool
+from typing import Dict
+import asyncio
+import sys
+import time
 import uvicorn
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, async_engine, Base
+from app.core.metrics import CONTENT_TYPE, Gauge, MetricsMiddleware, metrics
+from app.core.password_pool import password_pool
+from app.core.rate_limit import rate_limiter
+from app.core.user_cache import user_cache
+from app.core.write_buffer import chat_message_buffer
 from app.api.v1.api import api_router
-from app.websocket.websocket_endpoint import router as websocket_router
-from app.websocket.connection_manager import ConnectionManager
+from app.websocket.websocket_endpoint import router as websocket_router, connection_manager
+from app.websocket.pubsub import create_relay
+from app.services.ai_service import get_ai_service
+from app.services.analysis_jobs import analysis_queue
+from app.services.llm_backend import close_llm_backend
+from app.services.response_cache import response_cache
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global connection manager for WebSocket
-connection_manager = ConnectionManager()
+@contextmanager
+def startup_step(timings: Dict[str, float], name: str):
+    """Record how long one startup step takes in `timings`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - started
+
+def _log_warmup_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background model warmup failed: {task.exception()}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up NeuroQ API...")
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
+    timings: Dict[str, float] = {}
+    app.state.startup_timings = timings
+    started = time.perf_counter()
+    if settings.DATABASE_SCHEMA_MODE == "create":
+        # Create database tables
+        with startup_step(timings, "create_tables"):
+            Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created successfully")
+    # Build the shared AI service once, before the first request needs it
+    with startup_step(timings, "ai_service"):
+        app.state.ai_service = get_ai_service()
+    # Load and warm up the classifier off the event loop (no-op for the keyword heuristic)
+    if settings.AI_WARMUP == "startup":
+        with startup_step(timings, "model_warmup"):
+            await run_in_threadpool(app.state.ai_service.load_model)
+    elif settings.AI_WARMUP == "background":
+        app.state.warmup = asyncio.create_task(run_in_threadpool(app.state.ai_service.load_model))
+        app.state.warmup.add_done_callback(_log_warmup_failure)
+    app.state.connection_manager = connection_manager
+    with startup_step(timings, "websocket_relay"):
+        connection_manager.relay = create_relay(connection_manager)
+        if connection_manager.relay is not None:
+            await connection_manager.relay.start()
+    with startup_step(timings, "workers"):
+        password_pool.start()
+        chat_message_buffer.start()
+        if analysis_queue is not None:
+            analysis_queue.start(notify=connection_manager.send_to_user)
+    timings["total"] = time.perf_counter() - started
+    steps = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items() if name != "total")
+    logger.info(f"Startup finished in {timings['total']:.3f}s ({steps})")
     yield
     # Shutdown
     logger.info("Shutting down NeuroQ API...")
+    # Finish queued analyses while the relay can still deliver their results
+    if analysis_queue is not None:
+        await analysis_queue.stop()
+    if connection_manager.relay is not None:
+        await connection_manager.relay.stop()
+        connection_manager.relay = None
+    await connection_manager.close_all()
+    # Write out chat messages still buffered from the closed sockets
+    await chat_message_buffer.stop()
+    await close_llm_backend()
+    password_pool.shutdown()
+    await async_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title="NeuroQ API",
     description="AI-Powered Mental Health Platform API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -51,6 +117,10 @@ app.add_middleware(
     allowed_hosts=["*"]
 )
 
+# Time every HTTP request; added last so it is outermost and sees the final status
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -67,9 +137,49 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "API is running"}
+    return {
+        "status": "healthy",
+        "message": "API is running",
+        "auth_cache": user_cache.stats(),
+        "response_cache": response_cache.stats() if response_cache else None,
+        "rate_limit": rate_limiter.stats() if rate_limiter else None
+    }
+
+def _pool_stats(stat: str) -> dict:
+    """One pool figure per engine; pools that do not keep connections (NullPool) are left out."""
+    values = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.pool)):
+        if hasattr(pool, stat):
+            values[(name,)] = getattr(pool, stat)()
+    return values
+
+for name, stat, documentation in (
+    ("neuroq_db_pool_size", "size", "Connections the pool keeps open"),
+    ("neuroq_db_pool_checked_out", "checkedout", "Connections currently checked out of the pool"),
+    ("neuroq_db_pool_overflow", "overflow", "Connections opened beyond the pool size (negative while under it)"),
+):
+    metrics.register(Gauge(name, documentation, lambda stat=stat: _pool_stats(stat), ("engine",)))
+metrics.register(Gauge("neuroq_websocket_connections", "Open WebSocket connections in this worker",
+                       lambda: len(connection_manager.active_connections)))
+metrics.register(Gauge("neuroq_websocket_users", "Users with at least one open WebSocket in this worker",
+                       lambda: len(connection_manager.user_connections)))
+metrics.register(Gauge("neuroq_websocket_active_replies", "Chat replies being generated right now",
+                       lambda: connection_manager.active_replies))
+metrics.register(Gauge("neuroq_websocket_dropped_total", "Connections dropped for falling behind",
+                       lambda: connection_manager.dropped_connections, kind="counter"))
+metrics.register(Gauge("neuroq_ai_pending", "Symptom analyses waiting for the model or the analysis queue",
+                       lambda: get_ai_service().pending() + ((analysis_queue.pending() or 0) if analysis_queue else 0)))
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        from app.core.startup_profile import print_startup_profile
+        sys.exit(print_startup_profile())
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
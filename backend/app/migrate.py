@@ -0,0 +1,62 @@
+"""Bring the database schema up to date (DATABASE_SCHEMA_MODE=migrate).
+
+Run once per deploy, before the API starts:
+    python -m app.migrate
+
+On an empty database, creates every table from the models and stamps the
+Alembic head, since the migrations assume the base tables already exist.
+A database built by database/init.sql or create_all (DATABASE_SCHEMA_MODE
+=create) has no alembic_version table but is already current, so it is
+stamped too. Otherwise runs the pending Alembic migrations.
+"""
+import logging
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.core.database import Base, engine
+from app.models import chat, symptom, user  # noqa: F401  (registers tables)
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+def schema_matches_models(inspector) -> bool:
+    """Whether every model table and column already exists.
+
+    Index names differ between init.sql and the models, and migration 0001
+    only adds indexes both already create, so indexes are not compared.
+    """
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            return False
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        if any(column.name not in columns for column in table.columns):
+            return False
+    return True
+
+def migrate():
+    config = alembic_config()
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    if not existing & set(Base.metadata.tables):
+        logger.info("Empty database; creating tables and stamping the Alembic head")
+        Base.metadata.create_all(bind=engine)
+        command.stamp(config, "head")
+    elif "alembic_version" not in existing and schema_matches_models(inspector):
+        # Built by database/init.sql or create_all, which already include every migration
+        logger.info("Schema is current but unversioned; stamping the Alembic head")
+        command.stamp(config, "head")
+    else:
+        command.upgrade(config, "head")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate()
@@ -1,16 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.core.database import Base
+from app.core.database import Base, Timestamp
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        # Session list: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_chat_sessions_user_id_created_at", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     session_name = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
@@ -22,6 +26,10 @@ class ChatSession(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Transcripts and last-message lookups: WHERE session_id = ? ORDER BY created_at, id
+        Index("ix_chat_messages_session_id_created_at", "session_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("chat_sessions.id"), nullable=False)
@@ -34,10 +42,11 @@ class ChatMessage(Base):
     
     # AI metadata
     ai_model_used = Column(String(100))
-    response_time_ms = Column(Integer)
+    response_time_ms = Column(Integer)  # total generation time
+    first_token_ms = Column(Integer)  # time until the first streamed token
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     
     # Relationships
     session = relationship("ChatSession", back_populates="messages")
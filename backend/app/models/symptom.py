@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.core.database import Base
+from app.core.database import Base, Timestamp
 
 class SymptomSubmission(Base):
     __tablename__ = "symptom_submissions"
+    __table_args__ = (
+        # History: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_symptom_submissions_user_id_created_at", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -26,8 +30,11 @@ class SymptomSubmission(Base):
     next_steps = Column(Text)
     emergency_contact_suggested = Column(Boolean, default=False)
     
+    # Analysis state: pending until a worker stores the results, then completed or failed
+    status = Column(String(20), nullable=False, default="completed", server_default="completed")
+    
     # Metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
 
 class ChatMessageCreate(BaseModel):
@@ -37,11 +37,16 @@ class ChatSessionInDB(BaseModel):
 class ChatSession(ChatSessionInDB):
     messages: List[ChatMessageResponse] = []
 
+class ChatSessionSummary(ChatSessionInDB):
+    message_count: int
+    last_message: Optional[ChatMessageResponse] = None
+
 class ChatHistory(BaseModel):
-    sessions: List[ChatSession]
-    total_count: int
-    page: int
+    sessions: List[Union[ChatSessionSummary, ChatSession]]
+    total_count: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
+    next_cursor: Optional[str] = None
 
 class WebSocketMessage(BaseModel):
     type: str  # "message", "typing", "error"
@@ -36,6 +36,7 @@ class SymptomSubmissionInDB(SymptomInput):
     recommendations: Optional[str] = None
     next_steps: Optional[str] = None
     emergency_contact_suggested: bool = False
+    status: str = "completed"
     created_at: datetime
     
     class Config:
@@ -46,6 +47,7 @@ class SymptomSubmission(SymptomSubmissionInDB):
 
 class SymptomHistory(BaseModel):
     submissions: List[SymptomSubmission]
-    total_count: int
-    page: int
+    total_count: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
+    next_cursor: Optional[str] = None
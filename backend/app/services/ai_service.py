@@ -1,15 +1,61 @@
 from typing import List, Optional
+from types import MappingProxyType
 import os
-from app.schemas.symptom import SymptomPrediction
+import threading
+from app.schemas.symptom import SymptomInput, SymptomPrediction
 from app.core.config import settings
+from app.core.metrics import AI_INFERENCE_SECONDS, observe_time
+from app.services.embedding_scorer import EmbeddingScorer
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.transformer_classifier import MicroBatcher, TransformerClassifier
+
+DISORDER_LABELS = (
+    "Anxiety", "Depression", "Bipolar Disorder", "PTSD",
+    "OCD", "ADHD", "Eating Disorder", "Substance Abuse",
+    "Schizophrenia", "Personality Disorder", "No Disorder"
+)
+SEVERITY_LEVELS = ("mild", "moderate", "severe")
+
+_RECOMMENDATIONS = {
+    "Anxiety": {
+        "mild": "Practice deep breathing exercises, maintain a regular sleep schedule, and consider mindfulness meditation.",
+        "moderate": "Consider therapy or counseling, practice relaxation techniques, and maintain a healthy lifestyle.",
+        "severe": "Seek immediate professional help, consider medication consultation, and have a support system in place."
+    },
+    "Depression": {
+        "mild": "Maintain regular exercise, establish a daily routine, and stay connected with loved ones.",
+        "moderate": "Consider therapy, maintain physical activity, and monitor your mood patterns.",
+        "severe": "Seek immediate professional help, consider medication, and ensure you have emergency contacts."
+    },
+    "No Disorder": {
+        "mild": "Continue maintaining good mental health practices and regular self-care.",
+        "moderate": "Continue current practices and consider preventive mental health measures.",
+        "severe": "Continue current practices and consider regular mental health check-ins."
+    }
+}
+_DEFAULT_RECOMMENDATION = _RECOMMENDATIONS["No Disorder"]["mild"]
+
+_NEXT_STEPS = {
+    "severe": "1. Contact a mental health professional immediately\n2. Reach out to emergency services if needed\n3. Inform a trusted friend or family member\n4. Follow up with regular appointments",
+    "moderate": "1. Schedule an appointment with a mental health professional\n2. Practice recommended coping strategies\n3. Monitor your symptoms\n4. Consider joining a support group",
+    "mild": "1. Continue self-care practices\n2. Monitor your mental health\n3. Consider preventive counseling\n4. Maintain healthy lifestyle habits"
+}
+
+# Guidance text resolved once per (disorder, severity) so lookups never build dicts
+RECOMMENDATIONS_TABLE = MappingProxyType({
+    (disorder, severity): _RECOMMENDATIONS.get(disorder, _RECOMMENDATIONS["No Disorder"])[severity]
+    for disorder in DISORDER_LABELS
+    for severity in SEVERITY_LEVELS
+})
+NEXT_STEPS_TABLE = MappingProxyType({
+    (disorder, severity): _NEXT_STEPS[severity]
+    for disorder in DISORDER_LABELS
+    for severity in SEVERITY_LEVELS
+})
 
 class AIService:
     def __init__(self):
-        self.disorder_labels = [
-            "Anxiety", "Depression", "Bipolar Disorder", "PTSD", 
-            "OCD", "ADHD", "Eating Disorder", "Substance Abuse",
-            "Schizophrenia", "Personality Disorder", "No Disorder"
-        ]
+        self.disorder_labels = list(DISORDER_LABELS)
         # Lightweight keyword maps for heuristic scoring (no heavy deps)
         self.keyword_map = {
             "Anxiety": ["anxiety", "anxious", "worry", "panic", "nervous"],
@@ -23,11 +69,52 @@ class AIService:
             "Schizophrenia": ["voices", "hallucinations", "paranoid", "delusions"],
             "Personality Disorder": ["relationships", "identity", "unstable", "abandonment"],
         }
+        # Compiled once; scores every label and the crisis phrases in one call
+        self.matcher = KeywordMatcher(self.keyword_map)
+        # Batch scoring matrices, built on first predict_batch call
+        self._label_matrix = None
+        self._crisis_vector = None
+        # Optional model-based scorer; loaded by load_model() or on first prediction
+        self.classifier = None
+        self._batcher = None
+        if settings.SYMPTOM_MODEL_BACKEND == "embedding":
+            # One embedding and one matrix-vector product per text; no batcher needed
+            self.classifier = EmbeddingScorer(
+                settings.EMBEDDING_MODEL_DIR,
+                self.disorder_labels,
+                cache_dir=settings.EMBEDDING_CENTROIDS_DIR or None,
+                cache_size=settings.EMBEDDING_CACHE_SIZE,
+                temperature=settings.EMBEDDING_TEMPERATURE,
+                quantize=settings.TRANSFORMER_QUANTIZE,
+                max_length=settings.TRANSFORMER_MAX_LENGTH,
+                num_threads=settings.TRANSFORMER_NUM_THREADS,
+            )
+        elif settings.SYMPTOM_MODEL_BACKEND == "transformer":
+            self.classifier = TransformerClassifier(
+                settings.TRANSFORMER_MODEL_DIR,
+                engine=settings.TRANSFORMER_ENGINE,
+                quantize=settings.TRANSFORMER_QUANTIZE,
+                max_length=settings.TRANSFORMER_MAX_LENGTH,
+                num_threads=settings.TRANSFORMER_NUM_THREADS,
+            )
+            self._batcher = MicroBatcher(
+                self.classifier.predict_proba,
+                max_batch_size=settings.TRANSFORMER_MAX_BATCH_SIZE,
+                max_wait_ms=settings.TRANSFORMER_MAX_WAIT_MS,
+            )
     
-    # Backward-compat API no-op for previous calls
     def load_model(self):
-        return
+        """Load and warm up the transformer classifier or embedding scorer, if one is configured."""
+        if self._batcher is not None:
+            self.classifier.warmup(batch_sizes=(1, settings.TRANSFORMER_MAX_BATCH_SIZE))
+        elif self.classifier is not None:
+            self.classifier.warmup()
     
+    def pending(self) -> int:
+        """Predictions waiting for the model (only the transformer backend queues them)."""
+        return self._batcher.pending() if self._batcher is not None else 0
+    
+    @observe_time(AI_INFERENCE_SECONDS, (settings.SYMPTOM_MODEL_BACKEND, "single"))
     def predict_mental_health(
         self,
         input_text: str,
@@ -38,25 +125,28 @@ class AIService:
     ) -> SymptomPrediction:
         """Predict mental health disorder based on input."""
         try:
-            input_text_lower = (input_text or "").lower()
-            all_tokens = set(input_text_lower.split())
-            if selected_symptoms:
-                all_tokens.update([s.lower() for s in selected_symptoms])
-
-            # Simple keyword scoring
-            scores = {label: 0 for label in self.disorder_labels}
-            for label, keywords in self.keyword_map.items():
-                for kw in keywords:
-                    if kw in input_text_lower:
-                        scores[label] += 1
+            # Simple keyword scoring; also flags crisis phrases for every backend
+            scan = self.matcher.scan(input_text)
+            if self.classifier is not None:
+                if self._batcher is not None:
+                    # Gathered into a micro-batch with concurrent requests
+                    probabilities = self._batcher.submit(input_text)
+                else:
+                    probabilities = self.classifier.score(input_text)
+                best = int(probabilities.argmax())
+                disorder_name = self.classifier.labels[best]
+                confidence_score = float(probabilities[best])
+            else:
+                scores = {label: 0 for label in self.disorder_labels}
+                scores.update(scan.label_counts)
 
-            # Fallback to No Disorder if nothing matched
-            disorder_name = max(scores, key=lambda k: scores[k]) if any(scores.values()) else "No Disorder"
+                # Fallback to No Disorder if nothing matched
+                disorder_name = max(scores, key=lambda k: scores[k]) if any(scores.values()) else "No Disorder"
 
-            # Confidence heuristic
-            base = scores.get(disorder_name, 0)
-            # Normalize to a rough confidence between 0.5 and 0.95
-            confidence_score = 0.5 + min(base, 5) * 0.09
+                # Confidence heuristic
+                base = scores.get(disorder_name, 0)
+                # Normalize to a rough confidence between 0.5 and 0.95
+                confidence_score = 0.5 + min(base, 5) * 0.09
             
             # Determine severity level
             severity_level = self._determine_severity(confidence_score, mood_rating, stress_level)
@@ -69,7 +159,7 @@ class AIService:
             
             # Determine if emergency contact is suggested
             emergency_suggested = self._should_suggest_emergency_contact(
-                disorder_name, severity_level, input_text
+                disorder_name, severity_level, input_text, crisis=scan.crisis
             )
             
             return SymptomPrediction(
@@ -93,6 +183,74 @@ class AIService:
                 emergency_contact_suggested=False
             )
     
+    @observe_time(AI_INFERENCE_SECONDS, (settings.SYMPTOM_MODEL_BACKEND, "batch"))
+    def predict_batch(self, inputs: List[SymptomInput]) -> List[SymptomPrediction]:
+        """Score many submissions at once; results match predict_mental_health item for item."""
+        if not inputs:
+            return []
+        try:
+            import numpy as np
+        except ImportError:
+            # Minimal installs have no numpy; score one by one instead
+            return [
+                self.predict_mental_health(
+                    input_text=item.input_text,
+                    selected_symptoms=item.selected_symptoms,
+                    mood_rating=item.mood_rating,
+                    sleep_hours=item.sleep_hours,
+                    stress_level=item.stress_level
+                )
+                for item in inputs
+            ]
+        if self._label_matrix is None:
+            self._label_matrix = self.matcher.label_matrix(self.disorder_labels)
+            self._crisis_vector = self.matcher.crisis_vector()
+
+        texts = [item.input_text for item in inputs]
+        terms = self.matcher.term_matrix(texts)
+        crisis = (terms @ self._crisis_vector) > 0
+
+        if self.classifier is not None:
+            if self._batcher is not None:
+                probabilities = np.stack(self._batcher.submit_many(texts))
+            else:
+                probabilities = self.classifier.predict_proba(texts)
+            labels = self.classifier.labels
+            best = probabilities.argmax(axis=1)
+            confidence = probabilities[np.arange(len(inputs)), best].astype(float)
+        else:
+            scores = terms @ self._label_matrix
+            labels = self.disorder_labels
+            # First maximum wins, like max() over the ordered score dict
+            matched = scores.any(axis=1)
+            best = np.where(matched, scores.argmax(axis=1), self.disorder_labels.index("No Disorder"))
+            base = scores[np.arange(len(inputs)), best]
+            confidence = 0.5 + np.minimum(base, 5) * 0.09
+
+        # None and 0 are both falsy in the scalar rules, so neither may trigger a threshold
+        mood = np.array([item.mood_rating or 0 for item in inputs])
+        stress = np.array([item.stress_level or 0 for item in inputs])
+        severe = (confidence > 0.8) | ((mood != 0) & (mood <= 3)) | ((stress != 0) & (stress >= 8))
+        moderate = ~severe & (
+            (confidence > 0.6) | ((mood != 0) & (mood <= 5)) | ((stress != 0) & (stress >= 6))
+        )
+        severity = np.where(severe, "severe", np.where(moderate, "moderate", "mild"))
+        emergency = severe | crisis
+
+        predictions = []
+        for i in range(len(inputs)):
+            disorder = labels[best[i]]
+            level = str(severity[i])
+            predictions.append(SymptomPrediction(
+                predicted_disorder=disorder,
+                confidence_score=float(confidence[i]),
+                severity_level=level,
+                recommendations=self._generate_recommendations(disorder, level),
+                next_steps=self._generate_next_steps(disorder, level),
+                emergency_contact_suggested=bool(emergency[i])
+            ))
+        return predictions
+    
     # Legacy function removed; heuristic path does not require feature prep
     
     def _determine_severity(self, confidence: float, mood_rating: Optional[int], stress_level: Optional[int]) -> str:
@@ -106,40 +264,38 @@ class AIService:
     
     def _generate_recommendations(self, disorder: str, severity: str) -> str:
         """Generate personalized recommendations based on disorder and severity."""
-        recommendations = {
-            "Anxiety": {
-                "mild": "Practice deep breathing exercises, maintain a regular sleep schedule, and consider mindfulness meditation.",
-                "moderate": "Consider therapy or counseling, practice relaxation techniques, and maintain a healthy lifestyle.",
-                "severe": "Seek immediate professional help, consider medication consultation, and have a support system in place."
-            },
-            "Depression": {
-                "mild": "Maintain regular exercise, establish a daily routine, and stay connected with loved ones.",
-                "moderate": "Consider therapy, maintain physical activity, and monitor your mood patterns.",
-                "severe": "Seek immediate professional help, consider medication, and ensure you have emergency contacts."
-            },
-            "No Disorder": {
-                "mild": "Continue maintaining good mental health practices and regular self-care.",
-                "moderate": "Continue current practices and consider preventive mental health measures.",
-                "severe": "Continue current practices and consider regular mental health check-ins."
-            }
-        }
-        
-        return recommendations.get(disorder, recommendations["No Disorder"]).get(severity, recommendations["No Disorder"]["mild"])
+        text = RECOMMENDATIONS_TABLE.get((disorder, severity))
+        if text is None:
+            text = RECOMMENDATIONS_TABLE.get(("No Disorder", severity), _DEFAULT_RECOMMENDATION)
+        return text
     
     def _generate_next_steps(self, disorder: str, severity: str) -> str:
         """Generate next steps based on disorder and severity."""
-        if severity == "severe":
-            return "1. Contact a mental health professional immediately\n2. Reach out to emergency services if needed\n3. Inform a trusted friend or family member\n4. Follow up with regular appointments"
-        elif severity == "moderate":
-            return "1. Schedule an appointment with a mental health professional\n2. Practice recommended coping strategies\n3. Monitor your symptoms\n4. Consider joining a support group"
-        else:
-            return "1. Continue self-care practices\n2. Monitor your mental health\n3. Consider preventive counseling\n4. Maintain healthy lifestyle habits"
+        return NEXT_STEPS_TABLE.get((disorder, severity)) or _NEXT_STEPS.get(severity, _NEXT_STEPS["mild"])
     
-    def _should_suggest_emergency_contact(self, disorder: str, severity: str, input_text: str) -> bool:
+    def _should_suggest_emergency_contact(
+        self, disorder: str, severity: str, input_text: str, crisis: Optional[bool] = None
+    ) -> bool:
         """Determine if emergency contact should be suggested."""
-        emergency_keywords = ["suicide", "kill myself", "end it all", "not worth living", "harm myself"]
-        
-        if severity == "severe" or any(keyword in input_text.lower() for keyword in emergency_keywords):
+        if severity == "severe":
             return True
         
-        return False
+        # Reuse the crisis flag from an earlier scan when the caller has one
+        if crisis is None:
+            crisis = self.matcher.has_crisis(input_text)
+        return crisis
+
+_ai_service: Optional[AIService] = None
+_ai_service_lock = threading.Lock()
+
+def get_ai_service() -> AIService:
+    """Return the process-wide AIService, creating it on first use.
+
+    Also usable as a FastAPI dependency.
+    """
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                _ai_service = AIService()
+    return _ai_service
@@ -0,0 +1,206 @@
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+import asyncio
+import logging
+
+from sqlalchemy import bindparam, select, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.serialization import dumps
+from app.models.symptom import SymptomSubmission
+from app.schemas.symptom import SymptomInput, SymptomPrediction
+from app.services.ai_service import get_ai_service
+
+logger = logging.getLogger(__name__)
+
+# Submission.status values
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+
+class AnalysisJob(NamedTuple):
+    submission_id: int
+    user_id: int
+    symptoms: SymptomInput
+
+def completed_values(prediction: SymptomPrediction) -> dict:
+    """Column values that mark a submission as analysed."""
+    return {**prediction.model_dump(), "status": COMPLETED}
+
+# Stores one submission's analysis, given as {"submission_id", "owner_id", **column values}.
+# Core UPDATE rather than the ORM's bulk update by primary key, which raises
+# StaleDataError when a row is gone; rows deleted, re-created under the same id
+# for another user, or already analysed simply do not match.
+_submissions = SymptomSubmission.__table__
+store_analysis = update(_submissions).where(
+    _submissions.c.id == bindparam("submission_id"),
+    _submissions.c.user_id == bindparam("owner_id"),
+    _submissions.c.status == PENDING,
+)
+
+def analysis_event(submission_id: int, values: dict) -> str:
+    """WebSocket frame telling the owner that analysis of a submission finished."""
+    return dumps({"type": "symptom_analysis", "submission_id": submission_id, **values})
+
+class AsyncioAnalysisQueue:
+    """In-process worker pool that analyses pending symptom submissions.
+
+    Each worker takes whatever jobs are queued (up to `batch_size`), scores
+    them with one `predict_batch` call in the thread pool, writes all results
+    in a single transaction (one executemany UPDATE, no re-read) and pushes
+    a `symptom_analysis` frame to the owner of each submission it updated.
+    Jobs cancelled because their submission was deleted are skipped, as are
+    submissions no longer pending when the results are stored. Once
+    `max_pending` jobs are waiting, `enqueue` blocks, which slows submitters
+    down instead of growing memory without bound. Jobs still queued at
+    shutdown are finished before `stop` returns; jobs lost to a crash stay
+    `pending`.
+    """
+
+    def __init__(self, workers: int = 2, batch_size: int = 64, max_pending: int = 10000,
+                 session_factory=AsyncSessionLocal):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.completed = 0
+        self.failed = 0
+        self._queue: "asyncio.Queue[Optional[AnalysisJob]]" = asyncio.Queue(maxsize=max_pending)
+        self._tasks: List[asyncio.Task] = []
+        # Latest job per submission id; a cancelled or superseded job is no longer in here
+        self._jobs: Dict[int, AnalysisJob] = {}
+        self._notify: Optional[Callable[[str, int], Awaitable[None]]] = None
+
+    def start(self, notify: Optional[Callable[[str, int], Awaitable[None]]] = None):
+        """Start the workers; `notify(message, user_id)` receives completion frames."""
+        self._notify = notify
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Finish the queued jobs, then stop the workers."""
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+    async def enqueue(self, submission_id: int, user_id: int, symptoms: SymptomInput):
+        """Queue a stored submission for analysis."""
+        job = AnalysisJob(submission_id, user_id, symptoms)
+        # A job already held for this id belongs to a deleted submission whose id was reused
+        self._jobs[submission_id] = job
+        await self._queue.put(job)
+
+    def cancel(self, submission_id: int):
+        """Skip the queued or running job of a deleted submission."""
+        self._jobs.pop(submission_id, None)
+
+    def _is_live(self, job: AnalysisJob) -> bool:
+        return self._jobs.get(job.submission_id) is job
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def _run(self):
+        while True:
+            job = await self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                job = self._queue.get_nowait()
+                if job is None:
+                    # Stop marker: finish this batch, then exit
+                    await self._process(batch)
+                    return
+                batch.append(job)
+            await self._process(batch)
+
+    async def _process(self, batch: List[AnalysisJob]):
+        try:
+            await self._analyse(batch)
+        finally:
+            for job in batch:
+                if self._is_live(job):
+                    del self._jobs[job.submission_id]
+
+    async def _analyse(self, batch: List[AnalysisJob]):
+        batch = [job for job in batch if self._is_live(job)]
+        if not batch:
+            return
+        try:
+            predictions = await run_in_threadpool(get_ai_service().predict_batch, [job.symptoms for job in batch])
+            results = [completed_values(prediction) for prediction in predictions]
+        except Exception as e:
+            logger.error(f"Symptom analysis of {len(batch)} submissions failed: {e}")
+            results = [{"status": FAILED} for _ in batch]
+
+        # Drop jobs cancelled while they were being scored
+        stored = [(job, values) for job, values in zip(batch, results) if self._is_live(job)]
+        try:
+            async with self.session_factory() as db:
+                # Lock the rows still waiting for these results, then update only those
+                owned = set((await db.execute(
+                    select(SymptomSubmission.id, SymptomSubmission.user_id)
+                    .where(SymptomSubmission.id.in_([job.submission_id for job, _ in stored]),
+                           SymptomSubmission.status == PENDING)
+                    .with_for_update()
+                )).all())
+                stored = [(job, values) for job, values in stored if (job.submission_id, job.user_id) in owned]
+                if stored:
+                    await db.execute(
+                        store_analysis,
+                        [{"submission_id": job.submission_id, "owner_id": job.user_id, **values}
+                         for job, values in stored]
+                    )
+                await db.commit()
+        except Exception as e:
+            # The database is down; the submissions stay pending
+            logger.error(f"Storing analysis of {len(batch)} submissions failed: {e}")
+            return
+
+        for job, values in stored:
+            if values["status"] == COMPLETED:
+                self.completed += 1
+            else:
+                self.failed += 1
+            if self._notify is not None:
+                await self._notify(analysis_event(job.submission_id, values), job.user_id)
+
+class CeleryAnalysisQueue:
+    """Hands submissions to Celery workers (see app.worker); they push results through Redis pub/sub."""
+
+    def start(self, notify=None):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def enqueue(self, submission_id: int, user_id: int, symptoms: SymptomInput):
+        """Queue a stored submission for analysis."""
+        from app.worker import analyze_submission
+
+        # Publishing to the broker is blocking network I/O
+        await run_in_threadpool(analyze_submission.delay, submission_id, user_id, symptoms.model_dump())
+
+    def cancel(self, submission_id: int):
+        # The task's guarded UPDATE matches nothing once the submission is deleted
+        pass
+
+    def pending(self) -> Optional[int]:
+        return None
+
+def create_analysis_queue():
+    """Build the queue selected by SYMPTOM_ANALYSIS_BACKEND, or None to analyse inline."""
+    if settings.SYMPTOM_ANALYSIS_BACKEND == "inline":
+        return None
+    if settings.SYMPTOM_ANALYSIS_BACKEND == "celery":
+        return CeleryAnalysisQueue()
+    return AsyncioAnalysisQueue(
+        workers=settings.SYMPTOM_ANALYSIS_WORKERS,
+        batch_size=settings.SYMPTOM_ANALYSIS_BATCH_SIZE,
+        max_pending=settings.SYMPTOM_ANALYSIS_MAX_PENDING,
+    )
+
+# Global symptom analysis queue
+analysis_queue = create_analysis_queue()
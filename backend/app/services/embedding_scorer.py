@@ -0,0 +1,208 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Example statements per label; each label's centroid is the mean of their embeddings
+LABEL_PROTOTYPES: Dict[str, Tuple[str, ...]] = {
+    "Anxiety": (
+        "I worry constantly and cannot relax",
+        "My heart races and I feel panic for no reason",
+        "I feel nervous and on edge all the time",
+    ),
+    "Depression": (
+        "I feel sad and empty most days",
+        "Nothing seems worth doing anymore and I feel hopeless",
+        "I have lost interest in things I used to enjoy",
+    ),
+    "Bipolar Disorder": (
+        "My mood swings between extreme highs and deep lows",
+        "Some weeks I barely sleep and feel unstoppable, then I crash",
+    ),
+    "PTSD": (
+        "I keep having flashbacks and nightmares about what happened",
+        "Loud noises make me jump and I avoid reminders of the trauma",
+    ),
+    "OCD": (
+        "I have to check things over and over or something bad will happen",
+        "Intrusive thoughts force me to repeat rituals",
+    ),
+    "ADHD": (
+        "I cannot focus or sit still and I lose track of everything",
+        "I act on impulse and my attention keeps drifting",
+    ),
+    "Eating Disorder": (
+        "I binge and then feel I have to purge",
+        "I restrict what I eat and obsess about my weight",
+    ),
+    "Substance Abuse": (
+        "I drink or use drugs to get through the day",
+        "I cannot stop using even though it is hurting me",
+    ),
+    "Schizophrenia": (
+        "I hear voices that other people do not hear",
+        "I believe people are watching me and plotting against me",
+    ),
+    "Personality Disorder": (
+        "My relationships are intense and unstable and I fear abandonment",
+        "I do not know who I am and my sense of self keeps shifting",
+    ),
+    "No Disorder": (
+        "I feel fine and things are going well",
+        "I am a little tired but generally doing okay",
+    ),
+}
+
+class EmbeddingScorer:
+    """Scores texts by cosine similarity between their embedding and per-label centroids.
+
+    Embeddings are the attention-masked mean of a local Hugging Face
+    encoder's last hidden state, L2-normalized. The (labels x dim) centroid
+    matrix is built once from `prototypes`, saved as .npy in `cache_dir`
+    under a name derived from the model and the prototypes, and opened
+    memory-mapped afterwards, so workers share its pages. Scoring a new text
+    is one embedding plus one matrix-vector product; embeddings of recently
+    seen texts come from an LRU cache of `cache_size` entries, and a batch
+    embeds all of its uncached texts in one forward pass. Similarities
+    are turned into probabilities with a softmax at `temperature`.
+    """
+
+    def __init__(self, model_dir: str, labels: Sequence[str], prototypes: Dict[str, Sequence[str]] = LABEL_PROTOTYPES,
+                 cache_dir: Optional[str] = None, cache_size: int = 10000, temperature: float = 0.05,
+                 quantize: bool = True, max_length: int = 128, num_threads: int = 0):
+        self.model_dir = model_dir
+        self.labels: Tuple[str, ...] = tuple(labels)
+        self.prototypes = {label: tuple(prototypes[label]) for label in self.labels}
+        self.cache_dir = cache_dir or model_dir
+        self.cache_size = cache_size
+        self.temperature = temperature
+        self.quantize = quantize
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self.centroids = None
+        self._tokenizer = None
+        self._model = None
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: "OrderedDict[str, object]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.centroids is not None
+
+    def centroids_path(self) -> str:
+        """Where the centroid matrix for this model and these prototypes is stored."""
+        with open(os.path.join(self.model_dir, "config.json"), "rb") as f:
+            digest = hashlib.sha1(f.read())
+        digest.update(json.dumps([self.prototypes[label] for label in self.labels]).encode())
+        return os.path.join(self.cache_dir, f"label_centroids-{digest.hexdigest()[:12]}.npy")
+
+    def load(self):
+        """Load the encoder and the centroid matrix, building and saving it on first use."""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            import numpy as np
+            import torch
+            from transformers import AutoModel, AutoTokenizer
+
+            started = time.perf_counter()
+            if self.num_threads:
+                torch.set_num_threads(self.num_threads)
+            model = AutoModel.from_pretrained(self.model_dir)
+            model.eval()
+            if self.quantize:
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._model = model
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+
+            path = self.centroids_path()
+            if not os.path.exists(path):
+                centroids = np.stack([
+                    self.embed(list(self.prototypes[label])).mean(axis=0) for label in self.labels
+                ])
+                centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+                # Write then rename, so concurrent workers never open a half-written file
+                partial = f"{path}.{os.getpid()}.tmp"
+                with open(partial, "wb") as f:
+                    np.save(f, centroids.astype(np.float32))
+                os.replace(partial, path)
+            self.centroids = np.load(path, mmap_mode="r")
+            logger.info(f"Loaded embedding scorer from {self.model_dir} with {path} in "
+                        f"{time.perf_counter() - started:.2f}s")
+
+    def warmup(self):
+        """Load everything and embed once, so the first request pays no setup cost."""
+        self.load()
+        self.embed(["warming up the scorer"])
+
+    def embed(self, texts: List[str]):
+        """Return a (len(texts), dim) array of L2-normalized embeddings, bypassing the cache."""
+        import torch
+
+        encoded = self._tokenizer(texts, padding=True, truncation=True,
+                                  max_length=self.max_length, return_tensors="pt")
+        with torch.inference_mode():
+            hidden = self._model(**encoded)[0]
+        mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return torch.nn.functional.normalize(pooled, dim=1).numpy()
+
+    def _cached_embeddings(self, texts: List[str]):
+        """Embeddings for `texts`, embedding the ones not in the cache in one batch."""
+        import numpy as np
+
+        found = {}
+        missing = []
+        with self._cache_lock:
+            for text in texts:
+                embedding = self._cache.get(text)
+                if embedding is None:
+                    missing.append(text)
+                else:
+                    self._cache.move_to_end(text)
+                    found[text] = embedding
+            self.cache_hits += len(texts) - len(missing)
+        if missing:
+            missing = list(dict.fromkeys(missing))
+            fresh = self.embed(missing)
+            with self._cache_lock:
+                for text, embedding in zip(missing, fresh):
+                    self._cache[text] = embedding
+                    self._cache.move_to_end(text)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                self.cache_misses += len(missing)
+            found.update(zip(missing, fresh))
+        return np.stack([found[text] for text in texts])
+
+    def _probabilities(self, similarities):
+        import numpy as np
+
+        logits = similarities / self.temperature
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        weights = np.exp(logits)
+        return weights / weights.sum(axis=-1, keepdims=True)
+
+    def score(self, text: str):
+        """Label probabilities for one text: one (cached) embedding and one matrix-vector product."""
+        self.load()
+        return self._probabilities(self.centroids @ self._cached_embeddings([text])[0])
+
+    def predict_proba(self, texts: List[str]):
+        """Return a (len(texts), len(labels)) array of label probabilities."""
+        self.load()
+        return self._probabilities(self._cached_embeddings(texts) @ self.centroids.T)
+
+    def cache_stats(self) -> dict:
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._cache)}
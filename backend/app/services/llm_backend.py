@@ -0,0 +1,122 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import re
+
+from app.core.config import settings
+from app.core.serialization import loads
+
+SYSTEM_PROMPT = (
+    "You are a supportive mental health assistant. Listen, respond with empathy, "
+    "suggest healthy coping strategies, and encourage professional help when appropriate. "
+    "You do not diagnose."
+)
+
+class LLMBackend(ABC):
+    """Interface for chat response generators that stream text as it is produced."""
+
+    # Recorded in ChatMessage.ai_model_used
+    model_name = "unknown"
+
+    @abstractmethod
+    def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Yield the reply to an OpenAI-style message list, one text delta at a time.
+
+        Implement as an async generator (`async def` with `yield`).
+        """
+
+    async def aclose(self):
+        """Release network resources."""
+
+class KeywordBackend(LLMBackend):
+    """Canned replies chosen by keyword; needs no network and is fully deterministic."""
+
+    model_name = "keyword"
+
+    def respond(self, user_message: str) -> str:
+        message_lower = user_message.lower()
+
+        if any(word in message_lower for word in ["anxiety", "anxious", "worried"]):
+            return "I understand you're feeling anxious. Try taking deep breaths and focusing on the present moment. Would you like to talk about what's making you feel this way?"
+
+        elif any(word in message_lower for word in ["depressed", "sad", "down"]):
+            return "I'm sorry you're feeling this way. It's important to remember that these feelings are temporary. Have you been able to maintain your daily routines?"
+
+        elif any(word in message_lower for word in ["sleep", "insomnia", "tired"]):
+            return "Sleep issues can significantly impact mental health. Try maintaining a consistent sleep schedule and creating a relaxing bedtime routine. How many hours of sleep are you getting?"
+
+        elif any(word in message_lower for word in ["help", "support", "counseling"]):
+            return "It's great that you're reaching out for help. Professional support can be very beneficial. Would you like me to help you find resources in your area?"
+
+        else:
+            return "Thank you for sharing that with me. I'm here to listen and help. Can you tell me more about how you're feeling today?"
+
+    async def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        user_message = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        # Word-sized deltas, so clients exercise the same streaming path as with a real model
+        for word in re.findall(r"\S+\s*", self.respond(user_message)):
+            yield word
+            await asyncio.sleep(0)
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Streams from any server implementing OpenAI's /chat/completions with `stream: true`."""
+
+    def __init__(self, base_url: str, api_key: str, model: str, timeout: float = 30.0, transport=None):
+        import httpx
+
+        self.model = model
+        self.model_name = model
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            timeout=timeout,
+            transport=transport,
+        )
+
+    async def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        payload = {"model": self.model, "messages": messages, "stream": True}
+        async with self._client.stream("POST", "/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            # Server-sent events: one "data: {chunk}" line per delta, ending with "data: [DONE]"
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = loads(data)
+                for choice in chunk.get("choices", ()):
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        yield content
+
+    async def aclose(self):
+        await self._client.aclose()
+
+def create_llm_backend() -> LLMBackend:
+    """Build the backend selected by LLM_BACKEND."""
+    if settings.LLM_BACKEND == "openai":
+        return OpenAICompatibleBackend(
+            settings.OPENAI_BASE_URL,
+            settings.OPENAI_API_KEY,
+            settings.OPENAI_MODEL,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+        )
+    return KeywordBackend()
+
+# Global LLM backend
+_llm_backend: Optional[LLMBackend] = None
+
+def get_llm_backend() -> LLMBackend:
+    """Return the process-wide LLM backend, creating it on first use."""
+    global _llm_backend
+    if _llm_backend is None:
+        _llm_backend = create_llm_backend()
+    return _llm_backend
+
+async def close_llm_backend():
+    """Close the process-wide LLM backend, e.g. on shutdown."""
+    global _llm_backend
+    if _llm_backend is not None:
+        await _llm_backend.aclose()
+        _llm_backend = None
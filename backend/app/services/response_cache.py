@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import re
+import time
+
+from app.core.config import settings
+from app.services.ai_service import get_ai_service
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+def normalize_message(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace, so "I feel anxious!" == "i feel  anxious"."""
+    return _NON_WORD.sub(" ", (text or "").lower().replace("'", "")).strip()
+
+def redact_key(key: str) -> str:
+    """`model|intent|digest` for a cache key, safe to expose in stats: the message text is hashed."""
+    model_name, intent, normalized = key.split("|", 2)
+    return f"{model_name}|{intent}|{hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()}"
+
+class CacheKey(NamedTuple):
+    """Where a message's reply is cached; `crisis` messages are never cached."""
+    key: Optional[str]
+    intent: str
+    crisis: bool
+
+class ResponseCache:
+    """Bounded LRU + TTL cache of chat replies keyed on model, intent and normalized text.
+
+    Intent is the strongest keyword label of the message (or "general"),
+    from the same matcher symptom scoring uses; the scan also flags crisis
+    phrases, which always bypass the cache. Messages longer than
+    `max_message_chars` are not cached, since they rarely repeat; the raw
+    length is checked before the scan, so they cost almost nothing. Each
+    entry counts its own hits; stats only report keys with the message text
+    hashed (see `redact_key`), since keys hold what users wrote.
+    """
+
+    def __init__(self, max_size: int = 5000, ttl_seconds: int = 3600, max_message_chars: int = 200):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_message_chars = max_message_chars
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        # key -> [reply, expires_at, hits]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+
+    def key_for(self, model_name: str, message: str) -> CacheKey:
+        """Build the cache key for a message, or a key of None if it must not be cached.
+        
+        Messages already too long before normalizing are bypassed without
+        scanning them, so their key carries no intent or crisis flag.
+        """
+        if message and len(message) > self.max_message_chars:
+            self.bypassed += 1
+            return CacheKey(None, "general", False)
+        scan = get_ai_service().matcher.scan(message)
+        matched = {label: count for label, count in scan.label_counts.items() if count}
+        intent = max(matched, key=matched.get) if matched else "general"
+        normalized = normalize_message(message)
+        if scan.crisis or not normalized or len(normalized) > self.max_message_chars:
+            self.bypassed += 1
+            return CacheKey(None, intent, scan.crisis)
+        return CacheKey(f"{model_name}|{intent}|{normalized}", intent, False)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached reply for a key, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        entry[2] += 1
+        self.hits += 1
+        return entry[0]
+
+    async def set(self, key: str, reply: str):
+        """Cache a reply."""
+        self._entries[key] = [reply, time.monotonic() + self.ttl_seconds, 0]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def top_entries(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """Return the most-hit keys in this worker, redacted, with their hit counts."""
+        ranked = sorted(self._entries.items(), key=lambda item: item[1][2], reverse=True)
+        return [(redact_key(key), entry[2]) for key, entry in ranked[:limit] if entry[2]]
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the most-hit entries for this worker."""
+        total = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / total if total else 0.0,
+            "top_entries": self.top_entries(),
+        }
+
+class RedisResponseCache(ResponseCache):
+    """Reply cache with the in-process LRU in front of a Redis tier shared by all workers.
+
+    Redis hits are copied into the local tier. Per-entry hit counts are
+    kept in one Redis hash per TTL-long window, keyed by redacted key, so
+    they add up across workers and expire with the entries they count.
+    Redis errors count as misses.
+    """
+
+    KEY_PREFIX = "chat:reply:"
+    HITS_KEY_PREFIX = "chat:reply-hits:"
+
+    def __init__(self, redis_url: str, max_size: int = 5000, ttl_seconds: int = 3600, max_message_chars: int = 200):
+        super().__init__(max_size=max_size, ttl_seconds=ttl_seconds, max_message_chars=max_message_chars)
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        reply = await super().get(key)
+        if reply is None:
+            try:
+                reply = await self._redis.get(self.KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Response cache lookup failed: {e}")
+            if reply is None:
+                return None
+            # Counted as a miss locally above; it is a hit overall
+            self.misses -= 1
+            self.hits += 1
+            await super().set(key, reply)
+        # Counted in the background so a local hit never waits on Redis
+        asyncio.create_task(self._count_hit(key))
+        return reply
+    
+    def _hits_key(self) -> str:
+        return self.HITS_KEY_PREFIX + str(int(time.time() // self.ttl_seconds))
+
+    async def _count_hit(self, key: str):
+        hits_key = self._hits_key()
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.hincrby(hits_key, redact_key(key), 1)
+                # Kept for one more window, so the previous window stays readable
+                pipe.expire(hits_key, self.ttl_seconds * 2)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Response cache hit count failed: {e}")
+
+    async def set(self, key: str, reply: str):
+        await super().set(key, reply)
+        try:
+            await self._redis.set(self.KEY_PREFIX + key, reply, ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {e}")
+
+    async def shared_top_entries(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """Return the most-hit redacted keys across all workers in the current window."""
+        counts = await self._redis.hgetall(self._hits_key())
+        ranked = sorted(((key, int(hits)) for key, hits in counts.items()), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    def stats(self) -> dict:
+        return {**super().stats(), "backend": "redis"}
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Build the cache selected by RESPONSE_CACHE_BACKEND, or None when it is "off"."""
+    if settings.RESPONSE_CACHE_BACKEND == "off":
+        return None
+    options = dict(
+        max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+        max_message_chars=settings.RESPONSE_CACHE_MAX_MESSAGE_CHARS,
+    )
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisResponseCache(settings.REDIS_URL, **options)
+    return ResponseCache(**options)
+
+# Global chat reply cache
+response_cache = create_response_cache()
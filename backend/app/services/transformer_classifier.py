@@ -0,0 +1,209 @@
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence, Tuple
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+
+class TransformerClassifier:
+    """Sequence classifier loaded from a local Hugging Face model directory, on CPU only.
+
+    `engine` is "torch" (Linear layers dynamically quantized to int8 unless
+    `quantize` is off) or "onnx" (ONNX Runtime on the file written by
+    `export_onnx`, its int8 variant when `quantize` is on). The model's
+    `id2label` names are the labels scores are returned for. Nothing is
+    loaded until `load` or the first `predict_proba` call.
+    """
+
+    def __init__(self, model_dir: str, engine: str = "torch", quantize: bool = True,
+                 max_length: int = 128, num_threads: int = 0):
+        if engine not in ("torch", "onnx"):
+            raise ValueError(f"Unknown transformer engine '{engine}'")
+        self.model_dir = model_dir
+        self.engine = engine
+        self.quantize = quantize
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self.labels: Tuple[str, ...] = ()
+        self._tokenizer = None
+        self._model = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._tokenizer is not None
+
+    def load(self):
+        """Load the tokenizer and model; safe to call from several threads."""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            from transformers import AutoConfig, AutoTokenizer
+
+            started = time.perf_counter()
+            config = AutoConfig.from_pretrained(self.model_dir)
+            labels = tuple(config.id2label[i] for i in range(config.num_labels))
+            if self.engine == "torch":
+                self._model = self._load_torch()
+            else:
+                self._session = self._load_onnx()
+            self.labels = labels
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+            logger.info(
+                f"Loaded {self.engine} classifier from {self.model_dir} "
+                f"({'int8' if self.quantize else 'fp32'}) in {time.perf_counter() - started:.2f}s"
+            )
+
+    def _load_torch(self):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_dir, torchscript=True)
+        model.eval()
+        if self.quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def _load_onnx(self):
+        import onnxruntime
+
+        path = os.path.join(self.model_dir, ONNX_INT8_FILE if self.quantize else ONNX_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run export_onnx('{self.model_dir}') first")
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        return onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def warmup(self, batch_sizes: Sequence[int] = (1, 8)):
+        """Load the model and run it once per batch size, so the first request pays no setup cost."""
+        self.load()
+        for size in batch_sizes:
+            self.predict_proba(["warming up the classifier"] * size)
+
+    def predict_proba(self, texts: List[str]):
+        """Return a (len(texts), len(labels)) float32 array of label probabilities."""
+        import numpy as np
+
+        self.load()
+        if self.engine == "torch":
+            import torch
+
+            encoded = self._tokenizer(texts, padding=True, truncation=True,
+                                      max_length=self.max_length, return_tensors="pt")
+            with torch.inference_mode():
+                logits = self._model(input_ids=encoded["input_ids"], attention_mask=encoded["attention_mask"])[0]
+            logits = logits.float().numpy()
+        else:
+            encoded = self._tokenizer(texts, padding=True, truncation=True,
+                                      max_length=self.max_length, return_tensors="np")
+            inputs = {i.name: encoded[i.name].astype(np.int64) for i in self._session.get_inputs()}
+            logits = self._session.run(None, inputs)[0]
+        # Softmax
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return (probabilities / probabilities.sum(axis=1, keepdims=True)).astype(np.float32)
+
+def export_onnx(model_dir: str, quantize: bool = True):
+    """Export a Hugging Face classifier in `model_dir` to ONNX next to it, plus an int8 copy."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir, torchscript=True)
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    axes = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"]),
+        os.path.join(model_dir, ONNX_FILE),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={"input_ids": axes, "attention_mask": axes, "logits": {0: "batch"}},
+        opset_version=14,
+    )
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(os.path.join(model_dir, ONNX_FILE), os.path.join(model_dir, ONNX_INT8_FILE),
+                         weight_type=QuantType.QInt8)
+
+class MicroBatcher:
+    """Runs `predict(items)` on batches gathered from concurrent callers.
+
+    `submit` blocks the calling thread (request handlers call the AI service
+    from Starlette's thread pool). A single runner thread takes the first
+    waiting item, then keeps collecting until `max_batch_size` items or
+    `max_wait_ms` after that first item, whichever comes first, and runs
+    one model call for all of them. Under light load a request waits at
+    most `max_wait_ms` extra; under heavy load batches fill up at once.
+    """
+
+    def __init__(self, predict: Callable[[list], Sequence], max_batch_size: int = 32, max_wait_ms: float = 5):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._queue: "queue.Queue[Tuple[object, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit_many(self, items: list) -> list:
+        """Queue items and block until all of their results are ready."""
+        self._ensure_started()
+        futures = []
+        for item in items:
+            future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def submit(self, item):
+        """Queue one item and block until its result is ready."""
+        return self.submit_many([item])[0]
+
+    def pending(self) -> int:
+        """Items waiting for a batch."""
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = self.predict([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
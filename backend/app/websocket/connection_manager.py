@@ -1,58 +1,174 @@
-from fastapi import WebSocket
-from typing import List, Dict
-import json
+from fastapi import WebSocket, status
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
 import asyncio
-from app.services.ai_service import AIService
+import logging
+import time
+from app.core.config import settings
+from app.core.metrics import CHAT_REPLY_SECONDS
+from app.core.serialization import FrameTemplate, dumps
+from app.core.write_buffer import chat_message_buffer
+from app.services.ai_service import get_ai_service
+from app.services.llm_backend import SYSTEM_PROMPT, get_llm_backend
+from app.services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+async def _replay(reply: str):
+    """Stream a cached reply as a single delta."""
+    yield reply
+
+class ClientConnection:
+    """One socket with a bounded outbound queue drained by its own writer task.
+    
+    Senders only enqueue, so a slow client never blocks the caller; when its
+    queue is full the client is too far behind and is disconnected.
+    """
+    
+    def __init__(self, websocket: WebSocket, user_id: Optional[int], queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.user_connections: Dict[int, WebSocket] = {}
-        self.ai_service = AIService()
+    def __init__(self, queue_size: int = settings.WS_SEND_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.user_connections: Dict[int, Set[ClientConnection]] = {}
+        self.dropped_connections = 0
+        # Set to a RedisRelay to reach sockets held by other workers
+        self.relay = None
+        # Chat replies being generated right now, for load shedding
+        self.active_replies = 0
+        self.ai_service = get_ai_service()
     
     async def connect(self, websocket: WebSocket, user_id: int = None):
         """Accept a new WebSocket connection."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.register(websocket, user_id)
+    
+    def register(self, websocket: WebSocket, user_id: int = None) -> ClientConnection:
+        """Track an accepted socket and start its writer task."""
+        connection = ClientConnection(websocket, user_id, self.queue_size)
+        connection.writer = asyncio.create_task(self._run_writer(connection))
+        self.active_connections[websocket] = connection
         if user_id:
-            self.user_connections[user_id] = websocket
+            if user_id not in self.user_connections:
+                self.user_connections[user_id] = set()
+                if self.relay is not None:
+                    self.relay.user_online(user_id)
+            self.user_connections[user_id].add(connection)
+        return connection
     
     def disconnect(self, websocket: WebSocket, user_id: int = None):
         """Remove a WebSocket connection."""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if user_id and user_id in self.user_connections:
-            del self.user_connections[user_id]
+        connection = self.active_connections.pop(websocket, None)
+        if connection is None:
+            return
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+        sockets = self.user_connections.get(connection.user_id)
+        if sockets is not None:
+            sockets.discard(connection)
+            if not sockets:
+                del self.user_connections[connection.user_id]
+                if self.relay is not None:
+                    self.relay.user_offline(connection.user_id)
     
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        """Send a message to a specific WebSocket connection."""
+    async def _run_writer(self, connection: ClientConnection):
         try:
-            await websocket.send_text(message)
+            while True:
+                message = await connection.queue.get()
+                await connection.websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            print(f"Error sending message: {e}")
+            logger.info(f"WebSocket send failed, dropping connection: {e}")
+            self.disconnect(connection.websocket)
+    
+    def _enqueue(self, connection: ClientConnection, message: str):
+        try:
+            connection.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped_connections += 1
+            logger.warning(f"WebSocket client of user {connection.user_id} is too slow, disconnecting")
+            self.disconnect(connection.websocket)
+            asyncio.create_task(self._close(connection.websocket, status.WS_1013_TRY_AGAIN_LATER))
+    
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+    
+    async def send_personal_message(self, message: str, websocket: WebSocket):
+        """Send a message to a specific WebSocket connection.
+        
+        Frames for a socket that is no longer registered (closed, or dropped
+        for falling behind) are discarded rather than sent directly, so the
+        rest of a streamed reply never waits on a client that was shed.
+        """
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            logger.debug("Dropping frame for a WebSocket that is no longer connected")
+            return
+        self._enqueue(connection, message)
     
     async def send_to_user(self, message: str, user_id: int):
-        """Send a message to a specific user."""
-        if user_id in self.user_connections:
-            await self.send_personal_message(message, self.user_connections[user_id])
+        """Send a message to every open socket of a user, on any worker."""
+        self.send_to_user_local(message, user_id)
+        if self.relay is not None:
+            self.relay.publish_to_user(user_id, message)
+    
+    def send_to_user_local(self, message: str, user_id: int):
+        """Send a message to the user's sockets held by this worker."""
+        for connection in list(self.user_connections.get(user_id, ())):
+            self._enqueue(connection, message)
     
     async def broadcast(self, message: str):
-        """Broadcast a message to all active connections."""
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                print(f"Error broadcasting message: {e}")
+        """Broadcast a message to all active connections, on any worker.
+        
+        Each socket's writer task delivers its copy, so the fan-out runs
+        concurrently and returns without waiting on any client.
+        """
+        self.broadcast_local(message)
+        if self.relay is not None:
+            self.relay.publish_broadcast(message)
+    
+    def broadcast_local(self, message: str):
+        """Broadcast a message to the sockets held by this worker."""
+        for connection in list(self.active_connections.values()):
+            self._enqueue(connection, message)
     
-    async def handle_chat_message(self, websocket: WebSocket, message_data: dict, user_id: int):
-        """Handle incoming chat messages and generate AI responses."""
+    async def close_all(self):
+        """Close every socket, e.g. on shutdown."""
+        connections = list(self.active_connections.values())
+        for connection in connections:
+            self.disconnect(connection.websocket)
+        await asyncio.gather(*(
+            self._close(connection.websocket, status.WS_1001_GOING_AWAY) for connection in connections
+        ))
+    
+    async def handle_chat_message(self, websocket: WebSocket, message_data: dict, user_id: int,
+                                  persist: bool = False):
+        """Handle incoming chat messages and stream AI responses.
+        
+        The reply is sent as `delta` frames while it is generated, then once
+        more in full as a `message` frame. With `persist`, both messages are
+        queued on the chat write-behind buffer; the caller must have checked
+        the session belongs to the user.
+        """
+        session_id = None
+        self.active_replies += 1
         try:
             user_message = message_data.get("content", "")
             session_id = message_data.get("session_id")
+            received_at = datetime.now(timezone.utc)
             
             # Send typing indicator
             await self.send_personal_message(
-                json.dumps({
+                dumps({
                     "type": "typing",
                     "content": "AI is thinking...",
                     "session_id": session_id
@@ -60,12 +176,54 @@ class ConnectionManager:
                 websocket
             )
             
-            # Generate AI response (simplified for now)
-            ai_response = await self._generate_ai_response(user_message, user_id)
+            backend = get_llm_backend()
+            model_used = backend.model_name
+            started = time.perf_counter()
+            first_token_ms = None
+            
+            # Repeated openers are served from the reply cache; crisis messages never are
+            cache_key = response_cache.key_for(backend.model_name, user_message) if response_cache else None
+            ai_response = await response_cache.get(cache_key.key) if cache_key and cache_key.key else None
+            if ai_response is not None:
+                model_used = f"cache:{backend.model_name}"
+                deltas = _replay(ai_response)
+            else:
+                deltas = backend.stream([
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_message},
+                ])
+            
+            # Every delta frame differs only in its content, so encode the rest once
+            delta_frame = FrameTemplate("content", type="delta", session_id=session_id)
+            parts = []
+            async for delta in deltas:
+                if first_token_ms is None:
+                    first_token_ms = int((time.perf_counter() - started) * 1000)
+                parts.append(delta)
+                await self.send_personal_message(delta_frame.render(delta), websocket)
+            ai_response = "".join(parts)
+            elapsed = time.perf_counter() - started
+            response_time_ms = int(elapsed * 1000)
+            CHAT_REPLY_SECONDS.observe(("llm" if model_used == backend.model_name else "cache",), elapsed)
+            if cache_key and cache_key.key and model_used == backend.model_name and ai_response:
+                await response_cache.set(cache_key.key, ai_response)
+            
+            if persist:
+                await chat_message_buffer.add(
+                    session_id=session_id, user_id=user_id, message=user_message, response=None,
+                    is_user_message=True, ai_model_used=None, response_time_ms=None,
+                    first_token_ms=None, created_at=received_at
+                )
+                await chat_message_buffer.add(
+                    session_id=session_id, user_id=user_id, message=ai_response, response=ai_response,
+                    is_user_message=False, ai_model_used=model_used,
+                    response_time_ms=response_time_ms, first_token_ms=first_token_ms,
+                    created_at=datetime.now(timezone.utc)
+                )
             
             # Send AI response
             await self.send_personal_message(
-                json.dumps({
+                dumps({
                     "type": "message",
                     "content": ai_response,
                     "session_id": session_id,
@@ -75,39 +233,14 @@ class ConnectionManager:
             )
             
         except Exception as e:
-            print(f"Error handling chat message: {e}")
+            logger.error(f"Error handling chat message: {e}")
             await self.send_personal_message(
-                json.dumps({
+                dumps({
                     "type": "error",
                     "content": "Sorry, I encountered an error. Please try again.",
                     "session_id": session_id
                 }),
                 websocket
             )
-    
-    async def _generate_ai_response(self, user_message: str, user_id: int) -> str:
-        """Generate AI response for chat messages."""
-        try:
-            # Simple keyword-based responses for demonstration
-            # In production, you would use a more sophisticated AI model
-            
-            message_lower = user_message.lower()
-            
-            if any(word in message_lower for word in ["anxiety", "anxious", "worried"]):
-                return "I understand you're feeling anxious. Try taking deep breaths and focusing on the present moment. Would you like to talk about what's making you feel this way?"
-            
-            elif any(word in message_lower for word in ["depressed", "sad", "down"]):
-                return "I'm sorry you're feeling this way. It's important to remember that these feelings are temporary. Have you been able to maintain your daily routines?"
-            
-            elif any(word in message_lower for word in ["sleep", "insomnia", "tired"]):
-                return "Sleep issues can significantly impact mental health. Try maintaining a consistent sleep schedule and creating a relaxing bedtime routine. How many hours of sleep are you getting?"
-            
-            elif any(word in message_lower for word in ["help", "support", "counseling"]):
-                return "It's great that you're reaching out for help. Professional support can be very beneficial. Would you like me to help you find resources in your area?"
-            
-            else:
-                return "Thank you for sharing that with me. I'm here to listen and help. Can you tell me more about how you're feeling today?"
-                
-        except Exception as e:
-            print(f"Error generating AI response: {e}")
-            return "I'm here to help. Please tell me more about what's on your mind."
+        finally:
+            self.active_replies -= 1
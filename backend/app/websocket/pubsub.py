@@ -0,0 +1,147 @@
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+import uuid
+
+from app.core.config import settings
+from app.core.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+class RedisRelay:
+    """Delivers WebSocket pushes to sockets held by other workers through Redis pub/sub.
+
+    Each worker subscribes to `ws:user:<id>` only while it holds a socket of
+    that user, plus `ws:broadcast`. Publishes are queued and sent in
+    pipelined batches. Every envelope carries the sending worker's id, so a
+    worker skips its own messages: local sockets were already served
+    directly, without the Redis round trip.
+    """
+
+    USER_CHANNEL = "ws:user:"
+    BROADCAST_CHANNEL = "ws:broadcast"
+
+    def __init__(self, redis_client, manager, batch_size: int = 256):
+        self.redis = redis_client
+        self.manager = manager
+        self.batch_size = batch_size
+        self.worker_id = uuid.uuid4().hex
+        self.published = 0
+        self.received = 0
+        self._outbox: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue()
+        self._pubsub = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Subscribe to the broadcast channel and start the reader and publisher tasks."""
+        self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.BROADCAST_CHANNEL)
+        for user_id in list(self.manager.user_connections):
+            await self._pubsub.subscribe(self.USER_CHANNEL + str(user_id))
+        self._tasks = [
+            asyncio.create_task(self._read()),
+            asyncio.create_task(self._publish_batches()),
+        ]
+
+    async def stop(self):
+        """Flush queued publishes, then stop the tasks and the subscription."""
+        await self._flush(self._drain())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    def user_online(self, user_id: int):
+        """Called when this worker gets its first socket for a user."""
+        if self._pubsub is not None:
+            asyncio.create_task(self._subscription(self._pubsub.subscribe, self.USER_CHANNEL + str(user_id)))
+
+    def user_offline(self, user_id: int):
+        """Called when this worker closes its last socket for a user."""
+        if self._pubsub is not None:
+            asyncio.create_task(self._subscription(self._pubsub.unsubscribe, self.USER_CHANNEL + str(user_id)))
+
+    async def _subscription(self, action, channel: str):
+        try:
+            await action(channel)
+        except Exception as e:
+            logger.warning(f"Pub/sub (un)subscribe to {channel} failed: {e}")
+
+    def publish_to_user(self, user_id: int, message: str):
+        """Queue a message for the user's sockets on other workers."""
+        self._queue(self.USER_CHANNEL + str(user_id), message)
+
+    def publish_broadcast(self, message: str):
+        """Queue a message for every socket on other workers."""
+        self._queue(self.BROADCAST_CHANNEL, message)
+
+    def _queue(self, channel: str, message: str):
+        envelope = dumps({"origin": self.worker_id, "message": message})
+        self._outbox.put_nowait((channel, envelope))
+
+    def _drain(self, first: Optional[Tuple[str, str]] = None) -> List[Tuple[str, str]]:
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size and not self._outbox.empty():
+            batch.append(self._outbox.get_nowait())
+        return batch
+
+    async def _flush(self, batch: List[Tuple[str, str]]):
+        if not batch:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for channel, envelope in batch:
+                    pipe.publish(channel, envelope)
+                await pipe.execute()
+            self.published += len(batch)
+        except Exception as e:
+            logger.warning(f"Pub/sub publish of {len(batch)} messages failed: {e}")
+
+    async def _publish_batches(self):
+        while True:
+            first = await self._outbox.get()
+            # Everything queued while the previous batch was in flight goes in one pipeline
+            await self._flush(self._drain(first))
+
+    async def _read(self):
+        while True:
+            try:
+                data = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Pub/sub read failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if data is None or data.get("type") != "message":
+                continue
+            self._deliver(data["channel"], data["data"])
+
+    def _deliver(self, channel, payload):
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        try:
+            envelope = loads(payload)
+            origin, message = envelope["origin"], envelope["message"]
+        except (ValueError, TypeError, KeyError) as e:
+            # One bad publish must not stop this worker's relay
+            logger.warning(f"Ignoring malformed pub/sub message on {channel}: {e}")
+            return
+        if origin == self.worker_id:
+            return
+        self.received += 1
+        if channel == self.BROADCAST_CHANNEL:
+            self.manager.broadcast_local(message)
+        elif channel.startswith(self.USER_CHANNEL):
+            self.manager.send_to_user_local(message, int(channel[len(self.USER_CHANNEL):]))
+
+def create_relay(manager) -> Optional[RedisRelay]:
+    """Build the relay selected by WS_DELIVERY_BACKEND, or None for single-process delivery."""
+    if settings.WS_DELIVERY_BACKEND != "redis":
+        return None
+    import redis.asyncio as redis
+
+    return RedisRelay(redis.from_url(settings.REDIS_URL), manager)
@@ -1,57 +1,97 @@
-from fastapi import WebSocket, WebSocketDisconnect, Depends, HTTPException, status
+from fastapi import WebSocket, WebSocketDisconnect, HTTPException, status
 from fastapi.routing import APIRouter
-import json
-from typing import Optional
+from typing import Optional, Set
 
 from app.websocket.connection_manager import ConnectionManager
-from app.core.security import verify_token
-from app.core.database import get_db
-from app.models.user import User
-from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.rate_limit import client_ip, rate_limiter
+from app.core.serialization import dumps, loads
+from app.core.user_cache import resolve_user
+from app.models.chat import ChatSession
+from app.schemas.user import User as UserSchema
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 # Global connection manager
 connection_manager = ConnectionManager()
 
-async def get_current_user_from_token(token: str, db: Session) -> Optional[User]:
+async def get_current_user_from_token(token: str, db: AsyncSession) -> Optional[UserSchema]:
     """Get current user from JWT token."""
-    email = verify_token(token)
-    if not email:
-        return None
-    
-    user = db.query(User).filter(User.email == email).first()
-    return user
+    return await resolve_user(token, db)
+
+async def owns_session(user_id: int, session_id) -> bool:
+    """Check that a chat session exists and belongs to the user."""
+    if not isinstance(session_id, int):
+        return False
+    async with AsyncSessionLocal() as db:
+        found = await db.scalar(select(ChatSession.id).where(
+            ChatSession.id == session_id,
+            ChatSession.user_id == user_id
+        ))
+    return found is not None
+
+async def admit_chat_message(websocket: WebSocket, user: UserSchema) -> Optional[int]:
+    """Return None if a chat message may be answered now, else the seconds the client should wait."""
+    if connection_manager.active_replies >= settings.CHAT_SHED_ACTIVE_REPLIES:
+        return settings.AI_SHED_RETRY_AFTER_SECONDS
+    if rate_limiter is not None:
+        try:
+            await rate_limiter.check("ws_message", client_ip(websocket), user.email)
+        except HTTPException as e:
+            return int(e.headers["Retry-After"])
+    return None
 
 @router.websocket("/ws/{token}")
-async def websocket_endpoint(websocket: WebSocket, token: str, db: Session = Depends(get_db)):
+async def websocket_endpoint(websocket: WebSocket, token: str):
     """WebSocket endpoint for real-time chat."""
-    # Verify user token
-    user = await get_current_user_from_token(token, db)
+    # Verify user token; the session is released before the socket loop, so
+    # idle connections do not hold database connections
+    async with AsyncSessionLocal() as db:
+        user = await get_current_user_from_token(token, db)
     if not user:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
     
     # Connect user
     await connection_manager.connect(websocket, user.id)
+    # Sessions this socket may write to, checked once each
+    owned_sessions: Set[int] = set()
     
     try:
         while True:
             # Receive message from client
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = loads(data)
             
             # Handle different message types
             message_type = message_data.get("type", "message")
             
             if message_type == "message":
+                session_id = message_data.get("session_id")
+                retry_after = await admit_chat_message(websocket, user)
+                if retry_after is not None:
+                    await connection_manager.send_personal_message(
+                        dumps({
+                            "type": "error",
+                            "content": "Too many messages, please wait a moment.",
+                            "retry_after": retry_after,
+                            "session_id": session_id
+                        }),
+                        websocket
+                    )
+                    continue
+                if session_id not in owned_sessions and await owns_session(user.id, session_id):
+                    owned_sessions.add(session_id)
                 await connection_manager.handle_chat_message(
-                    websocket, message_data, user.id
+                    websocket, message_data, user.id, persist=session_id in owned_sessions
                 )
             elif message_type == "typing":
                 # Handle typing indicator
                 await connection_manager.send_personal_message(
-                    json.dumps({
+                    dumps({
                         "type": "typing_received",
                         "user_id": user.id,
                         "session_id": message_data.get("session_id")
@@ -61,7 +101,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str, db: Session = Dep
             else:
                 # Echo back unknown message types
                 await connection_manager.send_personal_message(
-                    json.dumps({
+                    dumps({
                         "type": "echo",
                         "content": f"Received: {message_data}",
                         "session_id": message_data.get("session_id")
@@ -0,0 +1,51 @@
+"""Celery worker for symptom analysis (SYMPTOM_ANALYSIS_BACKEND=celery).
+
+Run from the backend directory:
+    celery -A app.worker worker --loglevel=info
+
+Completion frames reach the user's WebSocket through the Redis relay, so the
+API workers must run with WS_DELIVERY_BACKEND=redis.
+"""
+import logging
+
+import redis
+from celery import Celery
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.serialization import dumps
+from app.models import chat, user  # noqa: F401  (registers mappers)
+from app.schemas.symptom import SymptomInput
+from app.services.ai_service import get_ai_service
+from app.services.analysis_jobs import FAILED, analysis_event, completed_values, store_analysis
+from app.websocket.pubsub import RedisRelay
+
+logger = logging.getLogger(__name__)
+
+celery_app = Celery("neuroq", broker=settings.REDIS_URL)
+celery_app.conf.task_acks_late = True
+
+# Global Redis client for completion pushes
+_redis = redis.Redis.from_url(settings.REDIS_URL)
+
+@celery_app.task(name="symptoms.analyze")
+def analyze_submission(submission_id: int, user_id: int, symptoms: dict):
+    """Score one submission, store the result in one UPDATE and notify the owner.
+
+    Nothing is stored or sent if the submission was deleted or is no longer pending.
+    """
+    try:
+        values = completed_values(get_ai_service().predict_batch([SymptomInput(**symptoms)])[0])
+    except Exception as e:
+        logger.error(f"Symptom analysis of submission {submission_id} failed: {e}")
+        values = {"status": FAILED}
+
+    with SessionLocal() as db:
+        updated = db.execute(store_analysis, [{"submission_id": submission_id, "owner_id": user_id, **values}]).rowcount
+        db.commit()
+    if not updated:
+        logger.info(f"Submission {submission_id} was deleted or already analysed; dropping its result")
+        return
+
+    # Same envelope RedisRelay publishes; no API worker skips it as its own
+    envelope = dumps({"origin": "celery", "message": analysis_event(submission_id, values)})
+    _redis.publish(RedisRelay.USER_CHANNEL + str(user_id), envelope)
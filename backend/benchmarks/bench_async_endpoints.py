@@ -0,0 +1,109 @@
+"""Compare the async endpoint path against the old sync path.
+
+Drives GET /api/v1/symptoms/history through the real app (async def +
+AsyncSession) and through a replica of the previous sync handler (def +
+Session on Starlette's thread pool), both in-process against the same SQLite
+file, and reports requests per second and latency percentiles.
+
+Keep --concurrency below the sync engine's pool size plus overflow (15 by
+default): above that the sync path starves Starlette's thread pool waiting
+on connections and times out, which is the ceiling this change removes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_async_endpoints [--requests 2000] [--concurrency 12]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault("DEBUG", "False")
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.auth import oauth2_scheme
+from app.core.database import Base, SessionLocal, engine, get_db
+from app.core.security import create_access_token, verify_token
+from app.main import app
+from app.models.chat import ChatMessage, ChatSession  # noqa: F401  (registers mappers)
+from app.models.symptom import SymptomSubmission
+from app.models.user import User
+from app.schemas.symptom import SymptomHistory
+
+HISTORY_PATH = "/api/v1/symptoms/history"
+
+sync_app = FastAPI()
+
+def sync_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+    email = verify_token(token)
+    user = db.query(User).filter(User.email == email).first() if email else None
+    if user is None:
+        raise HTTPException(status_code=401)
+    return user
+
+@sync_app.get(HISTORY_PATH, response_model=SymptomHistory)
+def sync_history(page: int = 1, per_page: int = 10,
+                 current_user: User = Depends(sync_current_user), db: Session = Depends(get_db)):
+    offset = (page - 1) * per_page
+    query = db.query(SymptomSubmission).filter(SymptomSubmission.user_id == current_user.id)
+    total_count = query.count()
+    submissions = query.order_by(SymptomSubmission.created_at.desc()).offset(offset).limit(per_page).all()
+    return SymptomHistory(submissions=submissions, total_count=total_count, page=page, per_page=per_page)
+
+def seed(rows: int) -> str:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", username="bench", full_name="Bench", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add_all(
+            SymptomSubmission(user_id=user.id, input_text=f"entry {i}", predicted_disorder="Anxiety",
+                              confidence_score=0.6, severity_level="mild")
+            for i in range(rows)
+        )
+        db.commit()
+    return create_access_token({"sub": "bench@example.com"})
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def drive(target, token: str, requests: int, concurrency: int):
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    queue = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=target), base_url="http://bench") as client:
+        async def worker():
+            for i in queue:
+                start = time.perf_counter()
+                response = await client.get(HISTORY_PATH, params={"page": i % 20 + 1}, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return requests / elapsed, percentile(latencies, 50) * 1e3, percentile(latencies, 99) * 1e3
+
+async def main(requests: int, concurrency: int):
+    token = seed(500)
+    print(f"{'path':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    async with app.router.lifespan_context(app):
+        for name, target in (("sync", sync_app), ("async", app)):
+            await drive(target, token, min(requests, 100), concurrency)  # warm up
+            rps, p50, p99 = await drive(target, token, requests, concurrency)
+            print(f"{name:>6} {rps:>9.0f} {p50:>8.2f} {p99:>8.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=12)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
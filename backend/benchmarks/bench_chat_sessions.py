@@ -0,0 +1,117 @@
+"""Count SQL statements and time GET /chat/sessions in each loading mode.
+
+Seeds one user with --sessions sessions of --messages messages each, then
+requests the list in full, capped (messages_limit) and summary mode at two
+page sizes. The statement count per request must not grow with the page
+size; the script exits non-zero if it does, so it can gate a CI job.
+
+Run from the backend directory:
+    python -m benchmarks.bench_chat_sessions [--sessions 50] [--messages 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault("DEBUG", "False")
+
+import httpx
+from sqlalchemy import event, insert
+
+from app.core.database import Base, SessionLocal, async_engine, engine
+from app.core.security import create_access_token
+from app.main import app
+from app.models.chat import ChatMessage, ChatSession
+from app.models.symptom import SymptomSubmission  # noqa: F401  (registers mappers)
+from app.models.user import User
+
+SESSIONS_PATH = "/api/v1/chat/sessions"
+
+# Expected statements per request with a warm user cache and include_total=false
+EXPECTED_STATEMENTS = {"full": 2, "capped": 2, "summary": 1}
+
+MODES = {
+    "full": {},
+    "capped": {"messages_limit": 20},
+    "summary": {"summary": True},
+}
+
+def seed(sessions: int, messages: int) -> str:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", username="bench", full_name="Bench", hashed_password="x")
+        db.add(user)
+        db.flush()
+        session_ids = db.scalars(
+            insert(ChatSession).returning(ChatSession.id),
+            [{"user_id": user.id, "session_name": f"session {i}"} for i in range(sessions)]
+        ).all()
+        db.execute(insert(ChatMessage), [
+            {"session_id": session_id, "user_id": user.id, "message": f"message {j}", "is_user_message": j % 2 == 0}
+            for session_id in session_ids
+            for j in range(messages)
+        ])
+        db.commit()
+    return create_access_token({"sub": "bench@example.com"})
+
+class StatementCounter:
+    """Counts statements sent to the async engine's DBAPI connections."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+async def measure(client: httpx.AsyncClient, counter: StatementCounter, params: dict, headers: dict, repeat: int):
+    """Return (statements per request, median latency in ms, response size in bytes)."""
+    samples = []
+    statements = set()
+    size = 0
+    for _ in range(repeat):
+        before = counter.count
+        started = time.perf_counter()
+        response = await client.get(SESSIONS_PATH, params=params, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        statements.add(counter.count - before)
+        size = len(response.content)
+    samples.sort()
+    return max(statements), samples[len(samples) // 2], size
+
+async def main(sessions: int, messages: int, repeat: int) -> int:
+    token = seed(sessions, messages)
+    headers = {"Authorization": f"Bearer {token}"}
+    counter = StatementCounter()
+    failures = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm the user cache so only the list queries are counted
+        await client.get(SESSIONS_PATH, params={"per_page": 1}, headers=headers)
+
+        print(f"{sessions} sessions x {messages} messages, median of {repeat} requests")
+        for mode, extra in MODES.items():
+            for per_page in (sessions // 5 or 1, sessions):
+                params = {"per_page": per_page, "include_total": False, **extra}
+                statements, latency, size = await measure(client, counter, params, headers, repeat)
+                ok = statements == EXPECTED_STATEMENTS[mode]
+                failures += not ok
+                print(f"  {mode:<8} per_page={per_page:<4} statements={statements} "
+                      f"{'ok ' if ok else 'BAD'} {latency:8.2f} ms {size / 1024:9.1f} KiB")
+    # Pooled aiosqlite connections run on their own threads; close them before exiting
+    await async_engine.dispose()
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(main(args.sessions, args.messages, args.repeat)) else 0)
@@ -0,0 +1,92 @@
+"""Compare chat message inserts per second: one commit per message vs the write-behind buffer.
+
+Simulates --writers concurrent WebSocket handlers each persisting
+--messages messages, first with an INSERT + COMMIT per message (what a
+per-message session would do), then through WriteBehindBuffer, and reports
+rows per second once every row is durable. On SQLite many more concurrent
+per-message writers than the default run into "database is locked".
+
+Run from the backend directory:
+    python -m benchmarks.bench_chat_writes [--writers 20] [--messages 100]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault("DEBUG", "False")
+
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine
+from app.core.write_buffer import WriteBehindBuffer
+from app.models.chat import ChatMessage, ChatSession
+from app.models.symptom import SymptomSubmission  # noqa: F401  (registers mappers)
+from app.models.user import User
+
+def seed() -> int:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", username="bench", full_name="Bench", hashed_password="x")
+        db.add(user)
+        db.flush()
+        session = ChatSession(user_id=user.id, session_name="bench")
+        db.add(session)
+        db.commit()
+        return session.id
+
+def message_row(session_id: int, writer: int, i: int) -> dict:
+    return {
+        "session_id": session_id, "user_id": 1, "message": f"writer {writer} message {i}",
+        "response": None, "is_user_message": i % 2 == 0, "ai_model_used": None, "response_time_ms": None,
+    }
+
+async def count_rows() -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(ChatMessage))
+
+async def per_message_commits(session_id: int, writers: int, messages: int):
+    async def writer(w: int):
+        for i in range(messages):
+            async with AsyncSessionLocal() as db:
+                db.add(ChatMessage(**message_row(session_id, w, i)))
+                await db.commit()
+
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+
+async def write_behind(session_id: int, writers: int, messages: int):
+    buffer = WriteBehindBuffer(ChatMessage, batch_size=500, flush_interval=0.05)
+    buffer.start()
+
+    async def writer(w: int):
+        for i in range(messages):
+            await buffer.add(**message_row(session_id, w, i))
+            # Yield as a handler would between messages
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    await buffer.stop()
+
+async def main(writers: int, messages: int):
+    session_id = seed()
+    total = writers * messages
+    print(f"{writers} writers x {messages} messages = {total} rows")
+    for label, run in (("commit per message", per_message_commits), ("write-behind buffer", write_behind)):
+        before = await count_rows()
+        started = time.perf_counter()
+        await run(session_id, writers, messages)
+        elapsed = time.perf_counter() - started
+        written = await count_rows() - before
+        print(f"  {label:<20} {elapsed * 1000:9.1f} ms  {written / elapsed:9.0f} rows/s  ({written} rows)")
+    # Pooled aiosqlite connections run on their own threads; close them before exiting
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.writers, args.messages))
@@ -0,0 +1,92 @@
+"""Per-submission scoring cost: keyword heuristic vs embedding scorer vs full classifier.
+
+Builds benchmarks.tiny_classifier in a temporary directory and uses its
+encoder for EmbeddingScorer. Reports how long the label centroid matrix
+takes to build and to open memory-mapped once saved, then the median
+latency of scoring one text with the keyword heuristic, the embedding
+scorer (new text and repeated text), and the transformer classifier on the
+same model. Exits 1 if scoring a new text takes other than one forward
+pass or a repeated text takes any.
+
+Run from the backend directory:
+    python -m benchmarks.bench_embedding_scorer [--texts 300]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DEBUG", "False")
+
+from app.services.ai_service import DISORDER_LABELS, get_ai_service
+from app.services.embedding_scorer import EmbeddingScorer
+from app.services.transformer_classifier import TransformerClassifier
+from benchmarks.tiny_classifier import build_test_model
+
+TEMPLATES = [
+    "I have been feeling {} and cannot sleep",
+    "lately everything feels {} at work",
+    "my friends say I seem {} all the time",
+]
+MOODS = ["anxious", "empty", "restless", "hopeless", "nervous", "fine", "tired", "unstable", "paranoid", "down"]
+
+def median_ms(fn, items) -> float:
+    samples = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def main(count: int) -> int:
+    model_dir = build_test_model(os.path.join(tempfile.mkdtemp(), "encoder"))
+    texts = [TEMPLATES[i % len(TEMPLATES)].format(MOODS[i % len(MOODS)]) + f" ({i})" for i in range(count)]
+
+    started = time.perf_counter()
+    scorer = EmbeddingScorer(model_dir, DISORDER_LABELS)
+    scorer.warmup()
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    scorer = EmbeddingScorer(model_dir, DISORDER_LABELS)
+    scorer.warmup()
+    reopened = time.perf_counter() - started
+    print(f"centroids {scorer.centroids.shape} in {os.path.basename(scorer.centroids_path())}: "
+          f"load with build {built * 1000:.0f} ms, load from memory map {reopened * 1000:.0f} ms "
+          f"(mmap: {type(scorer.centroids).__name__})")
+
+    # Count forward passes
+    passes = []
+    embed = scorer.embed
+    scorer.embed = lambda batch: passes.append(len(batch)) or embed(batch)
+
+    ai_service = get_ai_service()
+    classifier = TransformerClassifier(model_dir, engine="torch", quantize=True)
+    classifier.warmup(batch_sizes=(1,))
+
+    keyword = median_ms(lambda text: ai_service.predict_mental_health(input_text=text), texts)
+    fresh = median_ms(scorer.score, texts)
+    fresh_passes = list(passes)
+    passes.clear()
+    repeated = median_ms(scorer.score, texts)
+    repeated_passes = list(passes)
+    full = median_ms(lambda text: classifier.predict_proba([text]), texts)
+
+    print(f"median per text over {count} texts:")
+    print(f"  keyword heuristic          {keyword:8.3f} ms")
+    print(f"  embedding, new text        {fresh:8.3f} ms   ({len(fresh_passes)} forward passes)")
+    print(f"  embedding, repeated text   {repeated:8.3f} ms   ({len(repeated_passes)} forward passes)")
+    print(f"  transformer classifier     {full:8.3f} ms")
+    print(f"  embedding cache: {scorer.cache_stats()}")
+
+    if fresh_passes != [1] * count or repeated_passes:
+        print("FAIL: expected exactly one single-text forward pass per new text and none for repeats")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=300)
+    args = parser.parse_args()
+    sys.exit(main(args.texts))
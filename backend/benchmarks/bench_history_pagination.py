@@ -0,0 +1,90 @@
+"""Compare deep OFFSET pages against keyset cursors on GET /symptoms/history.
+
+Seeds one user with --rows submissions, then times page 1 and the last page
+(--rows / --per-page) both ways through the real app: ?page=N (OFFSET plus
+COUNT(*)) and ?cursor=... with include_total=false. With a cursor the latency
+should stay flat however deep the page is.
+
+Run from the backend directory:
+    python -m benchmarks.bench_history_pagination [--rows 100000] [--per-page 10]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault("DEBUG", "False")
+
+import httpx
+from sqlalchemy import insert
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.pagination import count_cache, encode_cursor
+from app.core.security import create_access_token
+from app.main import app
+from app.models.chat import ChatMessage, ChatSession  # noqa: F401  (registers mappers)
+from app.models.symptom import SymptomSubmission
+from app.models.user import User
+
+HISTORY_PATH = "/api/v1/symptoms/history"
+
+def seed(rows: int):
+    """Insert `rows` submissions one second apart; return the token and the row ids newest first."""
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2024, 1, 1)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", username="bench", full_name="Bench", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.execute(insert(SymptomSubmission), [
+            {"user_id": user.id, "input_text": f"entry {i}", "predicted_disorder": "Anxiety",
+             "confidence_score": 0.6, "severity_level": "mild", "created_at": start + timedelta(seconds=i)}
+            for i in range(rows)
+        ])
+        db.commit()
+    return create_access_token({"sub": "bench@example.com"}), start
+
+async def time_request(client: httpx.AsyncClient, params: dict, headers: dict, repeat: int) -> float:
+    """Return the median latency in milliseconds over `repeat` requests."""
+    samples = []
+    for _ in range(repeat):
+        count_cache._counts.clear()
+        started = time.perf_counter()
+        response = await client.get(HISTORY_PATH, params=params, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    samples.sort()
+    return samples[len(samples) // 2]
+
+async def main(rows: int, per_page: int, repeat: int):
+    token, start = seed(rows)
+    headers = {"Authorization": f"Bearer {token}"}
+    last_page = rows // per_page
+    # Cursor for the last page: the row just before it in newest-first order
+    boundary = per_page * (last_page - 1)
+    deep_cursor = encode_cursor(start + timedelta(seconds=rows - boundary), rows - boundary + 1)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        cases = [
+            ("offset page 1", {"page": 1, "per_page": per_page}),
+            (f"offset page {last_page}", {"page": last_page, "per_page": per_page}),
+            ("cursor page 1", {"per_page": per_page, "include_total": False}),
+            (f"cursor page {last_page}", {"per_page": per_page, "include_total": False, "cursor": deep_cursor}),
+        ]
+        print(f"{rows} rows, {per_page} per page, median of {repeat} requests")
+        for label, params in cases:
+            latency = await time_request(client, params, headers, repeat)
+            print(f"  {label:<22} {latency:8.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.per_page, args.repeat))
@@ -0,0 +1,154 @@
+"""Micro-benchmarks for the code that runs on every symptom submission and chat message.
+
+Times each hot path over synthetic corpora that vary text length (short,
+medium, long), keyword density (none, 5%, 25% of words) and vocabulary
+(a small everyday vocabulary or a large one of rare words), and reports
+per corpus:
+
+  ns/op        best of --repeat passes over the corpus, per call
+  B/op         peak bytes allocated during one call (tracemalloc)
+  blocks/op    memory blocks still allocated afterwards, per call; above
+               zero means something grows per call
+
+Hot paths:
+
+  predict      AIService.predict_mental_health (keyword backend)
+  emergency    AIService._should_suggest_emergency_contact, scanning the text
+  reply        KeywordBackend.respond, the canned chat reply (replies now
+               stream from an LLMBackend; this is the default one)
+  cache_key    ResponseCache.key_for, run on every WebSocket chat message
+
+Each path has a ns/op budget per text length in BUDGETS_NS, about 2.5
+times its slowest corpus on the reference machine (one CPU). Exits 1 if
+any corpus goes over budget (times --budget-scale, for slower machines)
+or retains blocks per call.
+
+Run from the backend directory:
+    python -m benchmarks.bench_hot_paths [--texts 200] [--repeat 5] [--budget-scale 1.0]
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple
+
+from app.services.ai_service import AIService
+from app.services.keyword_matcher import EMERGENCY_KEYWORDS
+from app.services.llm_backend import KeywordBackend
+from app.services.response_cache import ResponseCache
+from benchmarks.bench_keyword_matcher import FILLER
+
+LENGTHS = {"short": 12, "medium": 80, "long": 600}
+DENSITIES = {"none": 0.0, "5%": 0.05, "25%": 0.25}
+
+# ns/op ceilings per hot path and text length
+BUDGETS_NS: Dict[str, Dict[str, float]] = {
+    "predict": {"short": 50000, "medium": 90000, "long": 500000},
+    "emergency": {"short": 5000, "medium": 10000, "long": 45000},
+    "reply": {"short": 12000, "medium": 25000, "long": 120000},
+    # Medium and long texts exceed max_message_chars and are bypassed before the scan
+    "cache_key": {"short": 50000, "medium": 2000, "long": 2000},
+}
+
+class Corpus(NamedTuple):
+    length: str
+    density: str
+    vocabulary: str
+    texts: List[str]
+
+def rare_vocabulary(size: int, rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(4, 11))) for _ in range(size)]
+
+def build_corpora(count: int, keywords: List[str]) -> List[Corpus]:
+    rng = random.Random(0)
+    vocabularies = {"small": FILLER, "large": rare_vocabulary(5000, rng)}
+    corpora = []
+    for length, words in LENGTHS.items():
+        for density, rate in DENSITIES.items():
+            for vocabulary, pool in vocabularies.items():
+                texts = [
+                    " ".join(rng.choice(keywords) if rng.random() < rate else rng.choice(pool) for _ in range(words))
+                    for _ in range(count)
+                ]
+                corpora.append(Corpus(length, density, vocabulary, texts))
+    return corpora
+
+def ns_per_op(fn: Callable[[str], object], texts: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for text in texts:
+            fn(text)
+        best = min(best, (time.perf_counter_ns() - started) / len(texts))
+    return best
+
+def allocations(fn: Callable[[str], object], texts: List[str]):
+    """Mean peak bytes allocated by one call, and memory blocks retained per call."""
+    gc.collect()
+    tracemalloc.start()
+    peak_total = 0
+    for text in texts:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fn(text)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - before
+    tracemalloc.stop()
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    for text in texts:
+        fn(text)
+    gc.collect()
+    return peak_total / len(texts), (sys.getallocatedblocks() - blocks) / len(texts)
+
+def main(count: int, repeat: int, budget_scale: float) -> int:
+    service = AIService()
+    backend = KeywordBackend()
+    cache = ResponseCache()
+    keywords = [kw for kws in service.keyword_map.values() for kw in kws] + list(EMERGENCY_KEYWORDS)
+    hot_paths: Dict[str, Callable[[str], object]] = {
+        "predict": lambda text: service.predict_mental_health(input_text=text),
+        "emergency": lambda text: service._should_suggest_emergency_contact("Anxiety", "mild", text),
+        "reply": backend.respond,
+        "cache_key": lambda text: cache.key_for(backend.model_name, text),
+    }
+    corpora = build_corpora(count, keywords)
+    # Warm up lazily built state (matcher tables, cached lookups) before measuring
+    for fn in hot_paths.values():
+        for corpus in corpora:
+            fn(corpus.texts[0])
+
+    failures = []
+    for name, fn in hot_paths.items():
+        print(f"{name}")
+        print(f"  {'length':<7} {'keywords':<9} {'vocab':<6} {'ns/op':>10} {'budget':>10} {'B/op':>8} {'blocks/op':>10}")
+        for corpus in corpora:
+            ns = ns_per_op(fn, corpus.texts, repeat)
+            peak, retained = allocations(fn, corpus.texts)
+            budget = BUDGETS_NS[name][corpus.length] * budget_scale
+            flag = ""
+            if ns > budget:
+                flag = "  OVER BUDGET"
+                failures.append(f"{name} {corpus.length}/{corpus.density}/{corpus.vocabulary}: {ns:.0f} ns/op")
+            # Allow a little allocator noise; anything near a block per call is growth
+            if retained >= 0.5:
+                flag += "  RETAINS MEMORY"
+                failures.append(f"{name} {corpus.length}/{corpus.density}/{corpus.vocabulary}: "
+                                f"{retained:.2f} blocks/op retained")
+            print(f"  {corpus.length:<7} {corpus.density:<9} {corpus.vocabulary:<6} {ns:>10.0f} {budget:>10.0f} "
+                  f"{peak:>8.0f} {retained:>10.2f}{flag}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=200, help="texts per corpus")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every budget, for slower machines")
+    args = parser.parse_args()
+    sys.exit(main(args.texts, args.repeat, args.budget_scale))
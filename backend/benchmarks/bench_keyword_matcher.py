@@ -0,0 +1,97 @@
+"""Benchmark keyword scoring in AIService on 1 KB - 100 KB inputs.
+
+Compares the per-label substring loop the service used to run against the
+compiled KeywordMatcher and against a single-pass combined regex, and checks
+that all three produce identical results.
+
+Run from the backend directory:
+    python -m benchmarks.bench_keyword_matcher
+"""
+import random
+import re
+import time
+
+from app.services.ai_service import AIService
+from app.services.keyword_matcher import EMERGENCY_KEYWORDS
+
+FILLER = (
+    "i have been feeling a bit off lately and it is hard to explain how the days go "
+    "work has been busy and i keep thinking about everything at home"
+).split()
+
+def make_text(size: int, keywords, density: float = 0.02, seed: int = 0) -> str:
+    """Build a synthetic submission of roughly `size` characters."""
+    rng = random.Random(seed)
+    words, length = [], 0
+    while length < size:
+        word = rng.choice(keywords) if rng.random() < density else rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+def legacy_scan(service: AIService, text: str):
+    """The scoring loop predict_mental_health used before the matcher."""
+    text_lower = text.lower()
+    set(text_lower.split())  # token set built (and never used) by the old path
+    scores = {label: 0 for label in service.disorder_labels}
+    for label, keywords in service.keyword_map.items():
+        for kw in keywords:
+            if kw in text_lower:
+                scores[label] += 1
+    crisis = any(kw in text.lower() for kw in EMERGENCY_KEYWORDS)
+    return scores, crisis
+
+def matcher_scan(service: AIService, text: str):
+    scan = service.matcher.scan(text)
+    scores = {label: 0 for label in service.disorder_labels}
+    scores.update(scan.label_counts)
+    return scores, scan.crisis
+
+class SinglePassScan:
+    """One regex pass over the text instead of one search per phrase.
+
+    The lookahead finds the longest phrase starting at each position; any
+    other phrase starting there is a prefix of it, so adding the phrases
+    contained in each found one gives exactly the substring results.
+    """
+
+    def __init__(self, service: AIService):
+        self.keyword_map = service.keyword_map
+        self.labels = service.disorder_labels
+        phrases = sorted({kw for kws in self.keyword_map.values() for kw in kws} | set(EMERGENCY_KEYWORDS),
+                         key=len, reverse=True)
+        self.pattern = re.compile("(?=(" + "|".join(map(re.escape, phrases)) + "))")
+        self.contained = {phrase: {other for other in phrases if other in phrase} for phrase in phrases}
+
+    def __call__(self, text: str):
+        found = set()
+        for phrase in set(self.pattern.findall(text.lower())):
+            found |= self.contained[phrase]
+        scores = {label: 0 for label in self.labels}
+        for label, keywords in self.keyword_map.items():
+            scores[label] = sum(kw in found for kw in keywords)
+        return scores, any(kw in found for kw in EMERGENCY_KEYWORDS)
+
+def time_per_call(fn, *args, repeat: int = 50) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    service = AIService()
+    keywords = [kw for kws in service.keyword_map.values() for kw in kws] + list(EMERGENCY_KEYWORDS)
+
+    single_pass = SinglePassScan(service)
+
+    print(f"{'size':>8} {'legacy us':>12} {'matcher us':>12} {'speedup':>8} {'1-pass regex us':>16}")
+    for size in (1_000, 10_000, 100_000):
+        text = make_text(size, keywords, seed=size).upper()
+        assert legacy_scan(service, text) == matcher_scan(service, text) == single_pass(text)
+        legacy = time_per_call(legacy_scan, service, text)
+        matcher = time_per_call(matcher_scan, service, text)
+        regex = time_per_call(single_pass, text)
+        print(f"{size:>8} {legacy:>12.1f} {matcher:>12.1f} {legacy / matcher:>7.2f}x {regex:>16.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Time to first token over WebSocket: buffered replies vs streamed delta frames.
+
+Starts benchmarks.llm_stub on a local port and drives
+ConnectionManager.handle_chat_message with an OpenAICompatibleBackend
+pointed at it. Reports when the client sees the first reply text and the
+complete reply, for the previous behaviour (collect the whole reply, send
+one frame) and for streaming delta frames, plus what gets recorded in
+response_time_ms / first_token_ms.
+
+Run from the backend directory:
+    python -m benchmarks.bench_llm_streaming [--requests 20] [--first-token-ms 300] [--token-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import time
+
+os.environ.setdefault("DEBUG", "False")
+
+from app.core.write_buffer import chat_message_buffer
+from app.services import llm_backend
+from app.services.llm_backend import SYSTEM_PROMPT, OpenAICompatibleBackend
+from app.websocket.connection_manager import ConnectionManager
+from benchmarks.llm_stub import serve_in_thread
+
+PROMPT = "I have been feeling anxious and cannot sleep"
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.frames.append((time.perf_counter(), json.loads(message)))
+
+    async def close(self, code: int = 1000):
+        pass
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def buffered_reply(backend: OpenAICompatibleBackend):
+    """The previous behaviour: wait for the whole reply, then deliver it at once."""
+    started = time.perf_counter()
+    reply = "".join([delta async for delta in backend.stream([
+        {"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": PROMPT},
+    ])])
+    done = time.perf_counter() - started
+    return done, done, reply
+
+async def streamed_reply(manager: ConnectionManager, websocket: FakeWebSocket):
+    websocket.frames.clear()
+    started = time.perf_counter()
+    await manager.handle_chat_message(websocket, {"content": PROMPT, "session_id": 1}, user_id=1, persist=True)
+    await asyncio.sleep(0.01)
+    first = next(at for at, frame in websocket.frames if frame["type"] == "delta")
+    last = next(at for at, frame in websocket.frames if frame["type"] == "message")
+    return first - started, last - started
+
+async def main(requests: int, first_token_ms: float, token_ms: float):
+    port = free_port()
+    server = serve_in_thread(port, first_token_ms, token_ms)
+    backend = OpenAICompatibleBackend(f"http://127.0.0.1:{port}/v1", "stub", "stub-model")
+    llm_backend._llm_backend = backend
+
+    # Capture what would be persisted instead of writing to a database
+    recorded = []
+
+    async def record(**row):
+        recorded.append(row)
+
+    chat_message_buffer.add = record
+
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, user_id=1)
+
+    buffered = [await buffered_reply(backend) for _ in range(requests)]
+    streamed = [await streamed_reply(manager, websocket) for _ in range(requests)]
+    ai_rows = [row for row in recorded if not row["is_user_message"]]
+
+    print(f"{requests} replies, stub first token {first_token_ms:.0f} ms, {token_ms:.0f} ms/token")
+    for label, samples in (("buffered (one frame)", buffered), ("streamed deltas", streamed)):
+        first = statistics.median(s[0] for s in samples) * 1000
+        total = statistics.median(s[1] for s in samples) * 1000
+        print(f"  {label:<22} first text {first:8.1f} ms   full reply {total:8.1f} ms")
+    print(f"  recorded: ai_model_used={ai_rows[-1]['ai_model_used']!r} "
+          f"first_token_ms={statistics.median(r['first_token_ms'] for r in ai_rows):.0f} "
+          f"response_time_ms={statistics.median(r['response_time_ms'] for r in ai_rows):.0f}")
+
+    await manager.close_all()
+    await backend.aclose()
+    server.should_exit = True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.first_token_ms, args.token_ms))
@@ -0,0 +1,86 @@
+"""Load test: latency of non-auth endpoints during a login storm.
+
+Keeps `--logins` concurrent POST /api/v1/auth/login requests in flight while a
+probe task calls GET /health back to back, then reports the probe's p50/p99.
+It runs once with bcrypt on Starlette's thread pool (the old behaviour) and
+once with the dedicated password process pool.
+
+Run from the backend directory:
+    python -m benchmarks.bench_login_storm [--logins 32] [--seconds 5]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault("DEBUG", "False")
+# Measures the endpoint itself, not the per-client rate limits in front of it
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+
+import httpx
+
+from app.api.v1.endpoints import auth
+from app.core.config import settings
+from app.core.password_pool import PasswordHasherPool
+from app.main import app
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def storm(client: httpx.AsyncClient, logins: int, seconds: float):
+    deadline = time.perf_counter() + seconds
+    completed = 0
+
+    async def login_loop():
+        nonlocal completed
+        while time.perf_counter() < deadline:
+            response = await client.post("/api/v1/auth/login",
+                                         data={"username": "bench@example.com", "password": "bench-password"})
+            if response.status_code == 200:
+                completed += 1
+
+    async def probe():
+        latencies = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await client.get("/health")
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+        return latencies
+
+    results = await asyncio.gather(probe(), *(login_loop() for _ in range(logins)))
+    return results[0], completed
+
+async def main(logins: int, seconds: float):
+    modes = (
+        ("thread pool", PasswordHasherPool(0, max_pending=10_000, rounds=settings.BCRYPT_ROUNDS)),
+        ("process pool", PasswordHasherPool(settings.PASSWORD_HASH_WORKERS, max_pending=10_000,
+                                            rounds=settings.BCRYPT_ROUNDS)),
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/api/v1/auth/signup", json={
+                "email": "bench@example.com", "username": "bench",
+                "full_name": "Bench", "password": "bench-password",
+            })
+
+            print(f"{'mode':>13} {'logins/s':>9} {'probe p50 ms':>13} {'probe p99 ms':>13}")
+            for name, pool in modes:
+                pool.start()
+                auth.password_pool = pool
+                latencies, completed = await storm(client, logins, seconds)
+                pool.shutdown()
+                print(f"{name:>13} {completed / seconds:>9.1f} "
+                      f"{percentile(latencies, 50) * 1e3:>13.2f} {percentile(latencies, 99) * 1e3:>13.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.seconds))
@@ -0,0 +1,102 @@
+"""Compare peak server memory of the JSON message list and the NDJSON export.
+
+Seeds one session with --messages messages, then calls
+GET /chat/sessions/{id}/messages and GET /chat/sessions/{id}/messages/export
+through the ASGI app directly, discarding body chunks as they arrive, and
+reports tracemalloc's peak, time to first byte and total time. The export's
+peak should stay flat as --messages grows; the list's grows with it.
+
+Run from the backend directory:
+    python -m benchmarks.bench_message_export [--messages 100000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault("DEBUG", "False")
+
+from sqlalchemy import insert
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.main import app
+from app.models.chat import ChatMessage, ChatSession
+from app.models.symptom import SymptomSubmission  # noqa: F401  (registers mappers)
+from app.models.user import User
+
+def seed(messages: int):
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", username="bench", full_name="Bench", hashed_password="x")
+        db.add(user)
+        db.flush()
+        session = ChatSession(user_id=user.id, session_name="long")
+        db.add(session)
+        db.flush()
+        for start in range(0, messages, 10000):
+            db.execute(insert(ChatMessage), [
+                {"session_id": session.id, "user_id": user.id, "is_user_message": j % 2 == 0,
+                 "message": f"message {j} " + "lorem ipsum " * 10}
+                for j in range(start, min(start + 10000, messages))
+            ])
+        db.commit()
+        return create_access_token({"sub": "bench@example.com"}), session.id
+
+async def call(path: str, token: str):
+    """Run one GET through the ASGI app; return (status, bytes, first byte s, total s, peak bytes)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    state = {"status": None, "bytes": 0, "first_byte": None}
+    requested = asyncio.Event()
+
+    async def receive():
+        # Deliver the empty body once, then block like a client that stays connected
+        if requested.is_set():
+            await asyncio.Event().wait()
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if state["first_byte"] is None:
+                state["first_byte"] = time.perf_counter()
+            state["bytes"] += len(message["body"])
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    finished = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return state["status"], state["bytes"], state["first_byte"] - started, finished - started, peak
+
+async def main(messages: int):
+    token, session_id = seed(messages)
+    # Warm the user cache and lazily created singletons outside the measurement
+    await call(f"/api/v1/chat/sessions/{session_id}", token)
+
+    print(f"{messages} messages in one session")
+    for label, path in (
+        ("JSON list", f"/api/v1/chat/sessions/{session_id}/messages"),
+        ("NDJSON export", f"/api/v1/chat/sessions/{session_id}/messages/export"),
+    ):
+        status, size, first_byte, total, peak = await call(path, token)
+        print(f"  {label:<14} status={status} {size / 2**20:7.1f} MiB  first byte {first_byte * 1000:8.1f} ms  "
+              f"total {total * 1000:8.1f} ms  peak {peak / 2**20:7.1f} MiB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages))
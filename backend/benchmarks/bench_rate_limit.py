@@ -0,0 +1,171 @@
+"""Load test: well-behaved clients' latency while one client floods POST /symptoms/submit.
+
+Phase 1 sends --rate requests a second from one abusive user and IP while
+--polite users, each on their own IP, submit once per --interval seconds,
+first with rate limiting off and then on, and reports the polite clients'
+p50/p99 latency plus how many flood requests were answered 429.
+
+Phase 2 floods at the same rate from a different IP and user per request
+(what a per-client limit cannot stop) against the background worker pool
+with a small AI_SHED_QUEUE_DEPTH, and reports how many requests were shed
+with 503 and the deepest the analysis queue got. Exits 1 if limiting did
+not lower the polite p99 or the queue grew far past the threshold.
+
+Keep --rate near the SQLite commit rate (about 100/s here): well above it
+the unlimited run builds a backlog that takes minutes to drain.
+
+Run from the backend directory:
+    python -m benchmarks.bench_rate_limit [--seconds 8] [--rate 120] [--polite 8] [--model-ms 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("SYMPTOM_ANALYSIS_BACKEND", "inline")
+os.environ.setdefault("AI_SHED_QUEUE_DEPTH", "50")
+
+import httpx
+
+from app.api.v1.endpoints import symptoms as symptoms_endpoint
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.database import Base, SessionLocal, engine
+from app.core.rate_limit import TokenBucketLimiter
+from app.core.security import create_access_token
+from app.main import app
+from app.models.chat import ChatMessage, ChatSession  # noqa: F401  (registers mappers)
+from app.models.symptom import SymptomSubmission  # noqa: F401  (registers mappers)
+from app.models.user import User
+from app.services.analysis_jobs import AsyncioAnalysisQueue
+from benchmarks.bench_symptom_jobs import simulate_model_latency
+
+SUBMIT_PATH = "/api/v1/symptoms/submit"
+BODY = {"input_text": "I feel anxious and worry a lot"}
+
+def seed(users: int) -> list:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all(User(email=f"user{i}@example.com", username=f"user{i}", full_name="Bench", hashed_password="x")
+                   for i in range(users))
+        db.commit()
+    return [create_access_token({"sub": f"user{i}@example.com"}) for i in range(users)]
+
+def client_for(ip: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(ip, 40000)), base_url="http://bench")
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def polite_client(ip: str, token: str, interval: float, deadline: float, latencies: list, statuses: list):
+    async with client_for(ip) as client:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            response = await client.post(SUBMIT_PATH, json=BODY, headers={"Authorization": f"Bearer {token}"})
+            latencies.append(time.perf_counter() - started)
+            statuses.append(response.status_code)
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+async def flood(rate: float, deadline: float, send):
+    """Call `send(n)` `rate` times a second until the deadline, without waiting for responses.
+
+    An open-loop arrival rate stands in for an attacker in its own process;
+    a closed loop here would only measure how fast 429s share this event loop.
+    """
+    in_flight = set()
+    n = 0
+    started = time.monotonic()
+    while time.monotonic() < deadline:
+        n += 1
+        task = asyncio.create_task(send(n))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        await asyncio.sleep(max(0.0, started + n / rate - time.monotonic()))
+    await asyncio.gather(*in_flight)
+
+async def single_source_flood(tokens: list, seconds: float, rate: float, polite: int, interval: float):
+    latencies, polite_statuses, flood_statuses = [], [], []
+    deadline = time.monotonic() + seconds
+    async with client_for("10.0.0.1") as flooder:
+        async def send(n: int):
+            response = await flooder.post(SUBMIT_PATH, json=BODY, headers={"Authorization": f"Bearer {tokens[0]}"})
+            flood_statuses.append(response.status_code)
+
+        await asyncio.gather(
+            flood(rate, deadline, send),
+            *(polite_client(f"10.1.0.{i + 1}", tokens[i + 1], interval, deadline, latencies, polite_statuses)
+              for i in range(polite)),
+        )
+    return latencies, polite_statuses, flood_statuses
+
+async def distributed_flood(tokens: list, seconds: float, rate: float, queue: AsyncioAnalysisQueue):
+    statuses = []
+    deepest = 0
+    deadline = time.monotonic() + seconds
+
+    async def send(n: int):
+        # A fresh IP and account per request, so no single bucket empties
+        async with client_for(f"10.2.{n // 250 % 250}.{n % 250 + 1}") as client:
+            response = await client.post(SUBMIT_PATH, json=BODY,
+                                         headers={"Authorization": f"Bearer {tokens[n % len(tokens)]}"})
+        statuses.append(response.status_code)
+
+    async def watch():
+        nonlocal deepest
+        while time.monotonic() < deadline:
+            deepest = max(deepest, queue.pending())
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(watch(), flood(rate, deadline, send))
+    return statuses, deepest
+
+async def main(seconds: float, rate: float, polite: int, interval: float, model_ms: float) -> int:
+    tokens = seed(max(polite + 1, 200))
+    ok = True
+    async with app.router.lifespan_context(app):
+        simulate_model_latency(model_ms)
+        print(f"phase 1: 1 client flooding at {rate:.0f} req/s, {polite} polite clients every "
+              f"{interval:.1f}s, {model_ms:.0f} ms model, {seconds:.0f}s each")
+        p99s = {}
+        for label, limiter in (("no limits", None), ("rate limited", TokenBucketLimiter())):
+            rate_limit.rate_limiter = limiter
+            latencies, polite_statuses, flood_statuses = await single_source_flood(
+                tokens, seconds, rate, polite, interval)
+            p99s[label] = percentile(latencies, 99)
+            print(f"  {label:<13} polite p50 {percentile(latencies, 50) * 1000:8.1f} ms  "
+                  f"p99 {p99s[label] * 1000:8.1f} ms  polite non-200 {sum(s != 200 for s in polite_statuses):3}  "
+                  f"flood served {flood_statuses.count(200):5}  flood 429 {flood_statuses.count(429):6}")
+        ok &= p99s["rate limited"] < p99s["no limits"]
+
+        print(f"phase 2: {rate:.0f} req/s rotating IPs and accounts, worker pool, "
+              f"shed at queue depth {settings.AI_SHED_QUEUE_DEPTH}")
+        rate_limit.rate_limiter = TokenBucketLimiter()
+        # One item per model call, so the flood outruns the pool and the queue fills
+        queue = AsyncioAnalysisQueue(workers=1, batch_size=1)
+        queue.start()
+        symptoms_endpoint.analysis_queue = queue
+        statuses, deepest = await distributed_flood(tokens, seconds, rate, queue)
+        await queue.stop()
+        print(f"  accepted {statuses.count(200):5}  shed 503 {statuses.count(503):6}  "
+              f"limited 429 {statuses.count(429):6}  deepest queue {deepest}")
+        # Requests already past the check when the queue filled can still land on it
+        ok &= deepest <= settings.AI_SHED_QUEUE_DEPTH * 2
+    if not ok:
+        print("FAIL: limiting did not protect polite clients or shedding did not bound the queue")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=8)
+    parser.add_argument("--rate", type=float, default=120)
+    parser.add_argument("--polite", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--model-ms", type=float, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.seconds, args.rate, args.polite, args.interval, args.model_ms)))
@@ -0,0 +1,123 @@
+"""Chat reply latency with and without the normalized response cache.
+
+Starts benchmarks.llm_stub on a local port and replays a workload of
+repeated openers written slightly differently ("I feel anxious",
+"i feel anxious!!") through ConnectionManager.handle_chat_message, with
+the cache off and on. Reports the hit rate and median/p95 full-reply
+latency, then checks that a message tripping the crisis keywords is
+never served from or stored in the cache; exits 1 if it is.
+
+Run from the backend directory:
+    python -m benchmarks.bench_response_cache [--requests 200] [--first-token-ms 300] [--token-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import time
+
+os.environ.setdefault("DEBUG", "False")
+
+from app.core.write_buffer import chat_message_buffer
+from app.services import llm_backend
+from app.services.llm_backend import OpenAICompatibleBackend
+from app.services.response_cache import ResponseCache
+from app.websocket import connection_manager
+from app.websocket.connection_manager import ConnectionManager
+from benchmarks.llm_stub import serve_in_thread
+
+OPENERS = [
+    ["I feel anxious", "i feel anxious!!", "I feel  anxious."],
+    ["I can't sleep", "i cant sleep", "I can't sleep..."],
+    ["I've been feeling down lately", "ive been feeling down lately"],
+    ["Hi", "hi!", "Hello"],
+]
+CRISIS_MESSAGE = "I feel like it is not worth living"
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.frames.append(json.loads(message))
+
+    async def close(self, code: int = 1000):
+        pass
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def send(manager: ConnectionManager, websocket: FakeWebSocket, message: str) -> float:
+    websocket.frames.clear()
+    started = time.perf_counter()
+    await manager.handle_chat_message(websocket, {"content": message, "session_id": 1}, user_id=1, persist=True)
+    return time.perf_counter() - started
+
+async def replay(manager: ConnectionManager, websocket: FakeWebSocket, workload):
+    return [await send(manager, websocket, message) for message in workload]
+
+async def main(requests: int, first_token_ms: float, token_ms: float) -> int:
+    port = free_port()
+    server = serve_in_thread(port, first_token_ms, token_ms)
+    backend = OpenAICompatibleBackend(f"http://127.0.0.1:{port}/v1", "stub", "stub-model")
+    llm_backend._llm_backend = backend
+
+    recorded = []
+
+    async def record(**row):
+        recorded.append(row)
+
+    chat_message_buffer.add = record
+
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, user_id=1)
+
+    rng = random.Random(0)
+    workload = [rng.choice(rng.choice(OPENERS)) for _ in range(requests)]
+
+    print(f"{requests} messages over {sum(len(group) for group in OPENERS)} phrasings, "
+          f"stub first token {first_token_ms:.0f} ms, {token_ms:.0f} ms/token")
+    for label, cache in (("no cache", None), ("response cache", ResponseCache())):
+        connection_manager.response_cache = cache
+        samples = await replay(manager, websocket, workload)
+        median = statistics.median(samples) * 1000
+        p95 = statistics.quantiles(samples, n=20)[-1] * 1000
+        hit_rate = f"hit rate {cache.stats()['hit_rate']:.0%}" if cache else ""
+        print(f"  {label:<16} median {median:8.1f} ms   p95 {p95:8.1f} ms   {hit_rate}")
+    print(f"  top entries: {cache.top_entries(3)}")
+
+    # Crisis messages must reach the model every time and never be stored
+    failures = []
+    size_before = len(cache._entries)
+    for _ in range(3):
+        await send(manager, websocket, CRISIS_MESSAGE)
+    crisis_rows = [row for row in recorded[-6:] if not row["is_user_message"]]
+    if any(row["ai_model_used"].startswith("cache:") for row in crisis_rows):
+        failures.append("crisis message served from cache")
+    if len(cache._entries) != size_before:
+        failures.append("crisis message stored in cache")
+    print(f"  crisis bypass: {'FAIL: ' + '; '.join(failures) if failures else 'ok'} "
+          f"({cache.stats()['bypassed']} bypassed)")
+
+    await manager.close_all()
+    await backend.aclose()
+    server.should_exit = True
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.requests, args.first_token_ms, args.token_ms)))
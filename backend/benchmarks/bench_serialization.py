@@ -0,0 +1,157 @@
+"""Per-row cost of serializing history pages, and per-frame cost of chat deltas.
+
+Seeds a temporary SQLite database with --rows symptom submissions and chat
+messages, loads pages of them through the ORM, and encodes each page two
+ways:
+
+  pydantic   how FastAPI serialized the response_model before: validate
+             the ORM rows into the schema (from_attributes), dump it, then
+             render a JSONResponse
+  fast       RowEncoder: the schema's fields read straight off the rows
+             into one orjson call, returned as pre-encoded bytes
+
+for GET /symptoms/history (SymptomHistory) and GET
+/chat/sessions/{id}/messages (List[ChatMessageResponse]). Both bodies are
+decoded and compared, so the fast path must produce the same JSON. Also
+times a chat `delta` frame built with json.dumps per frame against a
+FrameTemplate.
+
+Exits 1 if a fast body differs from the pydantic one or is not faster.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization [--rows 1000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serialization.db')}")
+os.environ.setdefault("DEBUG", "False")
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import select
+
+from app.api.v1.endpoints.chat import message_encoder
+from app.api.v1.endpoints.symptoms import submission_encoder
+from app.core.database import Base, SessionLocal, engine
+from app.core.serialization import FrameTemplate
+from app.main import app
+from app.models.chat import ChatMessage, ChatSession
+from app.models.symptom import SymptomSubmission
+from app.models.user import User
+
+PAGE_SIZES = (10, 100, 1000)
+DELTA = "a streamed token or two "
+
+def seed(rows: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    started = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"email": "bench@example.com", "username": "bench", "full_name": "Bench", "hashed_password": "x"}
+        ])
+        conn.execute(ChatSession.__table__.insert(), [{"user_id": 1, "session_name": "bench"}])
+        conn.execute(SymptomSubmission.__table__.insert(), [
+            {"user_id": 1, "input_text": f"I have been feeling anxious and tired lately, day {i} " * 3,
+             "mood_rating": i % 10 + 1,
+             "sleep_hours": 6.5, "stress_level": i % 10 + 1, "predicted_disorder": "Anxiety",
+             "confidence_score": 0.82, "severity_level": "moderate",
+             "recommendations": "Practice deep breathing exercises. " * 3,
+             "next_steps": "Consider talking to a mental health professional. " * 2,
+             "emergency_contact_suggested": False, "status": "completed",
+             "created_at": started + timedelta(minutes=i)}
+            for i in range(rows)
+        ])
+        conn.execute(ChatMessage.__table__.insert(), [
+            {"session_id": 1, "user_id": 1, "message": f"How can I sleep better? message {i} " * 4,
+             "response": None if i % 2 == 0 else "Try keeping a regular sleep schedule. " * 4,
+             "is_user_message": i % 2 == 0, "created_at": started + timedelta(minutes=i)}
+            for i in range(rows)
+        ])
+
+def route_field(path: str):
+    route = next(route for route in app.routes
+                 if getattr(route, "path", None) == path and "GET" in getattr(route, "methods", ()))
+    return route.secure_cloned_response_field
+
+def best_seconds(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+async def main(rows: int, repeat: int) -> int:
+    seed(rows)
+    with SessionLocal() as db:
+        submissions = db.scalars(select(SymptomSubmission).order_by(SymptomSubmission.id)).all()
+        messages = db.scalars(select(ChatMessage).order_by(ChatMessage.id)).all()
+    history_field = route_field("/api/v1/symptoms/history")
+    messages_field = route_field("/api/v1/chat/sessions/{session_id}/messages")
+
+    def pydantic_body(field, content) -> bytes:
+        # For async endpoints serialize_response never awaits, so it completes on the first send
+        coroutine = serialize_response(field=field, response_content=content)
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return JSONResponse(done.value).body
+        raise RuntimeError("serialize_response suspended")
+
+    cases = []
+    for size in PAGE_SIZES:
+        page = submissions[:size]
+        extra = {"total_count": rows, "page": 1, "per_page": size, "next_cursor": None}
+        cases.append((
+            "symptoms/history", size,
+            lambda page=page, extra=extra: pydantic_body(history_field, {"submissions": page, **extra}),
+            lambda page=page, extra=extra: submission_encoder.encode_page("submissions", page, **extra),
+        ))
+    for size in PAGE_SIZES:
+        page = messages[:size]
+        cases.append((
+            "chat/messages", size,
+            lambda page=page: pydantic_body(messages_field, page),
+            lambda page=page: message_encoder.encode(page),
+        ))
+
+    failures = []
+    print(f"{'endpoint':<18} {'rows':>5} {'pydantic us/row':>16} {'fast us/row':>12} {'speedup':>8} {'bytes':>9}")
+    for name, size, slow, fast in cases:
+        slow_body, fast_body = slow(), fast()
+        if orjson.loads(slow_body) != orjson.loads(fast_body):
+            failures.append(f"{name} with {size} rows: fast body differs from the pydantic one")
+        slow_us = best_seconds(slow, repeat) / size * 1e6
+        fast_us = best_seconds(fast, repeat) / size * 1e6
+        if fast_us >= slow_us:
+            failures.append(f"{name} with {size} rows: fast path not faster ({fast_us:.2f} vs {slow_us:.2f} us/row)")
+        print(f"{name:<18} {size:>5} {slow_us:>16.2f} {fast_us:>12.2f} {slow_us / fast_us:>7.1f}x {len(fast_body):>9}")
+
+    frames = 100000
+    template = FrameTemplate("content", type="delta", session_id=42)
+    if json.loads(template.render(DELTA)) != {"type": "delta", "content": DELTA, "session_id": 42}:
+        failures.append("FrameTemplate frame differs from the json.dumps one")
+    dumps_ns = best_seconds(lambda: [json.dumps({"type": "delta", "content": DELTA, "session_id": 42})
+                                     for _ in range(frames)], repeat) / frames * 1e9
+    template_ns = best_seconds(lambda: [template.render(DELTA) for _ in range(frames)], repeat) / frames * 1e9
+    print(f"delta frame: json.dumps {dumps_ns:.0f} ns, FrameTemplate {template_ns:.0f} ns")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.rows, args.repeat)))
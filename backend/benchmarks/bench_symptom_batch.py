@@ -0,0 +1,109 @@
+"""Benchmark the batch symptom path against the one-at-a-time path.
+
+Checks that AIService.predict_batch returns exactly what a loop over
+predict_mental_health returns, then times scoring and storage for several
+batch sizes. Storage compares the /submit pattern (insert, commit, update,
+commit per item) with the single bulk INSERT used by /submit-batch.
+
+Run from the backend directory:
+    python -m benchmarks.bench_symptom_batch
+"""
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.symptom import SymptomSubmission
+from app.models.user import User
+from app.models.chat import ChatSession, ChatMessage  # noqa: F401  (registers mappers)
+from app.schemas.symptom import SymptomSubmissionCreate
+from app.services.ai_service import AIService
+from app.services.keyword_matcher import EMERGENCY_KEYWORDS
+from benchmarks.bench_keyword_matcher import make_text
+
+def make_batch(service: AIService, size: int, seed: int = 0):
+    rng = random.Random(seed)
+    keywords = [kw for kws in service.keyword_map.values() for kw in kws] + list(EMERGENCY_KEYWORDS)
+    return [
+        SymptomSubmissionCreate(
+            input_text=make_text(rng.randint(50, 2000), keywords, density=0.1, seed=seed + i),
+            mood_rating=rng.choice([None, 1, 3, 5, 7, 9]),
+            sleep_hours=rng.choice([None, 4.5, 7.0]),
+            stress_level=rng.choice([None, 2, 6, 8]),
+        )
+        for i in range(size)
+    ]
+
+def predict_each(service: AIService, batch):
+    return [
+        service.predict_mental_health(
+            input_text=item.input_text,
+            selected_symptoms=item.selected_symptoms,
+            mood_rating=item.mood_rating,
+            sleep_hours=item.sleep_hours,
+            stress_level=item.stress_level,
+        )
+        for item in batch
+    ]
+
+def store_each(db, user_id, batch, predictions):
+    for item, prediction in zip(batch, predictions):
+        submission = SymptomSubmission(user_id=user_id, input_text=item.input_text,
+                                       mood_rating=item.mood_rating, sleep_hours=item.sleep_hours,
+                                       stress_level=item.stress_level)
+        db.add(submission)
+        db.commit()
+        db.refresh(submission)
+        for field, value in prediction.model_dump().items():
+            setattr(submission, field, value)
+        db.commit()
+        db.refresh(submission)
+
+def store_bulk(db, user_id, batch, predictions):
+    rows = [
+        {"user_id": user_id, "input_text": item.input_text, "selected_symptoms": None,
+         "mood_rating": item.mood_rating, "sleep_hours": item.sleep_hours,
+         "stress_level": item.stress_level, **prediction.model_dump()}
+        for item, prediction in zip(batch, predictions)
+    ]
+    db.scalars(insert(SymptomSubmission).returning(SymptomSubmission, sort_by_parameter_order=True), rows,
+               execution_options={"render_nulls": True}).all()
+    db.commit()
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1e3
+
+def main():
+    service = AIService()
+    workdir = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        user = User(email="bench@example.com", username="bench", full_name="Bench", hashed_password="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    print(f"{'batch':>6} {'score 1x1 ms':>13} {'score batch ms':>15} {'store 1x1 ms':>13} {'store bulk ms':>14}")
+    for size in (10, 100, 500):
+        batch = make_batch(service, size, seed=size)
+        predictions = service.predict_batch(batch)
+        assert predictions == predict_each(service, batch)
+
+        score_each = timed(predict_each, service, batch)
+        score_batch = timed(service.predict_batch, batch)
+        with Session() as db:
+            stored_each = timed(store_each, db, user_id, batch, predictions)
+        with Session() as db:
+            stored_bulk = timed(store_bulk, db, user_id, batch, predictions)
+        print(f"{size:>6} {score_each:>13.2f} {score_batch:>15.2f} {stored_each:>13.2f} {stored_bulk:>14.2f}")
+
+if __name__ == "__main__":
+    main()
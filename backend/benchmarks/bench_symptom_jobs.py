@@ -0,0 +1,152 @@
+"""Sustained POST /symptoms/submit load: inline analysis vs the background worker pool.
+
+Drives the real app in-process with --concurrency clients sending
+--requests submissions, first with analysis inline in the request (the
+previous shape, now a single write transaction) and then with the asyncio
+worker pool. --model-ms adds simulated inference latency per model call
+(per request inline, per micro-batch in the pool) to stand in for a real
+classifier. Reports accepted submissions per second, response latency
+percentiles, and analysed submissions per second once every row is
+completed and its WebSocket notification sent. Exits 1 if any submission
+is left unanalysed.
+
+On SQLite every write transaction, the submissions' INSERTs and the pool's
+UPDATEs alike, queues on the single writer lock, so at high concurrency
+both modes top out at the same commit rate and the lock's busy-wait
+backoff dominates p99. The pool's gain shows as response latency no longer
+including the model, and at lower concurrency (try --concurrency 1).
+
+Run from the backend directory:
+    python -m benchmarks.bench_symptom_jobs [--requests 1000] [--concurrency 20] [--model-ms 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'bench.db')}")
+os.environ.setdefault("DEBUG", "False")
+# Measures the endpoint itself, not the per-client rate limits in front of it
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+
+import httpx
+from sqlalchemy import func, select
+
+from app.api.v1.endpoints import symptoms as symptoms_endpoint
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.main import app
+from app.models.chat import ChatMessage, ChatSession  # noqa: F401  (registers mappers)
+from app.models.symptom import SymptomSubmission
+from app.models.user import User
+from app.services import analysis_jobs
+from app.services.ai_service import get_ai_service
+from app.services.analysis_jobs import AsyncioAnalysisQueue
+
+SUBMIT_PATH = "/api/v1/symptoms/submit"
+
+TEXTS = [
+    "I feel anxious and worry a lot, panic attacks at night",
+    "hopeless and sad, no energy for anything",
+    "can't sleep, racing thoughts and stress at work",
+    "mostly fine, a bit tired",
+]
+
+def seed() -> str:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add(User(email="bench@example.com", username="bench", full_name="Bench", hashed_password="x"))
+        db.commit()
+    return create_access_token({"sub": "bench@example.com"})
+
+def simulate_model_latency(model_ms: float):
+    """Make every model call on the shared AI service cost `model_ms` more."""
+    ai_service = get_ai_service()
+    predict_one, predict_batch = ai_service.predict_mental_health, ai_service.predict_batch
+
+    def slow_one(*args, **kwargs):
+        time.sleep(model_ms / 1000)
+        return predict_one(*args, **kwargs)
+
+    def slow_batch(inputs):
+        time.sleep(model_ms / 1000)
+        return predict_batch(inputs)
+
+    ai_service.predict_mental_health = slow_one
+    ai_service.predict_batch = slow_batch
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def count_status(status: str) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(
+            select(func.count()).select_from(SymptomSubmission).where(SymptomSubmission.status == status)
+        )
+
+async def drive(token: str, requests: int, concurrency: int):
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    queue = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            for i in queue:
+                started = time.perf_counter()
+                response = await client.post(SUBMIT_PATH, json={"input_text": TEXTS[i % len(TEXTS)]}, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+async def run(label: str, queue, token: str, requests: int, concurrency: int) -> bool:
+    notified = []
+
+    async def notify(message: str, user_id: int):
+        notified.append(message)
+
+    symptoms_endpoint.analysis_queue = queue
+    if queue is not None:
+        queue.start(notify=notify)
+    completed_before = await count_status(analysis_jobs.COMPLETED)
+
+    started = time.perf_counter()
+    latencies = await drive(token, requests, concurrency)
+    accepted = time.perf_counter() - started
+    if queue is not None:
+        await queue.stop()
+    analysed = time.perf_counter() - started
+
+    completed = await count_status(analysis_jobs.COMPLETED) - completed_before
+    pending = await count_status(analysis_jobs.PENDING)
+    print(f"  {label:<14} accepted {requests / accepted:7.0f}/s   p50 {percentile(latencies, 50) * 1000:7.1f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:7.1f} ms   analysed {completed / analysed:7.0f}/s"
+          + (f"   notified {len(notified)}" if queue is not None else ""))
+    return completed == requests and pending == 0 and (queue is None or len(notified) == requests)
+
+async def main(requests: int, concurrency: int, model_ms: float) -> int:
+    token = seed()
+    ok = True
+    print(f"{requests} submissions, {concurrency} concurrent clients, {model_ms:.0f} ms per model call")
+    async with app.router.lifespan_context(app):
+        # Replace the app's own queue so each mode is measured on its own
+        await analysis_jobs.analysis_queue.stop()
+        simulate_model_latency(model_ms)
+        ok &= await run("inline", None, token, requests, concurrency)
+        ok &= await run("worker pool", AsyncioAnalysisQueue(workers=2, batch_size=64), token, requests, concurrency)
+    if not ok:
+        print("FAIL: submissions left unanalysed or unnotified")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--model-ms", type=float, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.requests, args.concurrency, args.model_ms)))
@@ -0,0 +1,87 @@
+"""Transformer classifier throughput and p99 latency by micro-batch size, on CPU.
+
+Builds benchmarks.tiny_classifier in a temporary directory, exports it to
+ONNX, then for each engine (torch fp32, torch int8, ONNX Runtime int8 when
+onnxruntime is installed) and each --batch-sizes value runs --concurrency
+threads sending --requests single-text predictions through a MicroBatcher
+capped at that size. Batch size 1 is the unbatched baseline.
+
+Run from the backend directory:
+    python -m benchmarks.bench_transformer_batching [--requests 512] [--concurrency 64] [--batch-sizes 1,2,4,8,16,32,64]
+"""
+import argparse
+import importlib.util
+import os
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DEBUG", "False")
+
+from app.services.transformer_classifier import MicroBatcher, TransformerClassifier, export_onnx
+from benchmarks.tiny_classifier import build_test_model
+
+TEXTS = [
+    "I feel anxious and worry a lot, panic attacks at night",
+    "hopeless and sad, no energy for anything lately",
+    "can't sleep, racing thoughts and stress at work",
+    "mostly fine, a bit tired",
+]
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def drive(batcher: MicroBatcher, requests: int, concurrency: int):
+    latencies = []
+    work = iter(range(requests))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                i = next(work, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            batcher.submit(TEXTS[i % len(TEXTS)])
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return requests / (time.perf_counter() - started), latencies
+
+def main(requests: int, concurrency: int, batch_sizes, max_wait_ms: float, hidden: int, layers: int):
+    model_dir = build_test_model(os.path.join(tempfile.mkdtemp(), "classifier"), hidden=hidden, layers=layers)
+    engines = [("torch fp32", "torch", False), ("torch int8", "torch", True)]
+    if importlib.util.find_spec("onnxruntime") is not None:
+        export_onnx(model_dir)
+        engines.append(("onnx int8", "onnx", True))
+
+    print(f"tiny BERT ({layers} layers, hidden {hidden}), {requests} requests from {concurrency} threads, "
+          f"max wait {max_wait_ms:.0f} ms")
+    print(f"  {'engine':<11} {'batch':>5} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'avg batch':>9}")
+    for label, engine, quantize in engines:
+        classifier = TransformerClassifier(model_dir, engine=engine, quantize=quantize)
+        classifier.warmup(batch_sizes=(1, max(batch_sizes)))
+        for size in batch_sizes:
+            batcher = MicroBatcher(classifier.predict_proba, max_batch_size=size, max_wait_ms=max_wait_ms)
+            rps, latencies = drive(batcher, requests, concurrency)
+            print(f"  {label:<11} {size:>5} {rps:>8.0f} {percentile(latencies, 50) * 1000:>8.1f} "
+                  f"{percentile(latencies, 99) * 1000:>8.1f} {batcher.items / batcher.batches:>9.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16,32,64")
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--hidden", type=int, default=256)
+    parser.add_argument("--layers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.requests, args.concurrency, [int(size) for size in args.batch_sizes.split(",")],
+         args.max_wait_ms, args.hidden, args.layers)
@@ -0,0 +1,102 @@
+"""Broadcast to many simulated WebSocket connections, old loop vs queued registry.
+
+Registers --connections fake sockets, of which --slow take --slow-delay
+seconds per send, and broadcasts --messages messages. Reports how long the
+broadcast call blocks the caller and how long until every fast client has
+every message, for the previous sequential send loop and for
+ConnectionManager's per-socket queues. Also times connect/disconnect churn.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ws_broadcast [--connections 10000] [--slow 10]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DEBUG", "False")
+
+from app.websocket.connection_manager import ConnectionManager
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = 0
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            # Yield like a real socket write would
+            await asyncio.sleep(0)
+        self.received += 1
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+async def sequential_broadcast(sockets, message: str):
+    """The previous ConnectionManager.broadcast: one awaited send after another."""
+    for socket in sockets:
+        await socket.send_text(message)
+
+async def wait_for(sockets, count: int):
+    while any(socket.received < count for socket in sockets):
+        await asyncio.sleep(0.001)
+
+def make_sockets(connections: int, slow: int, delay: float):
+    return [FakeWebSocket(delay if i < slow else 0.0) for i in range(connections)]
+
+async def run_sequential(connections: int, slow: int, delay: float, messages: int):
+    sockets = make_sockets(connections, slow, delay)
+    started = time.perf_counter()
+    for i in range(messages):
+        await sequential_broadcast(sockets, f"message {i}")
+    blocked = time.perf_counter() - started
+    return blocked, blocked
+
+async def run_queued(connections: int, slow: int, delay: float, messages: int):
+    manager = ConnectionManager()
+    sockets = make_sockets(connections, slow, delay)
+    for i, socket in enumerate(sockets):
+        await manager.connect(socket, user_id=i % (connections // 2 or 1) + 1)
+    fast = sockets[slow:]
+
+    started = time.perf_counter()
+    for i in range(messages):
+        await manager.broadcast(f"message {i}")
+    blocked = time.perf_counter() - started
+    await wait_for(fast, messages)
+    delivered = time.perf_counter() - started
+    await manager.close_all()
+    return blocked, delivered
+
+async def run_churn(connections: int):
+    manager = ConnectionManager()
+    sockets = make_sockets(connections, 0, 0.0)
+    started = time.perf_counter()
+    for i, socket in enumerate(sockets):
+        await manager.connect(socket, user_id=i + 1)
+    for i, socket in enumerate(sockets):
+        manager.disconnect(socket, user_id=i + 1)
+    return time.perf_counter() - started
+
+async def main(connections: int, slow: int, delay: float, messages: int):
+    print(f"{connections} connections ({slow} slow at {delay * 1000:.0f} ms/send), {messages} broadcasts")
+    for label, run in (("sequential loop", run_sequential), ("queued registry", run_queued)):
+        blocked, delivered = await run(connections, slow, delay, messages)
+        print(f"  {label:<16} caller blocked {blocked * 1000:9.1f} ms   fast clients done {delivered * 1000:9.1f} ms")
+    churn = await run_churn(connections)
+    print(f"  connect + disconnect {connections} sockets: {churn * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--slow", type=int, default=10)
+    parser.add_argument("--slow-delay", type=float, default=0.05)
+    parser.add_argument("--messages", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.connections, args.slow, args.slow_delay, args.messages))
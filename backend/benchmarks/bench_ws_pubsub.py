@@ -0,0 +1,116 @@
+"""Check and time cross-worker WebSocket delivery through RedisRelay.
+
+Simulates two workers, each with its own ConnectionManager and RedisRelay,
+sharing one in-process fake Redis (fakeredis, from requirements-dev.txt).
+First checks the delivery rules: a push to a user reaches their sockets
+on both workers exactly once, and a broadcast reaches every socket. Then
+times --messages pushes to a user on the other worker, with batched
+publishes versus one publish per round trip. Exits non-zero if a delivery
+check fails.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ws_pubsub [--messages 5000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("DEBUG", "False")
+
+import fakeredis
+
+from app.websocket.connection_manager import ConnectionManager
+from app.websocket.pubsub import RedisRelay
+
+class FakeWebSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.messages.append(message)
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def start_worker(server, batch_size: int) -> ConnectionManager:
+    manager = ConnectionManager(queue_size=100000)
+    manager.relay = RedisRelay(fakeredis.FakeAsyncRedis(server=server), manager, batch_size=batch_size)
+    await manager.relay.start()
+    return manager
+
+async def settle(condition, timeout: float = 10.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.001)
+    return condition()
+
+async def check_delivery() -> int:
+    server = fakeredis.FakeServer()
+    worker_a, worker_b = await start_worker(server, 256), await start_worker(server, 256)
+    tab_a, tab_b, other_user = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await worker_a.connect(tab_a, user_id=1)
+    await worker_b.connect(tab_b, user_id=1)
+    await worker_b.connect(other_user, user_id=2)
+    # Let the per-user subscriptions land
+    await asyncio.sleep(0.05)
+
+    await worker_a.send_to_user("to user 1", 1)
+    await worker_a.send_to_user("to user 2", 2)
+    await worker_b.broadcast("to everyone")
+    await settle(lambda: len(tab_a.messages) == 2 and len(tab_b.messages) == 2 and len(other_user.messages) == 2)
+    await asyncio.sleep(0.05)
+
+    checks = [
+        ("push reaches the user's tab on the sending worker once", tab_a.messages.count("to user 1") == 1),
+        ("push reaches the user's tab on the other worker", tab_b.messages.count("to user 1") == 1),
+        ("push reaches a user connected only elsewhere", other_user.messages.count("to user 2") == 1),
+        ("push does not leak to other users", "to user 2" not in tab_a.messages + tab_b.messages),
+        ("broadcast reaches every socket once", all(
+            socket.messages.count("to everyone") == 1 for socket in (tab_a, tab_b, other_user)
+        )),
+    ]
+    for label, ok in checks:
+        print(f"  {'ok ' if ok else 'BAD'} {label}")
+
+    for worker in (worker_a, worker_b):
+        await worker.relay.stop()
+        await worker.close_all()
+    return sum(not ok for _, ok in checks)
+
+async def time_remote_pushes(messages: int, batch_size: int) -> float:
+    server = fakeredis.FakeServer()
+    sender, receiver = await start_worker(server, batch_size), await start_worker(server, batch_size)
+    socket = FakeWebSocket()
+    await receiver.connect(socket, user_id=7)
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    for i in range(messages):
+        await sender.send_to_user(f"push {i}", 7)
+    await settle(lambda: len(socket.messages) >= messages, timeout=120)
+    elapsed = time.perf_counter() - started
+
+    for worker in (sender, receiver):
+        await worker.relay.stop()
+        await worker.close_all()
+    return elapsed
+
+async def main(messages: int) -> int:
+    print("Delivery across two workers")
+    failures = await check_delivery()
+    print(f"{messages} pushes to a user on another worker")
+    for label, batch_size in (("one publish per trip", 1), ("batched publishes", 256)):
+        elapsed = await time_remote_pushes(messages, batch_size)
+        print(f"  {label:<22} {elapsed * 1000:9.1f} ms  {messages / elapsed:9.0f} msg/s")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(main(args.messages)) else 0)
@@ -0,0 +1,94 @@
+"""Fail if the API's cold start regresses.
+
+Starts uvicorn in a fresh process --runs times and measures the time from
+spawning it to the first 200 from /health, then reports the median. The
+database is migrated beforehand (python -m app.migrate) and the server runs
+with DATABASE_SCHEMA_MODE=migrate and AI_WARMUP=background, as in
+production. Also imports app.main in a clean interpreter and checks that
+none of the heavy ML modules (torch, transformers, numpy, ...) come with
+it; they must only load when a model backend that needs them is warmed up.
+
+Exits 1 if the median time-to-first-request exceeds --max-first-request-ms
+or a heavy module is imported eagerly. For where the time goes, run
+    python -m app.main --profile-startup
+
+Run from the backend directory:
+    python -m benchmarks.check_cold_start [--runs 5] [--max-first-request-ms 4000]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.core.startup_profile import HEAVY_MODULES
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_to_first_request(env: dict, timeout: float = 60) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        with httpx.Client() as client:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited: {server.stderr.read().decode()[-2000:]}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+        raise RuntimeError(f"no response from /health within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def heavy_imports(env: dict) -> list:
+    check = f"import sys, app.main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", check], env=env, capture_output=True, text=True, check=True)
+    return [name for name in output.stdout.strip().split(",") if name]
+
+def main(runs: int, max_first_request_ms: float) -> int:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'cold.db')}")
+    env.setdefault("DEBUG", "False")
+    env.update(DATABASE_SCHEMA_MODE="migrate", AI_WARMUP="background")
+    subprocess.run([sys.executable, "-m", "app.migrate"], env=env, check=True, capture_output=True)
+
+    samples = [time_to_first_request(env) * 1000 for _ in range(runs)]
+    median = statistics.median(samples)
+    heavy = heavy_imports(env)
+    print(f"time to first request over {runs} cold starts:")
+    print(f"  median {median:7.0f} ms   min {min(samples):7.0f} ms   max {max(samples):7.0f} ms"
+          f"   (budget {max_first_request_ms:.0f} ms)")
+    print(f"  heavy ML modules imported by app.main: {', '.join(heavy) if heavy else 'none'}")
+
+    failed = False
+    if median > max_first_request_ms:
+        print(f"FAIL: median time to first request {median:.0f} ms is over budget")
+        failed = True
+    if heavy:
+        print(f"FAIL: app.main imports {', '.join(heavy)} at startup")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-first-request-ms", type=float, default=4000)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.max_first_request_ms))
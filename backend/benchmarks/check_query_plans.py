@@ -0,0 +1,152 @@
+"""Fail if any list/history endpoint query plans a sequential table scan.
+
+Calls each endpoint below through the real app, captures every SELECT it
+sends to the database, and runs EXPLAIN on it with the same parameters:
+EXPLAIN QUERY PLAN on SQLite, EXPLAIN (FORMAT JSON) with enable_seqscan off
+on Postgres, so a Seq Scan there means no usable index exists. Exits
+non-zero if any query scans one of the checked tables.
+
+Uses a temporary SQLite file by default; point DATABASE_URL at a scratch
+Postgres database to check that backend (tables and a user are created).
+
+Run from the backend directory:
+    python -m benchmarks.check_query_plans
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'plans.db')}")
+os.environ.setdefault("DEBUG", "False")
+
+import httpx
+from sqlalchemy import event, insert
+
+from app.core.database import Base, SessionLocal, async_engine, engine
+from app.core.security import create_access_token
+from app.main import app
+from app.models.chat import ChatMessage, ChatSession
+from app.models.symptom import SymptomSubmission
+from app.models.user import User
+
+CHECKED_TABLES = ("symptom_submissions", "chat_sessions", "chat_messages")
+
+def seed():
+    """Create one user with a few sessions, messages and submissions; return (token, session id, cursors)."""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(email="plans@example.com", username="plans", full_name="Plans", hashed_password="x")
+        db.add(user)
+        db.flush()
+        session_ids = db.scalars(
+            insert(ChatSession).returning(ChatSession.id),
+            [{"user_id": user.id, "session_name": f"session {i}"} for i in range(30)]
+        ).all()
+        db.execute(insert(ChatMessage), [
+            {"session_id": session_id, "user_id": user.id, "message": f"message {j}"}
+            for session_id in session_ids
+            for j in range(10)
+        ])
+        db.execute(insert(SymptomSubmission), [
+            {"user_id": user.id, "input_text": f"entry {i}"} for i in range(30)
+        ])
+        db.commit()
+    return create_access_token({"sub": "plans@example.com"}), session_ids[0]
+
+def endpoint_calls(session_id: int):
+    """(label, path, params) for every query pattern to check; None params take the previous next_cursor."""
+    return [
+        ("symptom history", "/api/v1/symptoms/history", {"per_page": 5}),
+        ("symptom history, cursor", "/api/v1/symptoms/history", None),
+        ("chat sessions", "/api/v1/chat/sessions", {"per_page": 5}),
+        ("chat sessions, cursor", "/api/v1/chat/sessions", None),
+        ("chat sessions, capped", "/api/v1/chat/sessions", {"per_page": 5, "messages_limit": 3}),
+        ("chat sessions, summary", "/api/v1/chat/sessions", {"per_page": 5, "summary": True}),
+        ("session messages", f"/api/v1/chat/sessions/{session_id}/messages", {}),
+        ("message export", f"/api/v1/chat/sessions/{session_id}/messages/export", {"since_id": 3}),
+    ]
+
+async def capture(client: httpx.AsyncClient, headers: dict, session_id: int):
+    """Return [(label, statement, parameters)] for each SELECT the endpoints issue."""
+    captured = []
+    current = {"label": None}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if current["label"] and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((current["label"], statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    next_cursor = None
+    for label, path, params in endpoint_calls(session_id):
+        if params is None:
+            params = {"per_page": 5, "cursor": next_cursor}
+        current["label"] = label
+        response = await client.get(path, params=params, headers=headers)
+        current["label"] = None
+        response.raise_for_status()
+        body = response.json() if response.headers["content-type"] == "application/json" else None
+        if isinstance(body, dict):
+            next_cursor = body.get("next_cursor")
+    event.remove(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    return captured
+
+def sqlite_scans(plan_rows):
+    """Tables read by a full scan in SQLite EXPLAIN QUERY PLAN output."""
+    scans = []
+    for row in plan_rows:
+        detail = row[-1]
+        words = detail.split()
+        if words[:1] == ["SCAN"] and words[1] in CHECKED_TABLES and "INDEX" not in detail:
+            scans.append(words[1])
+    return scans
+
+def postgres_scans(plan):
+    """Tables read by a Seq Scan node in Postgres EXPLAIN (FORMAT JSON) output."""
+    scans = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in CHECKED_TABLES:
+            scans.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+async def explain(statement: str, parameters):
+    async with async_engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+            result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return postgres_scans(plan), json.dumps(plan, indent=1)
+        rows = (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)).all()
+        return sqlite_scans(rows), "\n".join(f"    {row[-1]}" for row in rows)
+
+async def main() -> int:
+    token, session_id = seed()
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://plans") as client:
+        captured = await capture(client, headers, session_id)
+
+    failures = 0
+    print(f"Checking {len(captured)} queries on {async_engine.dialect.name}")
+    for label, statement, parameters in captured:
+        if not any(table in statement for table in CHECKED_TABLES):
+            continue
+        scans, plan = await explain(statement, parameters)
+        status = f"SEQ SCAN on {', '.join(scans)}" if scans else "ok"
+        print(f"  {label:<26} {status}")
+        if scans:
+            failures += 1
+            print("    " + " ".join(statement.split()))
+            print(plan)
+    # Pooled aiosqlite connections run on their own threads; close them before exiting
+    await async_engine.dispose()
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(main()) else 0)
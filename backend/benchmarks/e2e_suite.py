@@ -0,0 +1,308 @@
+"""End-to-end load test of the API and WebSocket, with a regression check against a baseline.
+
+Serves app.main:app with uvicorn inside this process on a local port,
+against a fresh SQLite database, and runs --users virtual users at once
+over real HTTP and WebSocket connections. Every user runs each scripted
+scenario, one scenario at a time, so bcrypt in the auth phase does not
+add noise to the other endpoints' timings:
+
+  auth      sign up, log in, fetch /auth/me
+  symptoms  --rounds times: submit, page through the whole history by
+            cursor, fetch the newest submission
+  chat      open a session, post --messages messages over REST and list
+            them, then exchange --messages messages over the WebSocket
+            (timed from send to the final "message" frame), list sessions
+
+Prints, and with --output writes, JSON with overall throughput and each
+endpoint's request count, errors, throughput and p50/p95/p99 in ms.
+Endpoints with path parameters are reported by route template.
+
+With --baseline, compares against a stored result and exits 1 on a
+regression:
+- an endpoint's p95 is more than --tolerance slower and more than
+  --min-delta-ms slower in absolute terms, or
+- overall throughput drops by more than --tolerance, or
+- any request failed.
+
+The baseline in benchmarks/e2e_baseline.json was recorded with the
+defaults below. Timings depend on the machine, so record your own with
+--save-baseline on the machine that runs the comparison.
+
+Rate limiting is off, since one address plays every user. BCRYPT_ROUNDS
+is the configured value, so auth latency includes real hashing.
+
+Run from the backend directory:
+    python -m benchmarks.e2e_suite [--users 20] [--rounds 5] [--messages 5]
+        [--output results.json] [--baseline benchmarks/e2e_baseline.json] [--save-baseline PATH]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'e2e.db')}")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+
+import httpx
+import uvicorn
+import websockets
+
+from app.main import app
+
+API = "/api/v1"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "e2e_baseline.json")
+
+SYMPTOM_TEXTS = [
+    "I feel anxious and worry a lot, panic attacks at night",
+    "hopeless and sad, no energy for anything",
+    "can't sleep, racing thoughts and stress at work",
+    "mostly fine, a bit tired",
+]
+CHAT_TEXTS = [
+    "Hello",
+    "I have been feeling anxious lately",
+    "I can't sleep and my thoughts keep racing",
+    "How can I manage stress at work?",
+    "Thanks, that helps",
+]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+class Recorder:
+    """Latency samples and failures per endpoint name."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, name: str, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.samples[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return response
+
+    def report(self, duration: float) -> dict:
+        endpoints = {}
+        for name in sorted(set(self.samples) | set(self.errors)):
+            samples = self.samples.get(name) or [0.0]
+            endpoints[name] = {
+                "requests": len(self.samples.get(name, [])),
+                "errors": self.errors.get(name, 0),
+                "throughput_rps": round(len(self.samples.get(name, [])) / duration, 2),
+                "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 99) * 1000, 2),
+            }
+        total = sum(len(samples) for samples in self.samples.values())
+        return {
+            "duration_s": round(duration, 2),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / duration, 2),
+            "endpoints": endpoints,
+        }
+
+async def auth_scenario(recorder: Recorder, client: httpx.AsyncClient, n: int) -> Optional[str]:
+    email = f"user{n}@example.com"
+    password = f"password-{n}"
+    signup = await recorder.call("POST /auth/signup", client, "POST", f"{API}/auth/signup", json={
+        "email": email, "username": f"user{n}", "full_name": f"Load User {n}", "password": password,
+    })
+    if signup is None:
+        return None
+    login = await recorder.call("POST /auth/login", client, "POST", f"{API}/auth/login",
+                                data={"username": email, "password": password})
+    if login is None:
+        return None
+    token = login.json()["access_token"]
+    await recorder.call("GET /auth/me", client, "GET", f"{API}/auth/me", headers={"Authorization": f"Bearer {token}"})
+    return token
+
+async def symptoms_scenario(recorder: Recorder, client: httpx.AsyncClient, token: str, n: int, rounds: int):
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(rounds):
+        await recorder.call("POST /symptoms/submit", client, "POST", f"{API}/symptoms/submit", headers=headers, json={
+            "input_text": SYMPTOM_TEXTS[(n + i) % len(SYMPTOM_TEXTS)],
+            "mood_rating": (n + i) % 10 + 1,
+            "stress_level": (n * 3 + i) % 10 + 1,
+        })
+        newest = None
+        params = {"per_page": 2}
+        while True:
+            page = await recorder.call("GET /symptoms/history", client, "GET", f"{API}/symptoms/history",
+                                       headers=headers, params=params)
+            if page is None:
+                break
+            body = page.json()
+            if newest is None and body["submissions"]:
+                newest = body["submissions"][0]["id"]
+            if not body["next_cursor"]:
+                break
+            params = {"per_page": 2, "cursor": body["next_cursor"], "include_total": False}
+        if newest is not None:
+            await recorder.call("GET /symptoms/{submission_id}", client, "GET", f"{API}/symptoms/{newest}",
+                                headers=headers)
+
+async def chat_scenario(recorder: Recorder, client: httpx.AsyncClient, ws_url: str, token: str, n: int,
+                        messages: int):
+    headers = {"Authorization": f"Bearer {token}"}
+    session = await recorder.call("POST /chat/sessions", client, "POST", f"{API}/chat/sessions", headers=headers,
+                                  json={"session_name": f"Load session {n}"})
+    if session is None:
+        return
+    session_id = session.json()["id"]
+    for i in range(messages):
+        await recorder.call("POST /chat/sessions/{session_id}/messages", client, "POST",
+                            f"{API}/chat/sessions/{session_id}/messages", headers=headers,
+                            json={"message": CHAT_TEXTS[(n + i) % len(CHAT_TEXTS)]})
+    await recorder.call("GET /chat/sessions/{session_id}/messages", client, "GET",
+                        f"{API}/chat/sessions/{session_id}/messages", headers=headers)
+
+    name = "WS message round trip"
+    try:
+        async with websockets.connect(f"{ws_url}/ws/{token}") as ws:
+            for i in range(messages):
+                started = time.perf_counter()
+                await ws.send(json.dumps({
+                    "type": "message", "session_id": session_id, "content": CHAT_TEXTS[(n + i) % len(CHAT_TEXTS)],
+                }))
+                while True:
+                    frame = json.loads(await asyncio.wait_for(ws.recv(), timeout=30))
+                    if frame["type"] in ("message", "error"):
+                        break
+                recorder.samples[name].append(time.perf_counter() - started)
+                if frame["type"] == "error":
+                    recorder.errors[name] += 1
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+        recorder.errors[name] += 1
+    await recorder.call("GET /chat/sessions", client, "GET", f"{API}/chat/sessions", headers=headers)
+
+async def run_phase(base_url: str, users: int, scenario):
+    """Run `scenario(client, n)` for every user at once; returns when the slowest finishes."""
+    async def one(n: int):
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            await scenario(client, n)
+    await asyncio.gather(*(one(n) for n in range(users)))
+
+async def run(users: int, rounds: int, messages: int) -> dict:
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.05)
+    recorder = Recorder()
+    tokens: Dict[int, str] = {}
+    base_url, ws_url = f"http://127.0.0.1:{port}", f"ws://127.0.0.1:{port}"
+
+    async def auth(client, n):
+        token = await auth_scenario(recorder, client, n)
+        if token is not None:
+            tokens[n] = token
+
+    async def symptoms(client, n):
+        if n in tokens:
+            await symptoms_scenario(recorder, client, tokens[n], n, rounds)
+
+    async def chat(client, n):
+        if n in tokens:
+            await chat_scenario(recorder, client, ws_url, tokens[n], n, messages)
+
+    try:
+        started = time.perf_counter()
+        for scenario in (auth, symptoms, chat):
+            await run_phase(base_url, users, scenario)
+        duration = time.perf_counter() - started
+    finally:
+        server.should_exit = True
+        await serving
+    result = recorder.report(duration)
+    result["config"] = {
+        "users": users, "rounds": rounds, "messages": messages,
+        "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+    }
+    return result
+
+def compare(result: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regressions of `result` against `baseline`, one line each."""
+    regressions = []
+    if result["errors"]:
+        regressions.append(f"{result['errors']} requests failed")
+    if result["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(f"throughput {result['throughput_rps']} rps, baseline {baseline['throughput_rps']} rps")
+    for name, before in baseline["endpoints"].items():
+        after = result["endpoints"].get(name)
+        if after is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        slower = after["p95_ms"] - before["p95_ms"]
+        if after["p95_ms"] > before["p95_ms"] * (1 + tolerance) and slower > min_delta_ms:
+            regressions.append(f"{name}: p95 {after['p95_ms']} ms, baseline {before['p95_ms']} ms")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="compare against this results JSON")
+    parser.add_argument("--save-baseline", metavar="PATH", help="store this run as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=20, help="ignore p95 changes smaller than this")
+    args = parser.parse_args()
+
+    # Per-request client logs would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    result = asyncio.run(run(args.users, args.rounds, args.messages))
+    text = json.dumps(result, indent=2)
+    print(text)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"]["users"] != args.users or baseline["config"]["rounds"] != args.rounds \
+                or baseline["config"]["messages"] != args.messages:
+            print(f"note: baseline was recorded with {baseline['config']}", file=sys.stderr)
+        regressions = compare(result, baseline, args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION: {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline}", file=sys.stderr)
+    elif result["errors"]:
+        print(f"FAIL: {result['errors']} requests failed", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
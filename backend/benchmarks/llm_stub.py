@@ -0,0 +1,82 @@
+"""Deterministic OpenAI-compatible chat completions server for local runs and benchmarks.
+
+Implements POST /v1/chat/completions, streaming (server-sent events) and
+not. The reply is always the keyword backend's answer to the last user
+message, sent one word per chunk after --first-token-ms, with
+--token-ms between chunks, so latency numbers are reproducible.
+
+Point the app at it with:
+    LLM_BACKEND=openai OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub
+
+Run from the backend directory:
+    python -m benchmarks.llm_stub [--port 8089] [--first-token-ms 300] [--token-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.llm_backend import KeywordBackend
+
+def create_stub_app(first_token_ms: float = 300, token_ms: float = 20) -> FastAPI:
+    stub = FastAPI()
+    keyword = KeywordBackend()
+
+    @stub.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        user_message = next((m["content"] for m in reversed(body["messages"]) if m["role"] == "user"), "")
+        words = re.findall(r"\S+\s*", keyword.respond(user_message))
+        model = body.get("model", "stub")
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            return "data: " + json.dumps({
+                "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }) + "\n\n"
+
+        if not body.get("stream"):
+            await asyncio.sleep((first_token_ms + token_ms * (len(words) - 1)) / 1000)
+            return {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(words)}}],
+            }
+
+        async def events():
+            yield chunk({"role": "assistant"})
+            await asyncio.sleep(first_token_ms / 1000)
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(token_ms / 1000)
+                yield chunk({"content": word})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return stub
+
+def serve_in_thread(port: int, first_token_ms: float = 300, token_ms: float = 20) -> uvicorn.Server:
+    """Start the stub on 127.0.0.1:`port` in a daemon thread; return the server once it accepts connections."""
+    server = uvicorn.Server(uvicorn.Config(
+        create_stub_app(first_token_ms, token_ms), host="127.0.0.1", port=port, log_level="warning"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.first_token_ms, args.token_ms), host="127.0.0.1", port=args.port)
@@ -0,0 +1,53 @@
+"""Build a small, randomly initialised BERT classifier for local runs and benchmarks.
+
+The model has the app's disorder labels and a word-level vocabulary of the
+keyword map plus common words, so it loads and runs exactly like a
+fine-tuned model directory would. Its predictions are meaningless; only
+its size and speed are representative.
+
+Run from the backend directory:
+    python -m benchmarks.tiny_classifier ai_models/classifier [--hidden 256] [--layers 4]
+"""
+import argparse
+import os
+import random
+
+from app.services.ai_service import DISORDER_LABELS, get_ai_service
+
+COMMON_WORDS = (
+    "i me my feel feeling felt have been am is are was not no can cant sleep night day work "
+    "a the and or but to of in on at for with about lately always never very really so too "
+    "tired stress stressed worried thoughts racing energy anything everything nothing fine bit"
+).split()
+
+def build_test_model(path: str, hidden: int = 256, layers: int = 4, heads: int = 4, seed: int = 0) -> str:
+    """Write the model and tokenizer to `path` and return it."""
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    os.makedirs(path, exist_ok=True)
+    words = {word for keywords in get_ai_service().keyword_map.values() for kw in keywords for word in kw.split()}
+    words.update(COMMON_WORDS)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(words)
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(vocab) + "\n")
+
+    random.seed(seed)
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=hidden, num_hidden_layers=layers, num_attention_heads=heads,
+        intermediate_size=hidden * 4, max_position_embeddings=512, num_labels=len(DISORDER_LABELS),
+        id2label=dict(enumerate(DISORDER_LABELS)), label2id={label: i for i, label in enumerate(DISORDER_LABELS)},
+    )
+    BertForSequenceClassification(config).save_pretrained(path)
+    BertTokenizerFast(vocab_file=vocab_file).save_pretrained(path)
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--hidden", type=int, default=256)
+    parser.add_argument("--layers", type=int, default=4)
+    args = parser.parse_args()
+    print(build_test_model(args.path, args.hidden, args.layers))
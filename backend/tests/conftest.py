@@ -0,0 +1,12 @@
+"""Shared setup for the performance gate tests.
+
+The gates in benchmarks/ build the app against DATABASE_URL when first
+imported, so point it at a scratch SQLite file before any test imports
+them. Run from the backend directory:
+    python -m pytest tests
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.db')}")
+os.environ.setdefault("DEBUG", "False")
@@ -0,0 +1,7 @@
+import asyncio
+
+from benchmarks import bench_chat_sessions
+
+def test_session_list_statement_count_is_fixed(capsys):
+    failures = asyncio.run(bench_chat_sessions.main(sessions=20, messages=10, repeat=2))
+    assert failures == 0, capsys.readouterr().out
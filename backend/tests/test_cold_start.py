@@ -0,0 +1,12 @@
+import os
+
+from benchmarks import check_cold_start
+
+# Multiplies the time-to-first-request budget, for CI machines slower than the reference one
+BUDGET_SCALE = float(os.environ.get("BENCH_BUDGET_SCALE", "1.0"))
+
+def test_cold_start_within_budget(capsys, monkeypatch, tmp_path):
+    # The spawned servers get their own database, migrated from empty
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'cold.db'}")
+    exit_code = check_cold_start.main(runs=3, max_first_request_ms=4000 * BUDGET_SCALE)
+    assert exit_code == 0, capsys.readouterr().out
@@ -0,0 +1,9 @@
+import os
+
+from benchmarks import bench_hot_paths
+
+# Multiplies every ns/op budget, for CI machines slower than the reference one
+BUDGET_SCALE = float(os.environ.get("BENCH_BUDGET_SCALE", "1.0"))
+
+def test_hot_paths_within_budget(capsys):
+    assert bench_hot_paths.main(count=100, repeat=3, budget_scale=BUDGET_SCALE) == 0, capsys.readouterr().out
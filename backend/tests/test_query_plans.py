@@ -0,0 +1,7 @@
+import asyncio
+
+from benchmarks import check_query_plans
+
+def test_history_queries_use_indexes(capsys):
+    failures = asyncio.run(check_query_plans.main())
+    assert failures == 0, capsys.readouterr().out
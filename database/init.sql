@@ -38,6 +38,7 @@ CREATE TABLE IF NOT EXISTS symptom_submissions (
     recommendations TEXT,
     next_steps TEXT,
     emergency_contact_suggested BOOLEAN DEFAULT FALSE,
+    status VARCHAR(20) NOT NULL DEFAULT 'completed',
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -62,18 +63,21 @@ CREATE TABLE IF NOT EXISTS chat_messages (
     is_user_message BOOLEAN DEFAULT TRUE,
     ai_model_used VARCHAR(100),
     response_time_ms INTEGER,
+    first_token_ms INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
-CREATE INDEX IF NOT EXISTS idx_symptom_submissions_user_id ON symptom_submissions(user_id);
 CREATE INDEX IF NOT EXISTS idx_symptom_submissions_created_at ON symptom_submissions(created_at);
-CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_id ON chat_sessions(user_id);
-CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id ON chat_messages(session_id);
 CREATE INDEX IF NOT EXISTS idx_chat_messages_user_id ON chat_messages(user_id);
 
+-- Composite indexes matching the list queries (filter, then newest/oldest first)
+CREATE INDEX IF NOT EXISTS ix_symptom_submissions_user_id_created_at ON symptom_submissions(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_chat_sessions_user_id_created_at ON chat_sessions(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_chat_messages_session_id_created_at ON chat_messages(session_id, created_at, id);
+
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$